@@ -48,11 +48,7 @@ class ArkSave(commands.Cog):
 
     async def get_xuid(self, ctx):
         arktools = self.bot.get_cog("ArkTools")
-        playerdata = await arktools.config.guild(ctx.guild).players()
-        for xuid, data in playerdata.items():
-            if "discord" in data:
-                if ctx.author.id == data["discord"]:
-                    return xuid
+        return await arktools.xuid_from_discord(ctx.guild, ctx.author.id)
 
     async def get_cluster(self, ctx):
         shop = self.bot.get_cog("ArkShop")
@@ -6,11 +6,9 @@ import math
 import os
 import random
 import shutil
-import socket
 
 import aiohttp
 import discord
-from rcon import Client
 from dislash import (InteractionClient,
                      ActionRow,
                      Button,
@@ -38,6 +36,7 @@ from .formatter import (
 )
 from .menus import (
     menu,
+    PageSource,
     prev_page,
     close_menu,
     next_page,
@@ -195,11 +194,9 @@ class ArkShop(commands.Cog):
         arktools = await self.arktools(ctx)
         if not arktools:
             return None
-        playerdata = await arktools.config.guild(ctx.guild).players()
-        for xuid, data in playerdata.items():
-            if "discord" in data:
-                if ctx.author.id == data["discord"]:
-                    return xuid
+        xuid = await arktools.xuid_from_discord(ctx.guild, ctx.author.id)
+        if xuid:
+            return xuid
         else:
             embed = discord.Embed(
                 description=f"Your discord ID has not been found in the database.\n"
@@ -1231,12 +1228,11 @@ class ArkShop(commands.Cog):
             shop_logs[user_id] = count
         sorted_items = sorted(shop_logs.items(), key=lambda x: x[1], reverse=True)
         pages = math.ceil(len(sorted_items) / 10)
-        embeds = []
-        start = 0
-        stop = 10
-        for page in range(int(pages)):
-            if stop > len(sorted_items):
-                stop = len(sorted_items)
+
+        # Users are only looked up for the pages someone actually opens
+        async def page(p: int) -> discord.Embed:
+            start = p * 10
+            stop = min(start + 10, len(sorted_items))
             items = ""
             for i in range(start, stop, 1):
                 user_id = int(sorted_items[i][0])
@@ -1258,15 +1254,14 @@ class ArkShop(commands.Cog):
                 title="Item Purchases",
                 description=items
             )
-            embed.set_footer(text=f"Pages: {page + 1}/{pages}\n{random.choice(TIPS).format(p=ctx.prefix)}")
-            embeds.append(embed)
-            start += 10
-            stop += 10
-        pages = embeds
+            embed.set_footer(text=f"Pages: {p + 1}/{pages}\n{random.choice(TIPS).format(p=ctx.prefix)}")
+            return embed
+
+        source = PageSource(pages, page)
         if await self.config.guild(ctx.guild).usebuttons():
-            await buttonmenu(ctx, pages, DEFAULT_BUTTON_CONTROLS)
+            await buttonmenu(ctx, source, DEFAULT_BUTTON_CONTROLS)
         else:
-            await menu(ctx, pages, DEFAULT_CONTROLS)
+            await menu(ctx, source, DEFAULT_CONTROLS)
 
     @commands.command(name="playershopstats", aliases=["pss"])
     async def player_shop_stats(self, ctx, *, member: discord.Member = None):
@@ -1289,11 +1284,9 @@ class ArkShop(commands.Cog):
         if str(member.id) not in logs["users"]:
             return await ctx.send("It appears that player hasn't purchased anything yet.")
 
-        for xuid, stats in playerstats.items():
-            if "discord" in stats:
-                if str(member.id) == str(stats["discord"]):
-                    gt = stats["username"]
-                    break
+        xuid = await arktools.xuid_from_discord(ctx.guild, member.id)
+        if xuid in playerstats:
+            gt = playerstats[xuid]["username"]
         else:
             gt = "Unknown"
             xuid = "Unknown"
@@ -1962,28 +1955,17 @@ class ArkShop(commands.Cog):
                                  currency_name,
                                  xuid,
                                  logchannel):
-        def exe():
-            results = {"success": [], "failed": []}
-            for name, data in serverlist:
-                try:
-                    with Client(
-                            host=data['ip'],
-                            port=data['port'],
-                            passwd=data['password'],
-                            timeout=5
-                    ) as client:
-                        for path in paths:
-                            client.run(f"giveitemtoplayer {implant_id} {path}")
-                        client.close()
-                        results["success"].append(name)
-                except socket.timeout:
-                    results["failed"].append(name)
-                except Exception as e:
-                    log.warning(f"Failed to send item to {name}\nError: {e}")
-                    results["failed"].append(name)
-            return results
-
-        res = await self.bot.loop.run_in_executor(None, exe)
+        arktools = await self.arktools(ctx)
+        if not arktools:
+            return
+        # Every map gets its items at once over the RCON connections that ArkTools keeps open
+        # Keyed on the purchase itself so trying again after a failure only sends what didn't make it
+        servers = ",".join(sorted(name for name, _ in serverlist))
+        delivery_id = f"arkshop-{ctx.guild.id}-{ctx.author.id}-{implant_id}-{item_name}-{servers}"
+        delivery = await arktools.items.grant(serverlist, implant_id, paths, delivery_id=delivery_id)
+        res = {"success": delivery.success, "failed": delivery.failed}
+        for name in res["failed"]:
+            log.warning(f"Failed to send item to {name}")
 
         if not res["success"]:  # If none of the commands were successful, don't deduct credits
             embed = discord.Embed(
@@ -1995,8 +1977,9 @@ class ArkShop(commands.Cog):
             )
             return await message.edit(embed=embed, components=[])
 
-        # withdraw credits and send purchase message
+        # withdraw credits and send purchase message, buying it again after this is a new delivery
         await bank.withdraw_credits(ctx.author, int(price))
+        arktools.items.forget(delivery_id)
         embed = discord.Embed(
             description=f"You have purchased the **{item_name}** item for **{price}** {currency_name}!\n"
                         f"Item was sent to ImplantID **{implant_id}**",
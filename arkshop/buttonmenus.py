@@ -2,13 +2,12 @@ import asyncio
 import contextlib
 import functools
 import logging
-from typing import List, Union
 
 import discord
 from dislash import ActionRow, Button, ButtonStyle, ResponseType
 from redbot.core import commands
 
-from .menus import menu, DEFAULT_CONTROLS
+from .menus import menu, get_page, Pages, PageSource, DEFAULT_CONTROLS
 
 log = logging.getLogger("red.vrt.arkshop.buttonmenu")
 
@@ -18,19 +17,21 @@ log = logging.getLogger("red.vrt.arkshop.buttonmenu")
 
 async def buttonmenu(
         ctx: commands.Context,
-        pages: Union[List[str], List[discord.Embed]],
+        pages: Pages,
         controls: dict,
         message: discord.Message = None,
         page: int = 0,
         timeout: float = 60.0,
 ):
-    if not isinstance(pages[0], (discord.Embed, str)):
-        raise RuntimeError("Pages must be of type discord.Embed or str")
-    if not all(isinstance(x, discord.Embed) for x in pages) and not all(
-            isinstance(x, str) for x in pages
-    ):
-        raise RuntimeError("All pages must be of the same type")
-    current_page = pages[page]
+    # Page sources check each page as it's built
+    if not isinstance(pages, PageSource):
+        if not isinstance(pages[0], (discord.Embed, str)):
+            raise RuntimeError("Pages must be of type discord.Embed or str")
+        if not all(isinstance(x, discord.Embed) for x in pages) and not all(
+                isinstance(x, str) for x in pages
+        ):
+            raise RuntimeError("All pages must be of the same type")
+    current_page = await get_page(pages, page)
     buttons = controls["buttons"]
     actions = controls["actions"]
 
@@ -81,7 +82,7 @@ async def buttonmenu(
 
 async def bnext_page(
         ctx: commands.Context,
-        pages: list,
+        pages: Pages,
         controls: dict,
         message: discord.Message,
         page: int,
@@ -96,7 +97,7 @@ async def bnext_page(
 
 async def skip_ten(
         ctx: commands.Context,
-        pages: list,
+        pages: Pages,
         controls: dict,
         message: discord.Message,
         page: int,
@@ -113,7 +114,7 @@ async def skip_ten(
 
 async def bprev_page(
         ctx: commands.Context,
-        pages: list,
+        pages: Pages,
         controls: dict,
         message: discord.Message,
         page: int,
@@ -128,7 +129,7 @@ async def bprev_page(
 
 async def back_ten(
         ctx: commands.Context,
-        pages: list,
+        pages: Pages,
         controls: dict,
         message: discord.Message,
         page: int,
@@ -145,7 +146,7 @@ async def back_ten(
 
 async def bclose_menu(
         ctx: commands.Context,
-        pages: list,
+        pages: Pages,
         controls: dict,
         message: discord.Message,
         page: int,
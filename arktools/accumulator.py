@@ -0,0 +1,107 @@
+import time
+import typing
+
+# How often accumulated playtime gets written back to the config
+FLUSH_INTERVAL = 600
+
+
+class PlaytimeAccumulator:
+    """
+    In-memory playtime and last seen data waiting to be written to the config
+
+    The player stats loop adds to this every tick and each guild's player data is written back
+    in a single config transaction per flush, instead of one full rewrite per online player.
+    It also tracks the map each player was last seen on, seeded once from the config when a guild's players
+    are loaded and kept up to date from then on, so the loop never has to read the players config itself
+    """
+    def __init__(self):
+        # guild ID -> xuid -> pending data
+        self.pending: typing.Dict[int, typing.Dict[str, dict]] = {}
+        # guild ID -> xuid -> map the player was last seen on, None once they've been unfriended
+        self.last_maps: typing.Dict[int, typing.Dict[str, typing.Optional[str]]] = {}
+        self.last_flush = time.monotonic()
+
+    @property
+    def dirty(self) -> typing.List[int]:
+        return [guild_id for guild_id, players in self.pending.items() if players]
+
+    def due(self) -> bool:
+        return time.monotonic() - self.last_flush >= FLUSH_INTERVAL
+
+    def seen_guild(self, guild_id: int) -> bool:
+        return bool(self.pending.get(guild_id))
+
+    # Playtime that hasn't been flushed yet, so readers can add it to what's in the config
+    def unflushed(self, guild_id: int, xuid: str) -> int:
+        player = self.pending.get(guild_id, {}).get(xuid)
+        if not player:
+            return 0
+        return sum(player["playtime"].values())
+
+    # Load last seen maps from a guild's players config, pending data is newer so it wins
+    def seed(self, guild_id: int, players: dict):
+        maps = {xuid: (data.get("lastseen") or {}).get("map") for xuid, data in players.items()}
+        for xuid, data in self.pending.get(guild_id, {}).items():
+            maps[xuid] = data["lastseen"]["map"]
+        self.last_maps[guild_id] = maps
+
+    def last_map(self, guild_id: int, xuid: str) -> typing.Optional[str]:
+        return self.last_maps.get(guild_id, {}).get(xuid)
+
+    def set_map(self, guild_id: int, xuid: str, mapstring: typing.Optional[str]):
+        self.last_maps.setdefault(guild_id, {})[xuid] = mapstring
+
+    def add(self, guild_id: int, xuid: str, mapstring: str, channel: str, seconds: int, timestamp: str):
+        players = self.pending.setdefault(guild_id, {})
+        player = players.get(xuid)
+        if not player:
+            player = {"playtime": {}, "channels": set(), "lastseen": None}
+            players[xuid] = player
+        player["playtime"][mapstring] = player["playtime"].get(mapstring, 0) + seconds
+        player["channels"].add(channel)
+        player["lastseen"] = {"time": timestamp, "map": mapstring}
+        self.set_map(guild_id, xuid, mapstring)
+
+    # Hand off everything pending for a guild, the caller writes it to the config
+    def take(self, guild_id: int) -> typing.Dict[str, dict]:
+        return self.pending.pop(guild_id, {})
+
+    # Put data back if a flush failed so nothing is lost
+    def restore(self, guild_id: int, players: typing.Dict[str, dict]):
+        current = self.pending.setdefault(guild_id, {})
+        for xuid, data in players.items():
+            if xuid not in current:
+                current[xuid] = data
+                continue
+            newer = current[xuid]
+            for mapstring, seconds in data["playtime"].items():
+                newer["playtime"][mapstring] = newer["playtime"].get(mapstring, 0) + seconds
+            newer["channels"] |= data["channels"]
+
+
+# Apply pending data to a guild's players config, returns the xuids whose total playtime changed
+def apply_pending(stats: dict, pending: typing.Dict[str, dict]) -> typing.List[str]:
+    updated = []
+    for xuid, data in pending.items():
+        if xuid not in stats:  # Player was deleted or pruned in the meantime
+            continue
+        player = stats[xuid]
+        for channel in data["channels"]:
+            if channel not in player["ingame"]:
+                player["ingame"][channel] = {
+                    "implant": None,
+                    "name": None,
+                    "previous_names": [],
+                    "stats": {
+                        "pvpkills": 0,
+                        "pvpdeaths": 0,
+                        "pvedeaths": 0,
+                        "tamed": 0
+                    }
+                }
+        for mapstring, seconds in data["playtime"].items():
+            player["playtime"][mapstring] = player["playtime"].get(mapstring, 0) + seconds
+            player["playtime"]["total"] += seconds
+        player["lastseen"] = data["lastseen"]
+        updated.append(xuid)
+    return updated
@@ -1,11 +1,11 @@
 import asyncio
 import datetime
+import io
 import json
 import logging
 import math
 import random
 import re
-import socket
 import sys
 import typing
 import os
@@ -15,24 +15,24 @@ import aiohttp
 import discord
 import pytz
 import tabulate
-import matplotlib
-import matplotlib.pyplot as plt
 from discord.ext import tasks
 from dislash import InteractionClient
-from rcon import Client
 from redbot.core import commands, Config
+from redbot.core.data_manager import cog_data_path
 from redbot.core.utils.chat_formatting import box, pagify
 from xbox.webapi.api.client import XboxLiveClient
 from xbox.webapi.authentication.manager import AuthenticationManager
 from xbox.webapi.authentication.models import OAuth2TokenResponse
 
+from .broadcast import Broadcaster, ALERT_DEADLINE, SAVE_DEADLINE, EXIT_DEADLINE, SAVE_GRACE
 from .buttonmenus import buttonmenu, DEFAULT_BUTTON_CONTROLS
 from .calls import Calls
+from .tokencache import TokenCache
+from .xboxbudget import XboxBudget, DEFAULT_RETRY, retry_after
 from .formatter import (
     time_from_string,
     decode,
     profile_format,
-    expired_players,
     overview_format,
     lb_format,
     tribe_lb_format,
@@ -40,17 +40,30 @@ from .formatter import (
     player_stats,
     detect_friends,
     fix_timestamp,
-    get_graph,
     time_formatter,
     detect_sus,
-    cleanup_config,
     IMSTUCK_BLUEPRINTS
 )
 from .menus import menu, DEFAULT_CONTROLS
 from .rcon import async_rcon
+from .outbound import OutboundQueue, split_lines, FLUSH_DELAY
+from .playerlist import PlayerList, ServerStatus, OFFLINE, EMPTY
+from .accumulator import PlaytimeAccumulator, apply_pending
+from .chatparser import ChatFilter, LineType, parse_getchat
+from .cleanup import CleanupJob
+from .discordout import ChannelBuffer, FLUSH_DELAY as DISCORD_FLUSH_DELAY
+from .graphrender import GraphRenderer
+from .graphstore import GraphStore, POINTS_PER_DAY
+from .health import HealthTracker
+from .itemgrant import ItemGrants
+from .rconpool import RconPool
+from .registry import PlayerRegistry
+from .routing import build_routes, EMPTY_ROUTES
+from .scheduler import PollScheduler
+from .settingscache import SettingsCache
+from .statusboard import StatusBoard, graph_file, graph_signature, page_hash
+from .votes import VoteSession, VoteTracker
 
-matplotlib.use("agg")
-plt.switch_backend("agg")
 
 log = logging.getLogger("red.vrt.arktools")
 
@@ -138,34 +151,70 @@ class ArkTools(Calls, commands.Cog):
         self.config.register_guild(**default_guild)
         self.config.register_global(**default_global)
 
+        # Authorized Xbox Live clients per host Gamertag, all Xbox calls share one session from get_session
+        self.xbl_tokens = TokenCache()
+        # Rate budget and sweep timings for the autofriend/maintenance loops' Xbox Live calls
+        self.budget = XboxBudget()
+
+        # Small guild settings without the player/graph data, refreshed whenever a command changes them
+        self.settings = SettingsCache(self.config)
+
         # Cache on cog load/core setting changes to reduce config reads
         self.activeguilds = []
         self.servers = []
-        self.channels = []
+        self.routes = EMPTY_ROUTES
         self.servercount = 0
         self.playerlist = {}
-        self.downtime = {}
         self.time = ""
 
         # Only fire certain warnings once so loops dont spam logs
         self.warnings = []
 
-        # Offline servers go into a queue to wait a minute before bot attempts to reconnect
-        self.queue = {}
+        # Playtime/last seen data waiting to be written to the config
+        self.playtime = PlaytimeAccumulator()
+
+        # Parsed in-game prefixes and blacklisted names per guild ID
+        self.chat_filters = {}
+
+        # Player lookup indexes per guild ID, built lazily from the players config
+        self.registries = {}
+
+        # Player count graph data per guild ID, kept in binary files under the cog data path
+        self.graphstores = {}
+        # Renders graphs in a worker process and caches the images
+        self.graphs = GraphRenderer()
+
+        # Circuit breaker and latency stats per server, keyed by chat channel ID
+        self.health = HealthTracker()
+
+        # Polling schedule for the getchat/listplayers commands
+        self.scheduler = PollScheduler()
+
+        # Persistent RCON connections shared by the task loops, crosschat and ArkShop
+        self.rcon_pool = RconPool()
+        # Item sends for bulksend, ArkShop and the in-game item commands, pipelined over the pool
+        self.items = ItemGrants(self.rcon_pool)
+        # Per-server outbound command queues, keyed by chat channel ID
+        self.outbound = {}
+        # Per-channel Discord message buffers for join/leave logs and chat relays, keyed by Discord channel ID
+        self.discord_out = {}
+
+        # Live status messages per guild ID, edited in place each cycle
+        self.statusboards = {}
+
+        # Background config cleanup per guild ID
+        self.cleanup_jobs = {}
 
         # In-Game voting sessions
-        self.votes = {}
+        self.votes = VoteTracker(self.vote_expired)
         self.lastran = {}
 
         # Task Loops
-        self.getchat.start()
-        self.listplayers.start()
+        self.poll_servers.start()
         self.status_channel.start()
         self.player_stats.start()
         self.maintenance.start()
         self.autofriend.start()
-        self.vote_sessions.start()
-        self.graphdata_prune.start()
         self.gather_graphdata.start()
 
         # Windows is dumb, set asyncio event loop selector policy for it, not even sure if this helps tbh
@@ -174,18 +223,29 @@ class ArkTools(Calls, commands.Cog):
             log.info(f"Setting EventLoopSelector For {sys.platform}")
 
     def cog_unload(self):
-        self.getchat.cancel()
-        self.listplayers.cancel()
+        self.poll_servers.cancel()
+        for task in self.scheduler.inflight.values():
+            task.cancel()
         self.status_channel.cancel()
         self.player_stats.cancel()
         self.maintenance.cancel()
         self.autofriend.cancel()
-        self.vote_sessions.cancel()
-        self.graphdata_prune.cancel()
+        self.votes.close()
         self.gather_graphdata.cancel()
         for task in asyncio.all_tasks():
             if "ArkTools" in task.get_name() and "giveitemtoplayer" not in task.get_name().lower():
                 task.cancel()
+        self.rcon_pool.close()
+        self.graphs.close()
+        if self.session:
+            asyncio.create_task(self.session.close())
+        if self.playtime.dirty:
+            asyncio.create_task(self.flush_playtime())
+
+    # Any command in a guild may have changed its settings
+    async def cog_after_invoke(self, ctx: commands.Context):
+        if ctx.guild:
+            self.settings.invalidate(ctx.guild.id)
 
     # Just grab azure credentials from the config, only bot owner needs to set this and its optional
     async def get_azure_credentials(self):
@@ -236,6 +296,12 @@ class ArkTools(Calls, commands.Cog):
             guild: discord.guild = None
     ):
         name = f"{sname} {cname}"
+        if not guild:
+            guild = ctx.guild
+        # Reuse the client until its XSTS token is about to expire
+        cached = self.xbl_tokens.get((guild.id, cname, sname))
+        if cached:
+            return cached.client, cached.token
         client_id, client_secret = await self.get_azure_credentials()
         if not client_id:  # Owner hasnt set client id yet
             if ctx:
@@ -280,11 +346,16 @@ class ArkTools(Calls, commands.Cog):
                 await ctx.send(f"Tokens have failed to refresh for {name}")
             return None, None
         else:
-            if not guild:
-                guild = ctx.guild
             if refreshed_tokens:  # Make sure refresh tokens arent null
                 async with self.config.guild(guild).clusters() as clusters:
                     clusters[cname]["servers"][sname]["tokens"] = refreshed_tokens
+                self.settings.invalidate(guild.id)
+            self.xbl_tokens.set(
+                (guild.id, cname, sname),
+                xbl_client,
+                xsts_token,
+                xbl_client._auth_mgr.xsts_token.not_after
+            )
             return xbl_client, xsts_token
 
     # Initialize a map to a player in the config
@@ -309,6 +380,7 @@ class ArkTools(Calls, commands.Cog):
                         "tamed": 0
                     }
                 }
+                self.index_player(guild, xuid, conf[xuid])
 
     # Update an existing players in-game name
     async def update_name(self, guild: discord.guild, server_id: str, xuid: str, character_name: str):
@@ -320,25 +392,43 @@ class ArkTools(Calls, commands.Cog):
                 if saved_name not in conf[xuid]["ingame"][server_id]["previous_names"]:
                     conf[xuid]["ingame"][server_id]["previous_names"].append(saved_name)
                 conf[xuid]["ingame"][server_id]["name"] = character_name
-
-    # If a server goes offline it will be added to the queue and task loops will wait before trying to call it again
-    async def in_queue(self, channel: str) -> bool:
-        now = datetime.datetime.now()
-        if channel in self.queue:
-            td = now - self.queue[channel]
-            td = td.total_seconds()
-            if td < 120:
-                return True
-            else:
-                return False
+            self.index_player(guild, xuid, conf[xuid])
+
+    # Player registry, other cogs should use the xuid_from_* methods instead of scanning the players config
+    async def get_registry(self, guild: discord.guild) -> PlayerRegistry:
+        registry = self.registries.get(guild.id)
+        if registry is None:
+            players = await self.config.guild(guild).players()
+            registry = PlayerRegistry(players)
+            self.playtime.seed(guild.id, players)
+            # Playtime that hasn't been flushed yet has newer last seen times than the config
+            for xuid, data in self.playtime.pending.get(guild.id, {}).items():
+                registry.seen(xuid, datetime.datetime.fromisoformat(data["lastseen"]["time"]).timestamp())
+            self.registries[guild.id] = registry
+        return registry
+
+    # Reindex a player after their data was changed, call this inside the config context that changed them
+    def index_player(self, guild: discord.guild, xuid: str, data: dict = None):
+        registry = self.registries.get(guild.id)
+        if registry is None:
+            return
+        if data is None:
+            registry.remove(xuid)
         else:
-            return False
+            registry.update(xuid, data)
+
+    async def xuid_from_discord(self, guild: discord.guild, user_id: int) -> typing.Optional[str]:
+        return (await self.get_registry(guild)).by_discord(user_id)
 
-    def add_queue(self, channel: str) -> None:
-        if channel not in self.queue:
-            self.queue[channel] = datetime.datetime.now()
+    async def xuid_from_gamertag(self, guild: discord.guild, gamertag: str) -> typing.Optional[str]:
+        return (await self.get_registry(guild)).by_gamertag(gamertag)
+
+    async def xuid_from_character(self, guild: discord.guild, character_name: str) -> typing.Optional[str]:
+        return (await self.get_registry(guild)).by_character(character_name)
 
     async def tribelog_sendoff(self, guild, settings, server, logs):
+        # Tribes aren't part of the settings snapshot
+        tribes = await self.config.guild(guild).tribes()
         for msg in logs:
             try:
                 tribe_id, embed = await self.tribelog_format(server, msg)
@@ -350,8 +440,8 @@ class ArkTools(Calls, commands.Cog):
                     perms = masterlog.permissions_for(guild.me).send_messages
                     if perms:
                         await masterlog.send(embed=embed)
-                if tribe_id in settings["tribes"]:
-                    tribechannel = guild.get_channel(settings["tribes"][tribe_id]["channel"])
+                if tribe_id in tribes:
+                    tribechannel = guild.get_channel(tribes[tribe_id]["channel"])
                     if tribechannel:
                         perms = tribechannel.permissions_for(guild.me).send_messages
                         if perms:
@@ -418,7 +508,7 @@ class ArkTools(Calls, commands.Cog):
                         victim = re.search(reg, action).group(1)
                         if victim not in tr["members"]:
                             tr["members"].append(victim)
-                        uid = await self.get_uid(players, victim)
+                        uid = await self.get_uid(guild, players, victim)
                         if uid:
                             if server_id not in players[uid]["ingame"]:
                                 players[uid]["ingame"][server_id] = playerdata
@@ -430,13 +520,13 @@ class ArkTools(Calls, commands.Cog):
                         victim = data[0]  # PVP DEATH
                         if victim not in tr["members"]:
                             tr["members"].append(victim)
-                        uid = await self.get_uid(players, victim)
+                        uid = await self.get_uid(guild, players, victim)
                         if uid:
                             if server_id not in players[uid]["ingame"]:
                                 players[uid]["ingame"][server_id] = playerdata
                             players[uid]["ingame"][server_id]["stats"]["pvpdeaths"] += 1
                         killer = data[1]  # PVP KILL
-                        uid = await self.get_uid(players, killer)
+                        uid = await self.get_uid(guild, players, killer)
                         if uid:
                             if server_id not in players[uid]["ingame"]:
                                 players[uid]["ingame"][server_id] = playerdata
@@ -448,7 +538,7 @@ class ArkTools(Calls, commands.Cog):
                         victim = re.search(reg, action).group(1)
                         if victim not in tr["members"]:
                             tr["members"].append(victim)
-                        uid = await self.get_uid(players, victim)
+                        uid = await self.get_uid(guild, players, victim)
                         if uid:
                             if server_id not in players[uid]["ingame"]:
                                 players[uid]["ingame"][server_id] = playerdata
@@ -479,7 +569,7 @@ class ArkTools(Calls, commands.Cog):
             elif "tamed" in action.lower():
                 reg = r'(.+) Tamed'
                 tamer = re.search(reg, action).group(1)
-                uid = await self.get_uid(players, tamer)
+                uid = await self.get_uid(guild, players, tamer)
                 if uid:
                     if server_id not in players[uid]["ingame"]:
                         players[uid]["ingame"][server_id] = playerdata
@@ -507,8 +597,7 @@ class ArkTools(Calls, commands.Cog):
         return tribe_id, embed
 
     # Fetch a user ID from a given character name if it exists
-    @staticmethod
-    async def get_uid(players: dict, character_name: str) -> str:
+    async def get_uid(self, guild: discord.guild, players: dict, character_name: str) -> str:
         if isinstance(character_name, tuple):
             character_name = character_name[0]
             if not character_name:
@@ -517,13 +606,9 @@ class ArkTools(Calls, commands.Cog):
             return ""
         if character_name.lower() in ["human", "humano"]:
             return ""  # Dont bother logging players that dont name their character
-        for uid, data in players.items():
-            ig = data["ingame"]
-            for channel, details in ig.items():
-                if "name" in details:
-                    name = details["name"]
-                    if name == character_name:
-                        return uid
+        uid = await self.xuid_from_character(guild, character_name)
+        if uid in players:
+            return uid
 
     # Cleans up the most recent live embed posted in the status channel
     async def status_cleaner(self, status: dict):
@@ -593,13 +678,14 @@ class ArkTools(Calls, commands.Cog):
             arg = cmd[1]
         return command, arg
 
-    # Find xuid from given gamertag
-    @staticmethod
-    async def get_player(gamertag: str, players: dict):
-        for xuid, stats in players.items():
-            if gamertag.lower() == stats["username"].lower():
-                return xuid, stats
-        else:
+    # Look up a single player without pulling every player from the config
+    async def fetch_player(self, guild: discord.guild, gamertag: str):
+        xuid = await self.xuid_from_gamertag(guild, gamertag)
+        if not xuid:
+            return None, None
+        try:
+            return xuid, await self.config.guild(guild).players.get_raw(xuid)
+        except KeyError:
             return None, None
 
     # Is player registered in-game on a server?
@@ -618,13 +704,10 @@ class ArkTools(Calls, commands.Cog):
         if implant:
             return implant
 
-    @staticmethod
-    async def check_reg_status(settings: dict, uid: int):
-        stats = settings["players"]
-        for xuid, stat in stats.items():
-            if "discord" in stat:
-                if stat["discord"] == uid:
-                    return stat["username"]
+    async def check_reg_status(self, guild: discord.guild, settings: dict, uid: int):
+        xuid = await self.xuid_from_discord(guild, uid)
+        if xuid in settings["players"]:
+            return settings["players"][xuid]["username"]
 
     @commands.command(name="xboxdm", aliases=["xdm"])
     @commands.guild_only()
@@ -654,25 +737,25 @@ class ArkTools(Calls, commands.Cog):
             return await ctx.send("That server has no tokens")
         tokens = clusters[cname]["servers"][sname]["tokens"]
         async with ctx.typing():
-            async with aiohttp.ClientSession() as session:
-                xbl_client, token = await self.auth_manager(
-                    session,
-                    cname,
-                    sname,
-                    tokens,
-                    ctx
-                )
-                if xbl_client:
-                    try:
-                        await xbl_client.message.send_message(xuid, message)
-                        sent = True
-                    except Exception as e:
-                        log.warning(f"{sname} {cname} failed to send a message to {xuid}: {e}")
-                        sent = False
-                if sent:
-                    await ctx.tick()
-                else:
-                    await ctx.send("Message failed to send!")
+            session = self.get_session()
+            xbl_client, token = await self.auth_manager(
+                session,
+                cname,
+                sname,
+                tokens,
+                ctx
+            )
+            if xbl_client:
+                try:
+                    await xbl_client.message.send_message(xuid, message)
+                    sent = True
+                except Exception as e:
+                    log.warning(f"{sname} {cname} failed to send a message to {xuid}: {e}")
+                    sent = False
+            if sent:
+                await ctx.tick()
+            else:
+                await ctx.send("Message failed to send!")
 
     # Hard coded item send for those hard times
     # Sends some in-game items that can help get a player unstuck, or just kill themselves
@@ -741,6 +824,8 @@ class ArkTools(Calls, commands.Cog):
     async def wipe_all_data(self, ctx: commands.Context):
         """Wipe ALL ArkTools cog data"""
         await self.config.guild(ctx.guild).clear()
+        self.registries.pop(ctx.guild.id, None)
+        await self.delete_graphstore(ctx.guild)
         await ctx.tick()
 
     # Deletes all player data in the config
@@ -755,6 +840,7 @@ class ArkTools(Calls, commands.Cog):
         """
         async with self.config.guild(ctx.guild).all() as data:
             data["players"].clear()
+            self.registries.pop(ctx.guild.id, None)
             await ctx.send(embed=discord.Embed(description="All player data has been wiped."))
 
     # Reset graph data
@@ -763,11 +849,10 @@ class ArkTools(Calls, commands.Cog):
     @commands.guild_only()
     async def wipe_graph_data(self, ctx: commands.Context):
         """Reset the player count graph data"""
-        async with self.config.guild(ctx.guild).all() as settings:
-            for sname, slist in settings["serverstats"].items():
-                if sname != "expiration":
-                    slist.clear()
-            await ctx.tick()
+        store = await self.get_graphstore(ctx.guild)
+        store.clear()
+        store.save()
+        await ctx.tick()
 
     # Reset tribe data
     @commands.command(name="wipetribedata")
@@ -796,6 +881,7 @@ class ArkTools(Calls, commands.Cog):
             for xuid, gamertag in unreg:
                 await ctx.send(f"{member.mention} has been unregistered from the Gamertag {gamertag}")
                 del players[xuid]["discord"]
+                self.index_player(ctx.guild, xuid, players[xuid])
 
     # Lets a player unregister themselves
     @commands.command(name="unregisterme")
@@ -818,6 +904,7 @@ class ArkTools(Calls, commands.Cog):
             for xuid, gamertag in unreg:
                 await ctx.send(f"Unregistered you from {gamertag}!")
                 del players[xuid]["discord"]
+                self.index_player(ctx.guild, xuid, players[xuid])
 
     @commands.command(name="unregistergt")
     @commands.admin()
@@ -836,6 +923,7 @@ class ArkTools(Calls, commands.Cog):
                 user = ctx.guild.get_member(user)
                 await ctx.send(f"Removed {user} from {gamertag}")
                 del players[xuid]["discord"]
+                self.index_player(ctx.guild, xuid, players[xuid])
 
     # Delete a player from the player data
     @commands.command(name="deleteplayer")
@@ -847,6 +935,7 @@ class ArkTools(Calls, commands.Cog):
             for pid, data in players.items():
                 if str(xuid) == str(pid):
                     del players[pid]
+                    self.index_player(ctx.guild, pid)
                     return await ctx.tick()
 
     # Initializes a player to the stats section, or appends their discord ID to existing gamertag in database
@@ -859,7 +948,7 @@ class ArkTools(Calls, commands.Cog):
             return message.author == ctx.author and message.channel == ctx.channel
 
         settings = await self.config.guild(ctx.guild).all()
-        user = await self.check_reg_status(settings, ctx.author.id)
+        user = await self.check_reg_status(ctx.guild, settings, ctx.author.id)
         if user:
             return await ctx.send(f"You are already registered as **{user}**\n"
                                   f"If you want to re-register, type `{ctx.prefix}unregisterme` "
@@ -934,53 +1023,54 @@ class ArkTools(Calls, commands.Cog):
             )
             embed.set_thumbnail(url=LOADING)
             await msg.edit(embed=embed)
-            async with aiohttp.ClientSession() as session:
-                tokens, cname, sname = self.pull_key(clusters)
-                xbl_client, _ = await self.auth_manager(session, cname, sname, tokens, ctx)
-                if not xbl_client:
-                    return
-                try:
-                    profile_data = json.loads((await xbl_client.profile.get_profile_by_gamertag(gamertag)).json())
-                except aiohttp.ClientResponseError:
-                    embed = discord.Embed(
-                        description=f"Looks like **{gamertag}** is an invalid Gamertag. Try again.",
-                        color=discord.Color.red()
-                    )
-                    return await msg.edit(embed=embed)
-                # Format json data
-                gt, xuid, gs, pfp = profile_format(profile_data)
-                async with self.config.guild(ctx.guild).players() as players:
-                    if xuid in players:
-                        if "discord" in players[xuid]:
-                            if players[xuid]["discord"] != ctx.author.id:
-                                claimed = ctx.guild.get_member(players[xuid]["discord"])
-                                if claimed:  # If user is still in guild
-                                    embed = discord.Embed(
-                                        description=f"{claimed.mention} has already claimed this Gamertag",
-                                        color=discord.Color.orange()
-                                    )
-                                    return await msg.edit(embed=embed)
-                                else:
-                                    # Original claim user left guild so that gamertag is up for grabs
-                                    players[xuid]["discord"] = ctx.author.id
-                            if players[xuid]["discord"] == ctx.author.id:
+            session = self.get_session()
+            tokens, cname, sname = self.pull_key(clusters)
+            xbl_client, _ = await self.auth_manager(session, cname, sname, tokens, ctx)
+            if not xbl_client:
+                return
+            try:
+                profile_data = json.loads((await xbl_client.profile.get_profile_by_gamertag(gamertag)).json())
+            except aiohttp.ClientResponseError:
+                embed = discord.Embed(
+                    description=f"Looks like **{gamertag}** is an invalid Gamertag. Try again.",
+                    color=discord.Color.red()
+                )
+                return await msg.edit(embed=embed)
+            # Format json data
+            gt, xuid, gs, pfp = profile_format(profile_data)
+            async with self.config.guild(ctx.guild).players() as players:
+                if xuid in players:
+                    if "discord" in players[xuid]:
+                        if players[xuid]["discord"] != ctx.author.id:
+                            claimed = ctx.guild.get_member(players[xuid]["discord"])
+                            if claimed:  # If user is still in guild
                                 embed = discord.Embed(
-                                    description=f"You have already claimed this Gamertag",
-                                    color=discord.Color.green()
+                                    description=f"{claimed.mention} has already claimed this Gamertag",
+                                    color=discord.Color.orange()
                                 )
                                 return await msg.edit(embed=embed)
-                        players[xuid]["discord"] = ctx.author.id
-                    else:
-                        players[xuid] = {
-                            "discord": ctx.author.id,
-                            "username": gt,
-                            "playtime": {"total": 0},
-                            "lastseen": {
-                                "time": datetime.datetime.now(pytz.timezone("UTC")).isoformat(),
-                                "map": None
-                            },
-                            "ingame": {}
-                        }
+                            else:
+                                # Original claim user left guild so that gamertag is up for grabs
+                                players[xuid]["discord"] = ctx.author.id
+                        if players[xuid]["discord"] == ctx.author.id:
+                            embed = discord.Embed(
+                                description=f"You have already claimed this Gamertag",
+                                color=discord.Color.green()
+                            )
+                            return await msg.edit(embed=embed)
+                    players[xuid]["discord"] = ctx.author.id
+                else:
+                    players[xuid] = {
+                        "discord": ctx.author.id,
+                        "username": gt,
+                        "playtime": {"total": 0},
+                        "lastseen": {
+                            "time": datetime.datetime.now(pytz.timezone("UTC")).isoformat(),
+                            "map": None
+                        },
+                        "ingame": {}
+                    }
+                self.index_player(ctx.guild, xuid, players[xuid])
             rem = f"If the image above does not match your Gamertag, use '{ctx.prefix}unregisterme' and try again"
             embed = discord.Embed(
                 title="✅ Registration Successful!",
@@ -1081,6 +1171,7 @@ class ArkTools(Calls, commands.Cog):
                     },
                     "ingame": {}
                 }
+            self.index_player(ctx.guild, uid, players[uid])
         embed = discord.Embed(
             description=f"Your {nametype} has been set to `{username}`\n"
                         f"{id_type}: `{uid}`",
@@ -1101,11 +1192,9 @@ class ArkTools(Calls, commands.Cog):
         This command requires api keys to be set for the servers
         """
         players = await self.config.guild(ctx.guild).players()
-        for xuid in players:
-            if "discord" in players[xuid]:
-                if ctx.author.id == players[xuid]["discord"]:
-                    ptag = players[xuid]["username"]
-                    break
+        xuid = await self.xuid_from_discord(ctx.guild, ctx.author.id)
+        if xuid in players:
+            ptag = players[xuid]["username"]
         else:
             embed = discord.Embed(description=f"You havent registered yet!\n\n"
                                               f"Register with the `{ctx.prefix}register` command.")
@@ -1160,27 +1249,27 @@ class ArkTools(Calls, commands.Cog):
                 for sname, server in cluster["servers"].items():
                     if "tokens" in server:
                         tokendata = server["tokens"]
-                        async with aiohttp.ClientSession() as session:
-                            xbl_client, token = await self.auth_manager(session, cname, sname, tokendata, ctx)
-                            if not xbl_client:
-                                addstatus += f"`{server['gamertag']}: `❌\n"
-                                continue
-                            status = await self.add_friend(xuid, token)
-                            if 200 <= status <= 204:
-                                embed = discord.Embed(
-                                    description=f"Friend request sent from... `{server['gamertag']}`",
-                                    color=discord.Color.green()
-                                )
-                                embed.set_thumbnail(url=LOADING)
-                                addstatus += f"`{server['gamertag']}: `✅\n"
-                            else:
-                                embed = discord.Embed(
-                                    description=f"Friend request from `{server['gamertag']}` may have failed!",
-                                    color=discord.Color.red()
-                                )
-                                embed.set_thumbnail(url=FAILED)
-                                addstatus += f"`{server['gamertag']}: `❌\n"
-                            await msg.edit(embed=embed)
+                        session = self.get_session()
+                        xbl_client, token = await self.auth_manager(session, cname, sname, tokendata, ctx)
+                        if not xbl_client:
+                            addstatus += f"`{server['gamertag']}: `❌\n"
+                            continue
+                        status = await self.add_friend(xuid, token)
+                        if 200 <= status <= 204:
+                            embed = discord.Embed(
+                                description=f"Friend request sent from... `{server['gamertag']}`",
+                                color=discord.Color.green()
+                            )
+                            embed.set_thumbnail(url=LOADING)
+                            addstatus += f"`{server['gamertag']}: `✅\n"
+                        else:
+                            embed = discord.Embed(
+                                description=f"Friend request from `{server['gamertag']}` may have failed!",
+                                color=discord.Color.red()
+                            )
+                            embed.set_thumbnail(url=FAILED)
+                            addstatus += f"`{server['gamertag']}: `❌\n"
+                        await msg.edit(embed=embed)
             embed = discord.Embed(color=discord.Color.green(),
                                   description=f"✅ Finished adding `{players[xuid]['username']}` for All Gamertags.\n"
                                               f"You should now be able to join from the Gamertags' profile page.")
@@ -1212,35 +1301,45 @@ class ArkTools(Calls, commands.Cog):
             )
             embed.set_thumbnail(url=LOADING)
             await msg.edit(embed=embed)
-            async with aiohttp.ClientSession() as session:
-                xbl_client, token = await self.auth_manager(session, cname, sname, tokendata, ctx)
-                if not xbl_client:
-                    embed = discord.Embed(
-                        description=f"Friend request from `{gt}` may have failed!",
-                        color=discord.Color.red()
-                    )
-                    embed.set_thumbnail(url=FAILED)
-                    return await msg.edit(embed=embed)
-                status = await self.add_friend(xuid, token)
-                if 200 <= status <= 204:
-                    embed = discord.Embed(color=discord.Color.green(),
-                                          description=f"✅ `{gt}` Successfully added `{ptag}`\n"
-                                                      f"You should now be able to join from the Gamertag's"
-                                                      f" profile page.\n\n"
-                                                      f"**TO ADD MORE:** type `{ctx.prefix}addme` again.")
-                    embed.set_author(name="Success", icon_url=ctx.author.avatar_url)
-                    embed.set_thumbnail(url=SUCCESS)
-                else:
-                    embed = discord.Embed(
-                        description=f"Friend request from `{gt}` may have failed!",
-                        color=discord.Color.red()
-                    )
-                    embed.set_thumbnail(url=FAILED)
-                await msg.edit(embed=embed)
+            session = self.get_session()
+            xbl_client, token = await self.auth_manager(session, cname, sname, tokendata, ctx)
+            if not xbl_client:
+                embed = discord.Embed(
+                    description=f"Friend request from `{gt}` may have failed!",
+                    color=discord.Color.red()
+                )
+                embed.set_thumbnail(url=FAILED)
+                return await msg.edit(embed=embed)
+            status = await self.add_friend(xuid, token)
+            if 200 <= status <= 204:
+                embed = discord.Embed(color=discord.Color.green(),
+                                      description=f"✅ `{gt}` Successfully added `{ptag}`\n"
+                                                  f"You should now be able to join from the Gamertag's"
+                                                  f" profile page.\n\n"
+                                                  f"**TO ADD MORE:** type `{ctx.prefix}addme` again.")
+                embed.set_author(name="Success", icon_url=ctx.author.avatar_url)
+                embed.set_thumbnail(url=SUCCESS)
+            else:
+                embed = discord.Embed(
+                    description=f"Friend request from `{gt}` may have failed!",
+                    color=discord.Color.red()
+                )
+                embed.set_thumbnail(url=FAILED)
+            await msg.edit(embed=embed)
         else:
             color = discord.Color.dark_grey()
             return await msg.edit(embed=discord.Embed(description="Incorrect Reply, menu closed.", color=color))
 
+    # Post an embed in the chat channel of each server
+    @staticmethod
+    async def send_to_maps(guild: discord.guild, servers: typing.List[dict], embed: discord.Embed):
+        sends = []
+        for server in servers:
+            mapchannel = guild.get_channel(server["chatchannel"])
+            if mapchannel:
+                sends.append(mapchannel.send(embed=embed))
+        await asyncio.gather(*sends, return_exceptions=True)
+
     # Send off an RCON command to a selected server
     @commands.command(name="rcon")
     @commands.guild_only()
@@ -1266,45 +1365,34 @@ class ArkTools(Calls, commands.Cog):
         cd = settings["countdown"]
         if command.lower() == "doexit" and cd:  # Count down, save world, exit - for clean shutdown
             await ctx.send(f"Beginning {cd} second reboot countdown...")
-            alerts = []
+            reboot = Broadcaster(serverlist, lambda server, cmd: self.executor(ctx.guild, server, cmd))
             async with ctx.typing():
-                for server in serverlist:
-                    mapchannel = ctx.guild.get_channel(server["chatchannel"])
-                    msg = f"Reboot will commence in {cd} seconds.\n" \
-                          f"Make sure you are in a bed to avoid your character dying!"
-                    embed = discord.Embed(
-                        title="INCOMING REBOOT",
-                        description=msg,
-                        color=discord.Color.orange()
-                    )
-                    await mapchannel.send(embed=embed)
-                    broadcast = f'<RichColor Color="1,0,0,1">SERVER REBOOT IN {cd} SECONDS</>\n' \
-                                f'Make sure you are in a bed to avoid your character dying!'
-                    alerts.append(self.executor(ctx.guild, server, f"broadcast {broadcast}"))
-                await asyncio.gather(*alerts)
-                for i in range(cd, 0, -1):
-                    counting = []
-                    for server in serverlist:
-                        counting.append(self.executor(ctx.guild, server, f"serverchat Reboot in {i}"))
-                    await asyncio.gather(*counting)
-                    await asyncio.sleep(1)
+                msg = f"Reboot will commence in {cd} seconds.\n" \
+                      f"Make sure you are in a bed to avoid your character dying!"
+                embed = discord.Embed(
+                    title="INCOMING REBOOT",
+                    description=msg,
+                    color=discord.Color.orange()
+                )
+                await self.send_to_maps(ctx.guild, serverlist, embed)
+                broadcast = f'<RichColor Color="1,0,0,1">SERVER REBOOT IN {cd} SECONDS</>\n' \
+                            f'Make sure you are in a bed to avoid your character dying!'
+                await reboot.phase("Alert", f"broadcast {broadcast}", ALERT_DEADLINE)
+                await reboot.countdown(cd, lambda i: f"serverchat Reboot in {i}")
                 await ctx.send("Saving maps...")
-                save = []
-                for server in serverlist:
-                    mapchannel = ctx.guild.get_channel(server["chatchannel"])
-                    embed = discord.Embed(
-                        description="Saving map and exiting...",
-                        color=discord.Color.purple()
-                    )
-                    await mapchannel.send(embed=embed)
-                    save.append(self.executor(ctx.guild, server, f"saveworld"))
-                await asyncio.gather(*save)
-                await asyncio.sleep(2)
+                embed = discord.Embed(
+                    description="Saving map and exiting...",
+                    color=discord.Color.purple()
+                )
+                await self.send_to_maps(ctx.guild, serverlist, embed)
+                await reboot.phase("Save", "saveworld", SAVE_DEADLINE)
+                await asyncio.sleep(SAVE_GRACE)
                 await ctx.send("Running DoExit...")
-                exiting = []
-                for server in serverlist:
-                    exiting.append(self.executor(ctx.guild, server, f"doexit"))
-                await asyncio.gather(*exiting)
+                await reboot.phase("Exit", "doexit", EXIT_DEADLINE)
+            phases = ["Alert", "Save", "Exit"]
+            table = tabulate.tabulate(reboot.table(phases), ["Server"] + phases + ["Countdown"], tablefmt="presto")
+            for p in pagify(table):
+                await ctx.send(box(p, lang="python"))
         else:
             rtasks = []
             for server in serverlist:
@@ -1315,66 +1403,66 @@ class ArkTools(Calls, commands.Cog):
             player_id = str(re.search(r'(\d+)', command).group(1))
             blocked = ""
             async with ctx.typing():
-                async with aiohttp.ClientSession() as session:
-                    for server in serverlist:
-                        if "tokens" in server:
-                            tokens = server["tokens"]
-                            host = server["gamertag"]
-                            xbl_client, token = await self.auth_manager(
-                                session,
-                                server["cluster"],
-                                server["name"],
-                                tokens,
-                                None,
-                                ctx.guild
-                            )
-                            if token:
-                                try:
-                                    status = await self.block_player(int(player_id), token)
-                                except Exception as e:
-                                    if "semaphore" in str(e):
-                                        pass
-                                if 200 <= status <= 204:
-                                    blocked += f"{host} Successfully blocked XUID: {player_id}\n"
-                                else:
-                                    blocked += f"{host} Failed to block XUID: {player_id} - Status: {status}\n"
+                session = self.get_session()
+                for server in serverlist:
+                    if "tokens" in server:
+                        tokens = server["tokens"]
+                        host = server["gamertag"]
+                        xbl_client, token = await self.auth_manager(
+                            session,
+                            server["cluster"],
+                            server["name"],
+                            tokens,
+                            None,
+                            ctx.guild
+                        )
+                        if token:
+                            try:
+                                status = await self.block_player(int(player_id), token)
+                            except Exception as e:
+                                if "semaphore" in str(e):
+                                    pass
+                            if 200 <= status <= 204:
+                                blocked += f"{host} Successfully blocked XUID: {player_id}\n"
                             else:
-                                blocked += f"{host} Failed to block XUID: {player_id}"
+                                blocked += f"{host} Failed to block XUID: {player_id} - Status: {status}\n"
+                        else:
+                            blocked += f"{host} Failed to block XUID: {player_id}"
 
-                    if blocked:
-                        await ctx.send(box(blocked, lang="python"))
+                if blocked:
+                    await ctx.send(box(blocked, lang="python"))
 
         if command.lower().startswith("unbanplayer"):  # Have the host Gamertags unblock the user
             player_id = str(re.search(r'(\d+)', command).group(1))
             unblocked = ""
             async with ctx.typing():
-                async with aiohttp.ClientSession() as session:
-                    for server in serverlist:
-                        if "tokens" in server:
-                            tokens = server["tokens"]
-                            host = server["gamertag"]
-                            xbl_client, token = await self.auth_manager(
-                                session,
-                                server["cluster"],
-                                server["name"],
-                                tokens,
-                                None,
-                                ctx.guild
-                            )
-                            if token:
-                                try:
-                                    status = await self.unblock_player(int(player_id), token)
-                                except Exception as e:
-                                    if "semaphore" in str(e):
-                                        pass
-                                if 200 <= status <= 204:
-                                    unblocked += f"{host} Successfully unblocked XUID: {player_id}\n"
-                                else:
-                                    unblocked += f"{host} Failed to unblock XUID: {player_id} - Status: {status}\n"
+                session = self.get_session()
+                for server in serverlist:
+                    if "tokens" in server:
+                        tokens = server["tokens"]
+                        host = server["gamertag"]
+                        xbl_client, token = await self.auth_manager(
+                            session,
+                            server["cluster"],
+                            server["name"],
+                            tokens,
+                            None,
+                            ctx.guild
+                        )
+                        if token:
+                            try:
+                                status = await self.unblock_player(int(player_id), token)
+                            except Exception as e:
+                                if "semaphore" in str(e):
+                                    pass
+                            if 200 <= status <= 204:
+                                unblocked += f"{host} Successfully unblocked XUID: {player_id}\n"
                             else:
-                                unblocked += f"{host} Failed to unblock XUID: {player_id}\n"
-                    if unblocked:
-                        await ctx.send(box(unblocked, lang="python"))
+                                unblocked += f"{host} Failed to unblock XUID: {player_id} - Status: {status}\n"
+                        else:
+                            unblocked += f"{host} Failed to unblock XUID: {player_id}\n"
+                if unblocked:
+                    await ctx.send(box(unblocked, lang="python"))
 
     @commands.command(name="bulksend")
     @commands.guild_only()
@@ -1408,26 +1496,22 @@ class ArkTools(Calls, commands.Cog):
         server = self.compile_servers(ctx.guild, cname, sname)
         server = dict(server[0])  # was getting incorrect type inspection idk
         await ctx.send("Sending items in bulk")
-        command = f"giveitemtoplayer {implant_id} {blueprint_string}"
-
-        def sender():
-            try:
-                with Client(
-                        host=server['ip'],
-                        port=server['port'],
-                        passwd=server['password'],
-                        timeout=10
-                ) as client:
-                    for i in range(count):
-                        client.run(command)
-            except socket.timeout:
-                return
-            except Exception as e:
-                log.warning(f"Bulksend Error: {e}")
-
+        name = f"{sname} {cname}"
         async with ctx.typing():
-            await self.bot.loop.run_in_executor(None, sender)
-        await ctx.send("Bulk send complete")
+            delivery = await self.items.grant(
+                [(name, server)],
+                implant_id,
+                [blueprint_string],
+                repeat=count,
+                # Running the same bulksend again after it stops only sends the rest
+                delivery_id=f"bulksend-{ctx.guild.id}-{ctx.author.id}-{name}-{implant_id}-{count}-{blueprint_string}"
+            )
+        result = delivery.servers[name]
+        if result.done:
+            await ctx.send("Bulk send complete")
+        else:
+            await ctx.send(f"Bulk send stopped after {result.confirmed}/{result.total} items, the server may be down. "
+                           f"Run the same command again to send the rest")
 
     @staticmethod
     def allowed_to_run(ctx: commands.Context, settings: dict, command: str):
@@ -1473,7 +1557,7 @@ class ArkTools(Calls, commands.Cog):
     @commands.is_owner()
     @commands.guild_only()
     async def init_config(self, ctx):
-        await self.initialize()
+        await self.initialize(cleanup=True)
         await ctx.tick()
 
     # STAT COMMANDS
@@ -1487,12 +1571,14 @@ class ArkTools(Calls, commands.Cog):
                               description=f"Gathering Data...")
         embed.set_thumbnail(url=LOADING)
         msg = await ctx.send(embed=embed)
-        settings = await self.config.guild(ctx.guild).all()
+        timezone = await self.config.guild(ctx.guild).timezone()
+        store = await self.get_graphstore(ctx.guild)
         if not hours:
             hours = 1
         # Convert to float and back to int to handle if someone types a float
         hours = float(hours)
-        file = await get_graph(settings, int(hours))
+        png = await self.graphs.render(ctx.guild.id, store, timezone, int(hours))
+        file = discord.File(io.BytesIO(png), filename="plot.png") if png else None
         await msg.delete()
         if file:
             await ctx.send(file=file)
@@ -1504,9 +1590,10 @@ class ArkTools(Calls, commands.Cog):
     @commands.guild_only()
     async def ark_playtime_overview(self, ctx: commands.Context):
         """View overview of players playtimes"""
-        stats = await self.config.guild(ctx.guild).players()
+        await self.flush_playtime(ctx.guild)
+        registry = await self.get_registry(ctx.guild)
         tz = await self.config.guild(ctx.guild).timezone()
-        pages = overview_format(stats, ctx.guild, tz)
+        pages = overview_format(registry.leaderboard, len(registry.keys), ctx.guild, tz)
         if len(pages) == 0:
             return await ctx.send("There are no stats available yet!")
         if await self.config.guild(ctx.guild).usebuttons():
@@ -1519,8 +1606,9 @@ class ArkTools(Calls, commands.Cog):
     @commands.guild_only()
     async def ark_leaderboard(self, ctx: commands.Context):
         """View the playtime leaderboard"""
-        stats = await self.config.guild(ctx.guild).players()
-        pages = lb_format(stats, ctx.guild)
+        await self.flush_playtime(ctx.guild)
+        registry = await self.get_registry(ctx.guild)
+        pages = lb_format(registry.leaderboard, len(registry.keys), ctx.guild)
         if len(pages) == 0:
             return await ctx.send("There are no stats available yet!")
         if await self.config.guild(ctx.guild).usebuttons():
@@ -1547,8 +1635,9 @@ class ArkTools(Calls, commands.Cog):
     @commands.guild_only()
     async def cluster_stats(self, ctx: commands.Context):
         """View playtime data for all clusters"""
-        stats = await self.config.guild(ctx.guild).players()
-        pages = cstats_format(stats, ctx.guild)
+        await self.flush_playtime(ctx.guild)
+        registry = await self.get_registry(ctx.guild)
+        pages = cstats_format(registry.leaderboard, ctx.guild)
         if not pages:
             return await ctx.send("No data to display yet!")
         if len(pages) == 1:
@@ -1578,16 +1667,12 @@ class ArkTools(Calls, commands.Cog):
         @mention
         ```
         """
-        settings = await self.config.guild(ctx.guild).all()
-        stats = settings["players"]
+        await self.flush_playtime(ctx.guild)
+        registry = await self.get_registry(ctx.guild)
         if not gamertag_or_user:
             # If user is registered, pull their own stats
-            for xuid, data in stats.items():
-                if "discord" in data:
-                    if ctx.author.id == data["discord"]:
-                        gamertag = data["username"]
-                        break
-            else:
+            xuid = registry.by_discord(ctx.author.id)
+            if not xuid:
                 embed = discord.Embed(description=f"You haven't registered yet!\n"
                                                   f"Register with the `{ctx.prefix}register` command.")
                 embed.set_thumbnail(url=FAILED)
@@ -1595,42 +1680,37 @@ class ArkTools(Calls, commands.Cog):
         else:
             if isinstance(gamertag_or_user, discord.Member):
                 # If a discord ID or mention is passed, pull their data from ID
-                for xuid, data in stats.items():
-                    if "discord" in data:
-                        if gamertag_or_user.id == data["discord"]:
-                            gamertag = data["username"]
-                            break
-                else:
+                xuid = registry.by_discord(gamertag_or_user.id)
+                if not xuid:
                     # Check if user is in discord, has the exact same name, but hasnt registered
-                    for data in stats.values():
-                        if data["username"].lower() == str(gamertag_or_user.name).lower():
-                            gamertag = str(gamertag_or_user.name)
-                            break
-                    else:
+                    xuid = registry.by_gamertag(str(gamertag_or_user.name))
+                    if not xuid:
                         embed = discord.Embed(description=f"{gamertag_or_user.name} never registered.")
                         embed.set_thumbnail(url=FAILED)
                         return await ctx.send(embed=embed)
             elif gamertag_or_user.isdigit():
                 # User either entered an XUID, Steam ID, or Discord ID that isnt in guild anymore
-                for xuid, data in stats.items():
-                    if "discord" in data:
-                        if int(gamertag_or_user) == data["discord"]:
-                            gamertag = data["username"]
-                            break
-                else:
+                xuid = registry.by_discord(int(gamertag_or_user))
+                if not xuid:
                     # See if person entered XUID or steam ID instead of discord ID
-                    if gamertag_or_user in stats:
-                        gamertag = stats[gamertag_or_user]["username"]
+                    if gamertag_or_user in registry.keys:
+                        xuid = gamertag_or_user
                     else:
                         embed = discord.Embed(description=f"No player data found for user ID {gamertag_or_user}.")
                         embed.set_thumbnail(url=FAILED)
                         return await ctx.send(embed=embed)
             else:
                 # User just entered a gamertag so find that instead
-                gamertag = gamertag_or_user
-        embed = player_stats(settings, ctx.guild, gamertag)
-        if not embed:
-            return await ctx.send(embed=discord.Embed(description=f"No player data found for {gamertag}"))
+                xuid = registry.by_gamertag(gamertag_or_user)
+        try:
+            data = await self.config.guild(ctx.guild).players.get_raw(xuid) if xuid else None
+        except KeyError:
+            data = None
+        if not data:
+            return await ctx.send(embed=discord.Embed(description=f"No player data found for {gamertag_or_user}"))
+        claimed = xuid in await self.config.guild(ctx.guild).kit.claimed()
+        tz = await self.config.guild(ctx.guild).timezone()
+        embed = player_stats(ctx.guild, xuid, data, registry.leaderboard, claimed, tz)
         await ctx.send(embed=embed)
 
     @commands.command(name="findcharname")
@@ -1698,6 +1778,7 @@ class ArkTools(Calls, commands.Cog):
                 async with self.config.guild(ctx.guild).players() as data:
                     for uid in to_delete:
                         del data[uid]
+                        self.index_player(ctx.guild, uid)
                 pruned = len(to_delete)
                 await ctx.send(f"Pruned {pruned} players from cog data")
             else:
@@ -1820,6 +1901,7 @@ class ArkTools(Calls, commands.Cog):
 
         Sends a backup of the player stats as a JSON file to Discord.
         """
+        await self.flush_playtime(ctx.guild)
         settings = await self.config.guild(ctx.guild).players()
         settings = json.dumps(settings)
         filename = f"{ctx.guild}_playerstats.json"
@@ -1840,8 +1922,9 @@ class ArkTools(Calls, commands.Cog):
 
         Sends a backup of the graph data for graphing as a JSON file to Discord.
         """
-        settings = await self.config.guild(ctx.guild).serverstats()
-        settings = json.dumps(settings)
+        expiration = await self.config.guild(ctx.guild).serverstats.expiration()
+        store = await self.get_graphstore(ctx.guild)
+        settings = json.dumps(store.to_legacy(expiration))
         filename = f"{ctx.guild}_graphdata.json"
         with open(filename, "w") as file:
             file.write(settings)
@@ -1946,8 +2029,9 @@ class ArkTools(Calls, commands.Cog):
             async with aiohttp.ClientSession() as session:
                 async with session.get(attachment_url) as resp:
                     config = await resp.json()
-            await self.config.guild(ctx.guild).serverstats.set(config)
-            await self.initialize()
+            await self.config.guild(ctx.guild).serverstats.expiration.set(config.get("expiration", 30))
+            self.graphstores.pop(ctx.guild.id, None)
+            await self.migrate_graphdata(ctx.guild, config)
             return await ctx.send("Graph data restored from backup file!")
         else:
             return await ctx.send("Attach your backup file to the message when using this command.")
@@ -1956,19 +2040,33 @@ class ArkTools(Calls, commands.Cog):
     @arktools_main.command(name="cleanup")
     @commands.guildowner()
     @commands.guild_only()
-    async def cleanup_data(self, ctx: commands.Context):
+    async def cleanup_data(self, ctx: commands.Context, dry_run: bool = False):
         """
         Delete old data that no longer exists
 
         If you have old deleted maps still showing up in clusterstats or graph data, this should remove them.
         This will also fix your config if you have player data from the Pre-V2 era of ArkTools
+
+        Set `dry_run` to True to see what would be cleaned up without changing anything.
         """
         async with ctx.typing():
-            settings = await self.config.guild(ctx.guild).all()
-            new_settings, results = await cleanup_config(settings)
+            registry = await self.get_registry(ctx.guild)
+            report = await CleanupJob(self.config.guild(ctx.guild), registry.keys, dry_run).run()
+            results = report.summary()
+            clusters = await self.config.guild(ctx.guild).clusters()
+            store = await self.get_graphstore(ctx.guild)
+            stale = [name for name in store.clusters if name not in clusters]
+            if stale:
+                if not dry_run:
+                    store.prune_series(clusters.keys())
+                    store.save()
+                results = f"{results}\nDeleted {len(stale)} old clusters from graph data".lstrip("\n")
+                if dry_run and not report.changed:
+                    results = f"Dry run, nothing was changed. This is what a cleanup would do:\n{results}"
 
         if results:
-            await self.config.guild(ctx.guild).set(new_settings)
+            if report.changed and not dry_run:
+                self.registries.pop(ctx.guild.id, None)
             await ctx.send(results)
         else:
             await ctx.send("Nothing to clean, config looks healthy :thumbsup:")
@@ -2208,6 +2306,7 @@ class ArkTools(Calls, commands.Cog):
                 await ctx.send("That name already exists.")
             else:
                 badnames.append(badname)
+                self.chat_filters.pop(ctx.guild.id, None)
                 await ctx.send(f"**{badname}** has been added to the blacklist.")
 
     @mod_permissions.command(name="delbadname")
@@ -2216,6 +2315,7 @@ class ArkTools(Calls, commands.Cog):
         async with self.config.guild(ctx.guild).badnames() as badnames:
             if badname in badnames:
                 badnames.remove(badname)
+                self.chat_filters.pop(ctx.guild.id, None)
                 await ctx.send(f"{badname} has been removed from the blacklist.")
             else:
                 await ctx.send("That name doesnt exist")
@@ -2459,38 +2559,38 @@ class ArkTools(Calls, commands.Cog):
         if not clientid:
             return await ctx.send("Bot owner needs to set Client ID and Secret before api commands can be used!")
         clusters = await self.config.guild(ctx.guild).clusters()
-        async with aiohttp.ClientSession() as session:
-            for cname, cluster in clusters.items():
-                description = f"**{cname.upper()} Cluster**\n"
-                async with ctx.typing():
-                    for sname, server in cluster["servers"].items():
-                        if "tokens" in server:
-                            tokens = server["tokens"]
-                            xbl_client, token = await self.auth_manager(session, cname, sname, tokens, ctx)
-                            if xbl_client:
-                                authorized = "True"
-                                friends = json.loads((await xbl_client.people.get_friends_summary_own()).json())
-                                xuid = xbl_client.xuid
-                                profile_data = json.loads((await xbl_client.profile.get_profile_by_xuid(xuid)).json())
-                                gt, _, _, _ = profile_format(profile_data)
-                                gamertag = server["gamertag"]
-                                following = friends["target_following_count"]
-                                followers = friends["target_follower_count"]
-                                description += f"**{sname.capitalize()}**\n" \
-                                               f"`Authorized: `{authorized}\n" \
-                                               f"`Gamertag:   `{gt}\n" \
-                                               f"`Followers:  `{followers}\n" \
-                                               f"`Following:  `{following}\n\n"
-                                if gt.lower() != gamertag.lower():
-                                    async with self.config.guild(ctx.guild).clusters() as clusters:
-                                        clusters[cname]["servers"][sname]["gamertag"] = gt
-                            else:
-                                description += f"**{sname.capitalize()}**\n" \
-                                               f"`Unable to authorize`\n\n"
-                embed = discord.Embed(
-                    description=description
-                )
-                await ctx.send(embed=embed)
+        session = self.get_session()
+        for cname, cluster in clusters.items():
+            description = f"**{cname.upper()} Cluster**\n"
+            async with ctx.typing():
+                for sname, server in cluster["servers"].items():
+                    if "tokens" in server:
+                        tokens = server["tokens"]
+                        xbl_client, token = await self.auth_manager(session, cname, sname, tokens, ctx)
+                        if xbl_client:
+                            authorized = "True"
+                            friends = json.loads((await xbl_client.people.get_friends_summary_own()).json())
+                            xuid = xbl_client.xuid
+                            profile_data = json.loads((await xbl_client.profile.get_profile_by_xuid(xuid)).json())
+                            gt, _, _, _ = profile_format(profile_data)
+                            gamertag = server["gamertag"]
+                            following = friends["target_following_count"]
+                            followers = friends["target_follower_count"]
+                            description += f"**{sname.capitalize()}**\n" \
+                                           f"`Authorized: `{authorized}\n" \
+                                           f"`Gamertag:   `{gt}\n" \
+                                           f"`Followers:  `{followers}\n" \
+                                           f"`Following:  `{following}\n\n"
+                            if gt.lower() != gamertag.lower():
+                                async with self.config.guild(ctx.guild).clusters() as clusters:
+                                    clusters[cname]["servers"][sname]["gamertag"] = gt
+                        else:
+                            description += f"**{sname.capitalize()}**\n" \
+                                           f"`Unable to authorize`\n\n"
+            embed = discord.Embed(
+                description=description
+            )
+            await ctx.send(embed=embed)
 
     @api_settings.command(name="view")
     async def view_api_settings(self, ctx: commands.Context):
@@ -2537,6 +2637,7 @@ class ArkTools(Calls, commands.Cog):
         """Set Client ID and Secret for the bot to use"""
         await self.config.clientid.set(client_id)
         await self.config.secret.set(client_secret)
+        self.xbl_tokens.invalidate()
         await ctx.send(f"Client ID and secret have been set.✅\n"
                        f"Run `{ctx.prefix}arktools api auth <clustername> <servername>` to authorize your tokens.")
 
@@ -2631,6 +2732,8 @@ class ArkTools(Calls, commands.Cog):
                 return await author.send(f"Authorization failed: {e}")
             async with self.config.guild(ctx.guild).clusters() as clusters:
                 clusters[clustername]["servers"][servername]["tokens"] = tokens
+                self.xbl_tokens.invalidate(ctx.guild.id, clustername, servername)
+                self.budget.forget(ctx.guild.id, clustername, servername)
                 xbl_client = XboxLiveClient(auth_mgr)
                 xuid = xbl_client.xuid
                 profile_data = json.loads((await xbl_client.profile.get_profile_by_xuid(xuid)).json())
@@ -2950,9 +3053,9 @@ class ArkTools(Calls, commands.Cog):
                 statuschannel = statuschannel.mention
             except AttributeError:
                 statuschannel = "#deleted-channel"
-        stats = settings["serverstats"]["counts"]
+        store = await self.get_graphstore(ctx.guild)
         exp = settings["serverstats"]["expiration"]
-        days = int(len(stats) / 1440)
+        days = int(store.size / POINTS_PER_DAY)
         clustertype = settings["clustertypes"]
         embed = discord.Embed(
             description=f"`Status Channel:  `{statuschannel}\n"
@@ -3045,6 +3148,9 @@ class ArkTools(Calls, commands.Cog):
         How many days worth of graph data to keep saved
         """
         await self.config.guild(ctx.guild).serverstats.expiration.set(days)
+        store = await self.get_graphstore(ctx.guild)
+        store.resize(days * POINTS_PER_DAY)
+        store.save()
         await ctx.tick()
 
     @server_settings.command(name="timezone")
@@ -3529,18 +3635,21 @@ class ArkTools(Calls, commands.Cog):
             count += 1
 
     # Cache server data
-    async def initialize(self):
+    # Everything is built locally and swapped in at the end so the hot paths never see a half-built cache
+    # Config cleanup only runs at startup and from the init command, in the background once the cache is live
+    async def initialize(self, cleanup: bool = False):
         t1 = time.monotonic()
-        self.activeguilds = []
-        self.servercount = 0
-        self.servers = []
-        self.channels = []
+        activeguilds = []
+        servers = []
+        # Player data may have been restored, cleaned or wiped, indexes get rebuilt on next use
+        self.registries = {}
+        self.chat_filters = {}
+        self.settings.invalidate()
         for guild in self.bot.guilds:
             guild_id = str(guild.id)
-            settings = await self.config.guild(guild).all()
-            if not settings:
-                continue
-            clusters = settings["clusters"]
+            settings = await self.settings.get(guild)
+            # Server dicts get extra keys added below, so work on a copy instead of the snapshot
+            clusters = await self.config.guild(guild).clusters()
             if not clusters:
                 continue
             servers_present = False
@@ -3550,18 +3659,14 @@ class ArkTools(Calls, commands.Cog):
                     break
             if not servers_present:
                 continue
-            log.info(f"Checking {guild} config")
-            newsettings, results = await cleanup_config(settings)
-            if results:
-                log.info(results)
-                await self.config.guild(guild).set(newsettings)
-            else:
-                log.info("Config health: Good")
-            if guild_id not in self.activeguilds:
-                self.activeguilds.append(guild_id)
+            # Graph data from before the graph store still lives in the config
+            serverstats = await self.config.guild(guild).serverstats()
+            if serverstats.get("dates"):
+                await self.migrate_graphdata(guild, serverstats)
+            if guild_id not in activeguilds:
+                activeguilds.append(guild_id)
             for cluster, data in clusters.items():
                 globalchannel = data["globalchatchannel"]
-                self.channels.append(globalchannel)
                 adminlog = data["adminlogchannel"]
                 joinchannel = data["joinchannel"]
                 leavechannel = data["leavechannel"]
@@ -3578,13 +3683,80 @@ class ArkTools(Calls, commands.Cog):
                     serverdata["crosschat"] = settings["crosschat"]
                     if "extrcon" in data:
                         serverdata["extrcon"] = data["extrcon"]
-                    self.channels.append(serverdata["chatchannel"])
-                    self.servers.append((guild.id, serverdata))
-                    self.servercount += 1
+                    servers.append((guild.id, serverdata))
                     if serverdata["chatchannel"] not in self.playerlist:
-                        self.playerlist[serverdata["chatchannel"]] = "offline"
+                        self.playerlist[serverdata["chatchannel"]] = OFFLINE
+        self.servers = servers
+        self.servercount = len(servers)
+        self.activeguilds = activeguilds
+        self.routes = build_routes(servers)
+        self.rcon_pool.prune([s[1] for s in self.servers])
+        self.health.prune([s[1]["chatchannel"] for s in self.servers])
+        self.scheduler.sync(self.servers, {"getchat": 10})
         t = round(time.monotonic() - t1, 1)
         log.info(f"Config initialized (took {t} seconds)")
+        if cleanup:
+            for guild_id in activeguilds:
+                self.start_cleanup(self.bot.get_guild(int(guild_id)))
+
+    # Run a guild's config cleanup in the background, a job that was interrupted resumes where it left off
+    def start_cleanup(self, guild: discord.guild):
+        job, task = self.cleanup_jobs.get(guild.id, (None, None))
+        if task and not task.done():
+            return
+        task = asyncio.create_task(self.run_cleanup(guild, job), name=f"ArkTools-{guild.name}-ConfigCleanup")
+        self.cleanup_jobs[guild.id] = (job, task)
+
+    async def run_cleanup(self, guild: discord.guild, job: typing.Optional[CleanupJob]):
+        t1 = time.monotonic()
+        log.info(f"Checking {guild} config")
+        if not job or job.done:
+            # Player IDs come from the registry so the whole players blob isn't copied again just to list them
+            registry = await self.get_registry(guild)
+            job = CleanupJob(self.config.guild(guild), registry.keys)
+            self.cleanup_jobs[guild.id] = (job, asyncio.current_task())
+        try:
+            report = await job.run()
+        except Exception as e:
+            log.warning(f"Config cleanup for {guild.name} failed after {job.report.checked} players: {e}")
+            return
+        t = round(time.monotonic() - t1, 1)
+        if report.changed:
+            log.info(f"{report.summary()}\n(took {t} seconds)")
+            self.registries.pop(guild.id, None)
+        else:
+            log.info(f"Config health: Good (checked {report.checked} players in {t} seconds)")
+
+    # Load a guild's graph store, sized to hold its configured number of days
+    async def get_graphstore(self, guild: discord.guild) -> GraphStore:
+        store = self.graphstores.get(guild.id)
+        if store:
+            return store
+        days = await self.config.guild(guild).serverstats.expiration()
+        path = os.path.join(str(cog_data_path(self)), "graphdata", f"{guild.id}.bin")
+        try:
+            store = GraphStore.load(path, days * POINTS_PER_DAY)
+        except Exception as e:
+            log.warning(f"Failed to load graph data for {guild.name}, starting fresh: {e}")
+            store = GraphStore(path, days * POINTS_PER_DAY)
+        self.graphstores[guild.id] = store
+        return store
+
+    async def delete_graphstore(self, guild: discord.guild):
+        store = await self.get_graphstore(guild)
+        del self.graphstores[guild.id]
+        if os.path.exists(store.path):
+            os.remove(store.path)
+
+    # Move graph data in the old config format into the graph store
+    async def migrate_graphdata(self, guild: discord.guild, serverstats: dict):
+        store = await self.get_graphstore(guild)
+        store.from_legacy(serverstats)
+        store.save()
+        await self.config.guild(guild).serverstats.set(
+            {"dates": [], "counts": [], "expiration": serverstats.get("expiration", 30)}
+        )
+        log.info(f"Moved {store.size} graph data points for {guild.name} to the graph store")
 
     # Sends ServerChat command to designated server if message is in the server chat channel
     @commands.Cog.listener("on_message")
@@ -3598,14 +3770,13 @@ class ArkTools(Calls, commands.Cog):
         # If message has no content for some reason?
         if not message:
             return
-        # Check if guild id is initialized
-        if str(message.channel.guild.id) not in self.activeguilds:
-            return
-        # Check if any servers have been initialized
-        if not self.servers:
+        # O(1) lookups against the routing tables, anything unrelated to a server bails here
+        routes = self.routes
+        if message.guild.id not in routes.guilds:
             return
-        # Check if channel id matches any of the active channels
-        if message.channel.id not in self.channels:
+        servermap = routes.chat.get(message.channel.id)
+        allservers = routes.globalchat.get(message.channel.id)
+        if not servermap and not allservers:
             return
         # Check whether the cog isn't disabled
         if await self.bot.cog_disabled_in_guild(self, message.guild):
@@ -3628,12 +3799,6 @@ class ArkTools(Calls, commands.Cog):
             for mention in message.role_mentions:
                 message.content = message.content.replace(f"<@&{mention.id}>", f"@{mention.name}")
 
-        # Run checks for what channel the message was sent in to see if its a map channel
-        clusterchannels, allservers = self.globalchannelchecker(message.channel)
-        chatchannel, servermap = self.mapchannelchecker(message.channel)
-
-        if not allservers and not servermap:
-            return
         try:
             name, msg = await decode(message)
         except TypeError:
@@ -3644,64 +3809,140 @@ class ArkTools(Calls, commands.Cog):
         if msg == " ":
             return
         guild = message.guild
-        if message.channel.id in clusterchannels:
+        if allservers:
             for server in allservers:
                 cmd = f"serverchat {name}: {msg}"
                 task_name = f"ArkTools-{guild.name}-{server['name']}-{server['cluster']}-ServerChat"
                 asyncio.create_task(self.executor(guild, server, cmd), name=task_name)
-        elif int(message.channel.id) == int(chatchannel):
+        else:
             if not servermap["crosschat"]:
                 return
             cmd = f"serverchat {name}: {msg}"
             task_name = f"ArkTools-{guild.name}-{servermap['name']}-{servermap['cluster']}-ServerChat"
             asyncio.create_task(self.executor(guild, servermap, cmd), name=task_name)
-        else:
-            return
 
-    # Returns all channels and servers related to the message
-    def globalchannelchecker(self, channel: discord.TextChannel):
-        clusterchannels = []
-        allservers = []
-        for tup in self.servers:
-            server = tup[1]
-            if server["globalchatchannel"] == channel.id:
-                clusterchannels.append(server["globalchatchannel"])
-                allservers.append(server)
-        return clusterchannels, allservers
+    # Central poller for the getchat and listplayers commands
+    # Each server is polled when its entry comes due, intervals adapt to chat activity and server state
+    @tasks.loop(seconds=1)
+    async def poll_servers(self):
+        for key in self.scheduler.due():
+            guild_id, server = self.scheduler.targets[key]
+            guild = self.bot.get_guild(guild_id)
+            if not guild:
+                self.scheduler.reschedule(key, online=False, active=False, empty=False, duration=0)
+                continue
+            task_name = f"ArkTools-{guild.name}-{server['name']}-{server['cluster']}-{key[1]}"
+            task = asyncio.create_task(self.poll(guild, server, key), name=task_name)
+            self.scheduler.inflight[key] = task
 
-    # Returns the channel and server related to the message
-    def mapchannelchecker(self, channel: discord.TextChannel):
-        for tup in self.servers:
-            server = tup[1]
-            if server["chatchannel"] == channel.id:
-                return channel.id, server
-        return None, None
+    async def poll(self, guild: discord.guild, server: dict, key: tuple):
+        start = time.monotonic()
+        res = None
+        try:
+            res = await self.executor(guild, server, key[1])
+        finally:
+            self.scheduler.inflight.pop(key, None)
+            active = bool(res) and "Server received, But no response!!" not in res
+            empty = self.playerlist.get(server["chatchannel"], OFFLINE).status is ServerStatus.EMPTY
+            self.scheduler.reschedule(
+                key,
+                online=res is not None,
+                active=active and key[1] == "getchat",
+                empty=empty,
+                duration=time.monotonic() - start
+            )
 
-    # Initiates the Listplayers loop
-    @tasks.loop(seconds=30)
-    async def listplayers(self):
-        for data in self.servers:
-            guild = self.bot.get_guild(data[0])
-            server = data[1]
-            task_name = f"ArkTools-{guild.name}-{server['name']}-{server['cluster']}-listplayers"
-            running = [task.get_name() for task in asyncio.all_tasks()]
-            if task_name not in running:
-                asyncio.create_task(self.executor(guild, server, "listplayers"), name=task_name)
-
-    # Initiates the GetChat loop
-    @tasks.loop(seconds=5)
-    async def getchat(self):
-        for data in self.servers:
-            guild = self.bot.get_guild(data[0])
-            server = data[1]
-            task_name = f"ArkTools-{guild.name}-{server['name']}-{server['cluster']}-getchat"
-            running = [task.get_name() for task in asyncio.all_tasks()]
-            if task_name not in running:
-                asyncio.create_task(self.executor(guild, server, "getchat"), name=task_name)
-
-    # Non-blocking sync executor for rcon task loops
-    # This is the main function for all rcon task loops
-    # Using async rcon for lots of server was overflowing the network buffer
+    # Servers with extended rcon use clientchat instead of serverchat
+    @staticmethod
+    def chat_command(server: dict, command: str) -> str:
+        if "serverchat" in command and "extrcon" in server:
+            if server["extrcon"]:
+                msg = command.split(" ", 1)[1]
+                command = f"clientchat {msg}"
+        return command
+
+    # Queue a command for a server, everything queued in the same tick goes out as one pipelined batch
+    def queue_command(self, guild: discord.guild, server: dict, command: str):
+        channel = server["chatchannel"]
+        queue = self.outbound.get(channel)
+        if not queue:
+            queue = OutboundQueue()
+            self.outbound[channel] = queue
+        queue.add(command)
+        if not queue.flushing:
+            queue.flushing = True
+            task_name = f"ArkTools-{guild.name}-{server['name']}-{server['cluster']}-Outbound"
+            asyncio.create_task(self.flush_outbound(guild, server, queue), name=task_name)
+
+    # Buffer a line for a Discord channel, lines queued close together are sent as one message
+    def queue_message(self, guild: discord.guild, channel: discord.TextChannel, line: str):
+        buffer = self.discord_out.get(channel.id)
+        if not buffer:
+            buffer = ChannelBuffer()
+            self.discord_out[channel.id] = buffer
+        if not buffer.add(line) and buffer.dropped == 1:
+            log.warning(f"Message backlog full for {channel.name} in {guild.name}, dropping oldest lines")
+        if not buffer.flushing:
+            buffer.flushing = True
+            task_name = f"ArkTools-{guild.name}-{channel.name}-DiscordOutput"
+            asyncio.create_task(self.flush_messages(guild, channel, buffer), name=task_name)
+
+    @staticmethod
+    async def flush_messages(guild: discord.guild, channel: discord.TextChannel, buffer: ChannelBuffer):
+        try:
+            await asyncio.sleep(DISCORD_FLUSH_DELAY)
+            while buffer.lines:
+                wait = buffer.acquire()
+                if wait:
+                    await asyncio.sleep(wait)
+                    continue
+                content, count = buffer.pack()
+                try:
+                    await channel.send(content)
+                except discord.errors.DiscordServerError:
+                    log.warning("MessageHandler: Discord seems to have an API Outage.")
+                    buffer.dropped += count
+                    continue
+                except discord.HTTPException as e:
+                    log.warning(f"Failed to send to {channel.name} in {guild.name}: {e}")
+                    buffer.dropped += count
+                    continue
+                buffer.sent += count
+                buffer.messages += 1
+        finally:
+            buffer.flushing = False
+
+    async def flush_outbound(self, guild: discord.guild, server: dict, queue: OutboundQueue):
+        health = self.health.get(server["chatchannel"])
+        try:
+            await asyncio.sleep(FLUSH_DELAY)
+            while queue.commands:
+                queued_at = queue.first_queued
+                commands = queue.drain()
+                payloads = [self.chat_command(server, c) for c in split_lines(commands)]
+                # Out of range ports are reported to the event log by the executor
+                if not payloads or not 0 <= server["port"] <= 65535:
+                    queue.dropped += len(commands)
+                    continue
+                if not health.allow():
+                    queue.dropped += len(commands)
+                    continue
+                start = time.monotonic()
+                res = await self.rcon_pool.run_many(server, payloads, timeout=3 + len(payloads) * 0.1)
+                if res is None:
+                    health.failure()
+                    queue.dropped += len(commands)
+                    continue
+                health.success(payloads[0].split(" ", 1)[0].lower(), time.monotonic() - start)
+                queue.sent += len(commands)
+                queue.payloads += len(payloads)
+                queue.last_latency = time.monotonic() - queued_at
+        finally:
+            queue.flushing = False
+
+    # Main function for all rcon task loops
+    # Commands go through the persistent asyncio connection pool, one command in flight per server,
+    # so no executor threads are tied up and sockets aren't re-authenticated every call
     async def executor(self, guild: discord.guild, server: dict, command: str):
         if not server:
             return
@@ -3715,13 +3956,6 @@ class ArkTools(Calls, commands.Cog):
                 break
         else:
             priority = False
-        # If a command is not priority, check if it's in the queue and if it is, skip
-        cstring = str(server["chatchannel"])
-        queued = await self.in_queue(cstring)
-        if not priority and queued:
-            skip = True
-        else:
-            skip = False
         # User probably had a typo when adding the server
         if server["port"] > 65535 or server["port"] < 0:
             eventlog = guild.get_channel(server["eventlog"])
@@ -3742,41 +3976,22 @@ class ArkTools(Calls, commands.Cog):
         else:
             timeout = 3
 
-        if "serverchat" in command and "extrcon" in server:
-            if server["extrcon"]:
-                msg = command.split(" ", 1)[1]
-                command = f"clientchat {msg}"
-
-        def exe():
-            try:
-                with Client(
-                        host=server['ip'],
-                        port=server['port'],
-                        passwd=server['password'],
-                        timeout=timeout
-                ) as client:
-                    result = client.run(command)
-                    client.close()
-                    return result
-            except socket.timeout:
-                return
-            except Exception as e:
-                if "WinError 10054" in str(e):
-                    log.info(f"{guild.name}: Server {server['name']} {server['cluster']} timed out too quickly")
-                else:
-                    log.warning(f"Executor-{guild.name}-{server['name']}-{command}: {e}")
-                return
+        command = self.chat_command(server, command)
 
-        # If server is to be skipped, mock the result for the player_join_leave function
-        if skip:
+        # If a command is not priority, skip it while the server's circuit breaker is open
+        # and mock the result for the player_join_leave function. Only asked once the command is about to be sent,
+        # since a half open breaker treats this call as its probe
+        health = self.health.get(server["chatchannel"])
+        if not health.allow(priority):
             res = None
         else:
-            res = await self.bot.loop.run_in_executor(None, exe)
-
-        # If result is none and the command was a priority, then servers probably timed out or crashed
-        if not res and not skip:
-            # Put server in queue, loops will ignore that server for 2 minutes and then try again
-            self.add_queue(cstring)
+            start = time.monotonic()
+            res = await self.rcon_pool.run(server, command, timeout)
+            if res:
+                health.success(command.split(" ", 1)[0].lower(), time.monotonic() - start)
+            else:
+                # Server probably timed out or crashed, loops back off from it until a probe gets through
+                health.failure()
         # Message_handler interprets in-game chat buffer
         if command == "getchat":
             if res:
@@ -3787,28 +4002,23 @@ class ArkTools(Calls, commands.Cog):
             # If server is online create list of player tuples
             if res:
                 if "No Players Connected" in res:
-                    await self.player_join_leave(guild, server, "empty")
+                    await self.player_join_leave(guild, server, EMPTY)
                 else:
                     regex = r"(?:[0-9]+\. )(.+), ([0-9]+)"
-                    res = re.findall(regex, res)
-                    await self.player_join_leave(guild, server, res)
+                    players = re.findall(regex, res)
+                    await self.player_join_leave(guild, server, PlayerList.from_players(players))
             else:  # If server is offline return None
-                await self.player_join_leave(guild, server, "offline")
-
-    @getchat.before_loop
-    async def before_getchat(self):
-        await self.bot.wait_until_red_ready()
-        await asyncio.sleep(10)
-        log.info("GetChat loop ready")
+                await self.player_join_leave(guild, server, OFFLINE)
+        return res
 
-    @listplayers.before_loop
-    async def before_listplayers(self):
+    @poll_servers.before_loop
+    async def before_poll_servers(self):
         await self.bot.wait_until_red_ready()
-        await self.initialize()
-        log.info("Listplayers loop ready")
+        await self.initialize(cleanup=True)
+        log.info("Server polling ready")
 
     # Detect player joins/leaves and log to respective channels
-    async def player_join_leave(self, guild: discord.guild, server: dict, newplayerlist: typing.Union[str, list]):
+    async def player_join_leave(self, guild: discord.guild, server: dict, newplayerlist: PlayerList):
         channel = server["chatchannel"]
         joinlog = guild.get_channel(server["joinchannel"])
         leavelog = guild.get_channel(server["leavechannel"])
@@ -3831,43 +4041,27 @@ class ArkTools(Calls, commands.Cog):
                 self.warnings.append(error)
 
         # Previously cached player list to compare with newplayerlist
-        lastplayerlist = self.playerlist[channel]
-
-        # If new and last are both strings then just update them, nothing to log
-        # Theyre probably both offline or empty so no notable change
-        if isinstance(newplayerlist, str) and isinstance(lastplayerlist, str):
-            self.playerlist[channel] = newplayerlist
-        else:
-            # Either the newplayerlist, lastplayerlist, or neither are a string, so now we narrow it down
-            # If both are lists then detect change in population
-            if isinstance(newplayerlist, list) and isinstance(lastplayerlist, list):
-                if can_send:
-                    for player in newplayerlist:
-                        # If a player is in the new list but not the last list, then they must have joined
-                        if player not in lastplayerlist:
-                            await joinlog.send(
-                                f":green_circle: `{player[0]}, {player[1]}` joined {mapname} {clustername}")
-                    for player in lastplayerlist:
-                        # If a player is in the last list but not the new list, then they must have left
-                        if player not in newplayerlist:
-                            await leavelog.send(f":red_circle: `{player[0]}, {player[1]}` left {mapname} {clustername}")
-                self.playerlist[channel] = newplayerlist
-            # Went from online and populated to either offline or empty, so just dump the users into leave log
-            elif isinstance(newplayerlist, str) and isinstance(lastplayerlist, list):
-                for player in lastplayerlist:
-                    if can_send:
-                        await leavelog.send(f":red_circle: `{player[0]}, {player[1]}` left {mapname} {clustername}")
-                self.playerlist[channel] = newplayerlist
-            # Went from empty to populated so add everyone in the server to the join log
-            elif isinstance(newplayerlist, list) and isinstance(lastplayerlist, str):
-                if lastplayerlist == "empty":
-                    for player in newplayerlist:
-                        await joinlog.send(
-                            f":green_circle: `{player[0]}, {player[1]}` joined {mapname} {clustername}")
-                self.playerlist[channel] = newplayerlist
-            else:
-                # If a server goes from offline to populated it's probably cause the cog was reloaded, so ignore
-                self.playerlist[channel] = newplayerlist
+        lastplayerlist = self.playerlist.get(channel, OFFLINE)
+        self.playerlist[channel] = newplayerlist
+        joined, left = newplayerlist.diff(lastplayerlist)
+        if not can_send:
+            return
+        # Walk the names so logs keep the listplayers order
+        for xuid, gamertag in newplayerlist.names.items():
+            if xuid in joined:
+                self.queue_message(guild, joinlog, f":green_circle: `{gamertag}, {xuid}` joined {mapname} {clustername}")
+        for xuid, gamertag in lastplayerlist.names.items():
+            if xuid in left:
+                self.queue_message(guild, leavelog, f":red_circle: `{gamertag}, {xuid}` left {mapname} {clustername}")
+
+    # In-game command prefixes and blacklisted names for a guild, prefixes are refetched every few minutes
+    async def get_chat_filter(self, guild: discord.guild, settings: dict) -> ChatFilter:
+        chatfilter = self.chat_filters.get(guild.id)
+        if not chatfilter or chatfilter.expired:
+            prefixes = await self.bot.get_valid_prefixes(guild)
+            chatfilter = ChatFilter(prefixes, settings["badnames"])
+            self.chat_filters[guild.id] = chatfilter
+        return chatfilter
 
     # Sends messages from in-game chat to their designated channels
     async def message_handler(self, guild: discord.guild, server: dict, res: str):
@@ -3877,42 +4071,28 @@ class ArkTools(Calls, commands.Cog):
         # If crosschat is false messages wont be sent to discord but in-game commands *should* still work
         crosschat = server["crosschat"]
         perms = chatchannel.permissions_for(guild.me).send_messages
-        msgs = res.split("\n")
-        settings = await self.config.guild(guild).all()
-        badnames = settings["badnames"]
-        admin_commands = ""
-        globalmessages = ""
-        messages = ""
+        settings = await self.settings.get(guild)
+        chatfilter = await self.get_chat_filter(guild, settings)
+        admin_commands = []
+        globalmessages = []
+        messages = []
         tribe_logs = []
         chats = []
         servername = server["name"].capitalize()
         clustername = server["cluster"].upper()
-        # Filter messages for feedback loops and invalid strings
-        for msg in msgs:
-            if not msg:
-                continue
-            if msg == " ":
-                continue
-            # This is discord chat being sent to server, so we dont want to loop it
-            if msg.startswith("SERVER:"):
-                continue
-            if msg.startswith("AdminCmd:"):  # Admin command
-                admin_commands += f"**{servername} {clustername}**\n{box(msg, lang='python')}\n"
-                continue
-            elif "Tribe" and ", ID" in msg:  # Tribe log
-                tribe_logs.append(msg)
-            else:
-                # Anything else ignored,
-                # like wrapped sentences from to_server_chat that we dont want sent back to the discord
-                if "):" not in msg:
-                    continue
-                else:
-                    # Send off to the cleaned up message list for further interpretation
-                    chats.append(msg)
-        for msg in chats:
+        # Classify each line in one pass, echoes of discord chat and wrapped sentences are dropped
+        for line in parse_getchat(res):
+            if line.kind is LineType.ADMIN:
+                admin_commands.append(f"**{servername} {clustername}**\n{box(line.raw, lang='python')}")
+            elif line.kind is LineType.TRIBE:
+                tribe_logs.append(line.raw)
+            elif line.kind is LineType.CHAT:
+                chats.append(line)
+        for line in chats:
+            msg = line.raw
             # Append messages to be sent to discord
-            globalmessages += f"{chatchannel.mention}: {msg}\n"
-            messages += f"{msg}\n"
+            globalmessages.append(f"{chatchannel.mention}: {msg}")
+            messages.append(msg)
             # Sends Discord invite to in-game chat if the word Discord is mentioned
             if "discord" in msg.lower() or "discordia" in msg.lower():
                 inv = None
@@ -3926,7 +4106,7 @@ class ArkTools(Calls, commands.Cog):
                 except discord.errors.DiscordServerError:
                     log.warning("Message_handler: Invite creation failed, seems to be an issue with Discord's API")
                 if inv:
-                    await self.executor(guild, server, f"serverchat {inv}")
+                    self.queue_command(guild, server, f"serverchat {inv}")
 
             # If interchat is enabled, relay message to other servers
             clustername = server["cluster"]
@@ -3936,40 +4116,27 @@ class ArkTools(Calls, commands.Cog):
                     g = self.bot.get_guild(data[0])
                     # Send in-game message to all other servers in the same cluster except for the originator
                     if s["cluster"] == server["cluster"] and s["name"] != server["name"] and g == guild:
-                        await self.executor(guild, s, f"serverchat {server['name'].capitalize()}: {msg}")
-
-            # Break message into groups for interpretation
-            # (gamertag) (character name) (message)
-            reg = r'(.+)\s\((.+)\): (.+)'
-            msg = re.findall(reg, msg)
-            if len(msg) == 0:  # This shouldn't happen but eh...
-                continue
-            msg = msg[0]
-            gamertag = msg[0]
-            character_name = msg[1]
-            message = msg[2]
-            # Check if any character has a blacklisted name and rename the character to their Gamertag if so
-            for badname in badnames:
-                # User's character name is present in the blacklist
-                if badname.lower() == character_name.lower():
-                    await self.executor(guild, server, f'renameplayer "{badname}" {gamertag}')
-                    cmd = f"serverchat {gamertag}, the name {badname} has been blacklisted, you have been renamed"
-                    await self.executor(guild, server, cmd)
-                    if perms and crosschat:
-                        await chatchannel.send(f"A player named `{badname}` has been renamed to `{gamertag}`.")
-            try:
-                xuid, stats = await self.get_player(gamertag, settings["players"])
-            except TypeError:
-                stats = None
-                xuid = None
+                        self.queue_command(guild, s, f"serverchat {server['name'].capitalize()}: {msg}")
+
+            gamertag = line.gamertag
+            character_name = line.character
+            message = line.message
+            # Check if the character has a blacklisted name and rename the character to their Gamertag if so
+            badname = chatfilter.badname(character_name)
+            if badname:
+                self.queue_command(guild, server, f'renameplayer "{badname}" {gamertag}')
+                cmd = f"serverchat {gamertag}, the name {badname} has been blacklisted, you have been renamed"
+                self.queue_command(guild, server, cmd)
+                if perms and crosschat:
+                    self.queue_message(guild, chatchannel, f"A player named `{badname}` has been renamed to `{gamertag}`.")
+            xuid, stats = await self.fetch_player(guild, gamertag)
             # In game player name sync
             if stats:
                 server_id = str(server["chatchannel"])
-                if server_id not in settings["players"][xuid]["ingame"]:
+                if server_id not in stats["ingame"]:
                     await self.init_player_map(guild, server_id, xuid, character_name)
                 else:
-                    user = settings["players"][xuid]
-                    if character_name != user["ingame"][server_id]["name"]:
+                    if character_name != stats["ingame"][server_id]["name"]:
                         await self.update_name(guild, server_id, xuid, character_name)
             # Check or apply ranks
             if settings["autorename"]:
@@ -3983,46 +4150,44 @@ class ArkTools(Calls, commands.Cog):
                         # Players char name doesnt have a rank in it currently
                         if "[" not in character_name and "]" not in character_name:
                             cmd = f'renameplayer "{character_name}" [{str(rank)}] {character_name}'
-                            await self.executor(guild, server, cmd)
+                            self.queue_command(guild, server, cmd)
                         else:  # Update their rank
                             raw_name = character_name.split("]")[-1]
                             raw_name = raw_name.strip()
                             cmd = f'renameplayer "{character_name}" [{str(rank)}] {raw_name}'
-                            await self.executor(guild, server, cmd)
+                            self.queue_command(guild, server, cmd)
                         cmd = f"serverchat Congrats {gamertag}, you have reached the rank of {str(rank)}"
-                        await self.executor(guild, server, cmd)
+                        self.queue_command(guild, server, cmd)
                         if perms and crosschat:
-                            await chatchannel.send(f"`Congrats {gamertag}, you have reached the rank of {str(rank)}`")
+                            self.queue_message(
+                                guild, chatchannel, f"`Congrats {gamertag}, you have reached the rank of {str(rank)}`"
+                            )
 
             # In-game command interpretation
-            prefixes = await self.bot.get_valid_prefixes(guild)
-            for p in prefixes:
-                if message.startswith(p):
-                    message = message.replace(p, "", 1)
-                    resp = await self.ingame_cmd(guild, p, server, gamertag, character_name, message)
-                    if resp:
-                        messages += f"`{resp}`\n"
-                    break
+            command = chatfilter.command(message)
+            if command:
+                p, message = command
+                resp = await self.ingame_cmd(guild, p, server, gamertag, character_name, message)
+                if resp:
+                    messages.append(f"`{resp}`")
         # Send off messages to discord channels
         if perms:
-            try:
-                if messages and crosschat:
-                    await chatchannel.send(messages)
-                if globalmessages:
-                    await globalchat.send(globalmessages)
-                if admin_commands:
-                    await adminlog.send(admin_commands)
-            except discord.errors.DiscordServerError:
-                log.warning("MessageHandler: Discord seems to have an API Outage.")
-            except Exception as e:
-                log.warning(f"MessageHandler Error in {guild.name}: {e}")
+            if crosschat:
+                for line in messages:
+                    self.queue_message(guild, chatchannel, line)
+            if globalchat:
+                for line in globalmessages:
+                    self.queue_message(guild, globalchat, line)
+            if adminlog:
+                for entry in admin_commands:
+                    self.queue_message(guild, adminlog, entry)
         if tribe_logs:
             await self.tribelog_sendoff(guild, settings, server, tribe_logs)
 
     # In game command handler
     async def ingame_cmd(self, guild: discord.guild, prefix: str, server: dict, gamertag: str, char_name: str,
                          cmd: str) -> str:
-        settings = await self.config.guild(guild).all()
+        settings = await self.settings.get(guild)
         color = random.choice(RICH_COLORS)
         available_cmd = f"{color}IN GAME COMMANDS</>\n" \
                         f"{prefix}register <ID> - Register your implantID to use commands without it\n" \
@@ -4040,15 +4205,14 @@ class ArkTools(Calls, commands.Cog):
         if settings["kit"]["enabled"]:
             available_cmd += f"{prefix}kit - New players can claim a one-time starter kit!\n"
             extras += 1
-        players = settings["players"]
         cid = server["chatchannel"]
-        playerlist = self.playerlist[cid]
+        playerlist = self.playerlist.get(cid, OFFLINE)
         server_id = str(cid)
         time = datetime.datetime.now()
         com, arg = self.parse_cmd(cmd)
         if not com:
             return ""
-        xuid, stats = await self.get_player(gamertag, players)
+        xuid, stats = await self.fetch_player(guild, gamertag)
         failed = f"In-game command failed! This can happen if you recently changed your Gamertag. " \
                  f"Type {prefix}updategt YourOldGamertag to fix this"
 
@@ -4112,6 +4276,7 @@ class ArkTools(Calls, commands.Cog):
                     for xuid, data in players.items():
                         if old_gamertag.lower() == data["username"].lower():
                             data["username"] = gamertag
+                            self.index_player(guild, xuid, data)
                             resp = f"Your gamertag has been updated to {gamertag}"
                             com = f"serverchat {resp}"
                             await self.executor(guild, server, com)
@@ -4124,9 +4289,9 @@ class ArkTools(Calls, commands.Cog):
                 com = f"serverchat {resp}"
                 await self.executor(guild, server, com)
                 return resp
-            if settings["autorename"]:
-                if "rank" in players[xuid]:
-                    rank = players[xuid]["rank"]
+            if settings["autorename"] and stats:
+                if "rank" in stats:
+                    rank = stats["rank"]
                     rank = guild.get_role(rank)
                     arg = f"[{rank}] {arg}"
             com = f'renameplayer "{char_name}" {arg}'
@@ -4150,13 +4315,14 @@ class ArkTools(Calls, commands.Cog):
                 await self.executor(guild, server, com)
                 return resp
             else:
+                # Close the vote before anything is awaited so late votes can't pass it a second time
+                self.votes.finish(cid, vote_type)
+                self.update_lastran(cid, vote_type)
                 resp = "Vote successful, let there be light!"
                 com = f"serverchat {resp}"
                 await self.executor(guild, server, com)
                 com = "settimeofday 07:00"
                 await self.executor(guild, server, com)
-                del self.votes[cid]
-                self.update_lastran(cid, vote_type)
                 return resp
         # Vote night command
         elif com == "votenight":
@@ -4173,13 +4339,13 @@ class ArkTools(Calls, commands.Cog):
                 await self.executor(guild, server, com)
                 return resp
             else:
+                self.votes.finish(cid, vote_type)
+                self.update_lastran(cid, vote_type)
                 resp = "Vote successful, turning off the sun!"
                 com = f"serverchat {resp}"
                 await self.executor(guild, server, com)
                 com = "settimeofday 22:00"
                 await self.executor(guild, server, com)
-                del self.votes[cid]
-                self.update_lastran(cid, vote_type)
                 return resp
         # Dino wipe command
         elif com == "votedinowipe":
@@ -4196,13 +4362,13 @@ class ArkTools(Calls, commands.Cog):
                 await self.executor(guild, server, com)
                 return resp
             else:
+                self.votes.finish(cid, vote_type)
+                self.update_lastran(cid, vote_type)
                 resp = "Vote successful, asteroids inbound! All wild dinos will be wiped."
                 com = f"serverchat {resp}"
                 await self.executor(guild, server, com)
                 com = "destroywilddinos"
                 await self.executor(guild, server, com)
-                del self.votes[cid]
-                self.update_lastran(cid, vote_type)
                 return resp
         # Vote server cleanup command, wipes beaver dams and spoiled eggs
         elif com == "votecleanup":
@@ -4219,6 +4385,8 @@ class ArkTools(Calls, commands.Cog):
                 await self.executor(guild, server, com)
                 return resp
             else:
+                self.votes.finish(cid, vote_type)
+                self.update_lastran(cid, vote_type)
                 resp = "Vote successful, wiping dams and spoiled eggs!"
                 com = f"serverchat {resp}"
                 await self.executor(guild, server, com)
@@ -4231,18 +4399,16 @@ class ArkTools(Calls, commands.Cog):
                 ]
                 for cleanup_command in cleanup_commands:
                     await self.executor(guild, server, cleanup_command)
-                del self.votes[cid]
-                self.update_lastran(cid, vote_type)
                 return resp
         # Player count command
         elif com == "players":
-            if len(playerlist) == 1:
+            if playerlist.count == 1:
                 resp = "You're the only person on this server :p"
                 com = f"serverchat {resp}"
                 await self.executor(guild, server, com)
                 return resp
             else:
-                resp = f"There are {len(playerlist)} people on this server"
+                resp = f"There are {playerlist.count} people on this server"
                 com = f"serverchat {resp}"
                 await self.executor(guild, server, com)
                 return resp
@@ -4282,10 +4448,8 @@ class ArkTools(Calls, commands.Cog):
                         canuse = True
                 if canuse:
                     cooldowns[gamertag]["imstuck"] = time.isoformat()
-                    for path in IMSTUCK_BLUEPRINTS:
-                        cmd = f"giveitemtoplayer {arg} {path}"
-                        task_name = f"ArkTools-{guild.name}-{server['name']}-{server['cluster']}-giveitemtoplayer"
-                        asyncio.create_task(self.executor(guild, server, cmd), name=task_name)
+                    task_name = f"ArkTools-{guild.name}-{server['name']}-{server['cluster']}-giveitemtoplayer"
+                    asyncio.create_task(self.grant_items(server, arg, IMSTUCK_BLUEPRINTS), name=task_name)
                     resp = f"{gamertag}, your care package is on the way!"
                     com = f"serverchat {resp}"
                     await self.executor(guild, server, com)
@@ -4344,13 +4508,9 @@ class ArkTools(Calls, commands.Cog):
                     paths = await self.config.guild(guild).payday.paths()
                     rand = await self.config.guild(guild).payday.random()
                     if rand:
-                        path = random.choice(paths)
-                        await self.executor(guild, server, f"giveitemtoplayer {arg} {path}")
-                    else:
-                        for path in paths:
-                            cmd = f"giveitemtoplayer {arg} {path}"
-                            task_name = f"ArkTools-{guild.name}-{server['name']}-{server['cluster']}-giveitemtoplayer"
-                            asyncio.create_task(self.executor(guild, server, cmd), name=task_name)
+                        paths = [random.choice(paths)]
+                    task_name = f"ArkTools-{guild.name}-{server['name']}-{server['cluster']}-giveitemtoplayer"
+                    asyncio.create_task(self.grant_items(server, arg, paths), name=task_name)
                     resp = f"{gamertag}, your payday rewards have been sent!"
                     com = f"serverchat {resp}"
                     await self.executor(guild, server, com)
@@ -4406,10 +4566,9 @@ class ArkTools(Calls, commands.Cog):
                     return resp
                 else:
                     kit["claimed"].append(xuid)
-                    for path in kit["paths"]:
-                        cmd = f"giveitemtoplayer {arg} {path}"
-                        task_name = f"ArkTools-{guild.name}-{server['name']}-{server['cluster']}-giveitemtoplayer"
-                        asyncio.create_task(self.executor(guild, server, cmd), name=task_name)
+                    self.settings.invalidate(guild.id)
+                    task_name = f"ArkTools-{guild.name}-{server['name']}-{server['cluster']}-giveitemtoplayer"
+                    asyncio.create_task(self.grant_items(server, arg, list(kit["paths"])), name=task_name)
                     resp = f"{gamertag}, you have successfully claimed your starter kit!"
                     com = f"serverchat {resp}"
                     await self.executor(guild, server, com)
@@ -4418,6 +4577,10 @@ class ArkTools(Calls, commands.Cog):
         else:
             return ""
 
+    # Send the in-game command items to a player on the server they asked from
+    async def grant_items(self, server: dict, implant_id: str, paths: typing.List[str]):
+        await self.items.grant([(f"{server['name']} {server['cluster']}", server)], implant_id, paths)
+
     # Checks an implant ID and makes sure it is a digit and the right length
     async def check_implant(self, guild: discord.guild, server: dict, arg: str):
         if not arg.isdigit():
@@ -4456,7 +4619,7 @@ class ArkTools(Calls, commands.Cog):
             td = time - last_ran
             td = td.total_seconds()
             td = int(td)
-            cooldown = await self.config.guild(guild).votecooldown()
+            cooldown = (await self.settings.get(guild))["votecooldown"]
             cooldown = int(cooldown)
             if td > cooldown:
                 can_run = True
@@ -4466,88 +4629,43 @@ class ArkTools(Calls, commands.Cog):
                 msg = f"{vote_type} in cooldown, wait {tleft}"
                 return msg
         if can_run:
-            time_till_expired = time + datetime.timedelta(minutes=2)
-            playerlist = self.playerlist[channel_id]
-            if playerlist:
-                count = len(playerlist)
-            else:
-                count = 1
-            min_votes = math.ceil(count / 2)
-            if count == 1:
-                min_votes = 1
-            if count > 10:
-                min_votes = math.ceil(math.sqrt(2 * count))
-            if channel_id not in self.votes:
-                self.votes[channel_id] = {}
-            if vote_type not in self.votes[channel_id]:
-                self.votes[channel_id][vote_type] = {
-                    "expires": time_till_expired,
-                    "votes": [],
-                    "minvotes": min_votes,
-                    "server": server
-                }
-            if gamertag not in self.votes[channel_id][vote_type]["votes"]:
-                self.votes[channel_id][vote_type]["votes"].append(gamertag)
-            min_votes = self.votes[channel_id][vote_type]["minvotes"]
-            current = len(self.votes[channel_id][vote_type]["votes"])
-            remaining = min_votes - current
-            return int(remaining)
-
-    @tasks.loop(seconds=10)
-    async def vote_sessions(self):
-        expired = []
-        for cid in self.votes:
-            for votetype, session in self.votes[cid].items():
-                self.init_lastran(cid)
-                time = datetime.datetime.now()
-                if time > session["expires"]:
-                    if len(session["votes"]) < session["minvotes"]:
-                        guild = session["server"]["guild"]
-                        await self.executor(guild, session["server"], f"serverchat {votetype} session expired")
-                        self.update_lastran(cid, votetype)
-                        channel = guild.get_channel(int(cid))
-                        crosschat = await self.config.guild(guild).crosschat()
-                        if channel and crosschat:
-                            await channel.send(f"`{votetype} session expired`")
-                        if cid not in expired:
-                            expired.append(cid)
-        for cid in expired:
-            del self.votes[cid]
-
-    @vote_sessions.before_loop
-    async def before_vote_sessions(self):
-        await self.bot.wait_until_red_ready()
-        await asyncio.sleep(10)
-        log.info("Vote session manager ready")
+            session = self.votes.get(channel_id, vote_type)
+            if not session:
+                count = self.playerlist.get(channel_id, OFFLINE).count or 1
+                min_votes = math.ceil(count / 2)
+                if count == 1:
+                    min_votes = 1
+                if count > 10:
+                    min_votes = math.ceil(math.sqrt(2 * count))
+                session = self.votes.start(channel_id, vote_type, server, min_votes)
+            return int(session.add(gamertag))
+
+    # Called by the vote tracker when a session's timer runs out before it got enough votes
+    async def vote_expired(self, session: VoteSession):
+        cid = session.channel_id
+        votetype = session.vote_type
+        guild = session.server["guild"]
+        self.update_lastran(cid, votetype)
+        await self.executor(guild, session.server, f"serverchat {votetype} session expired")
+        channel = guild.get_channel(int(cid))
+        settings = await self.settings.get(guild)
+        if channel and settings["crosschat"]:
+            await channel.send(f"`{votetype} session expired`")
 
     @tasks.loop(seconds=60)
     async def gather_graphdata(self):
-        for guild_id in self.activeguilds:
-            guild = self.bot.get_guild(int(guild_id))
+        # Counts come straight from the cached player lists, guild ID -> cluster -> count
+        counts = {}
+        for guild_id, server in self.servers:
+            clusters = counts.setdefault(guild_id, {})
+            count = self.playerlist.get(server["chatchannel"], OFFLINE).count
+            clusters[server["cluster"]] = clusters.get(server["cluster"], 0) + count
+        for guild_id, cluster_counts in counts.items():
+            guild = self.bot.get_guild(guild_id)
             if not guild:
                 continue
-            clusters = await self.config.guild(guild).clusters()
-            cluster_counts = {}
-            total_players = 0
-            for cname, cdata in clusters.items():
-                ctotal = 0
-                for sname, sdata in cdata["servers"].items():
-                    cid = sdata["chatchannel"]
-                    if cid not in self.playerlist:
-                        continue
-                    plist = self.playerlist[cid]
-                    if isinstance(plist, list):
-                        total_players += len(plist)
-                        ctotal += len(plist)
-                cluster_counts[cname] = ctotal
-            now = datetime.datetime.now(pytz.timezone("UTC"))
-            async with self.config.guild(guild).serverstats() as serverstats:
-                serverstats["dates"].append(now.isoformat())
-                serverstats["counts"].append(total_players)
-                for cname, count in cluster_counts.items():
-                    if cname not in serverstats:
-                        serverstats[cname] = []
-                    serverstats[cname].append(count)
+            store = await self.get_graphstore(guild)
+            store.record(int(time.time()), sum(cluster_counts.values()), cluster_counts)
 
     @gather_graphdata.before_loop
     async def before_gather_graphdata(self):
@@ -4561,7 +4679,7 @@ class ArkTools(Calls, commands.Cog):
             guild = self.bot.get_guild(int(guild_id))
             if not guild:
                 continue
-            settings = await self.config.guild(guild).all()
+            settings = await self.settings.get(guild)
             thumbnail = LIVE
             status = ""
             totalplayers = 0
@@ -4584,10 +4702,6 @@ class ArkTools(Calls, commands.Cog):
             if not send_perms:
                 log.warning(f"Can't send messages to status channel in {guild.name}")
                 continue
-            # Get graph
-            hours = settings["status"]["time"]
-            file = await get_graph(settings, int(hours))
-            img = "attachment://plot.png"
             # Gather server player counts
             for cluster in settings["clusters"]:
                 cname = cluster
@@ -4612,13 +4726,11 @@ class ArkTools(Calls, commands.Cog):
                     channel = server["chatchannel"]
 
                     # Get cached player count data
-                    playerlist = self.playerlist[channel]
-
-                    if channel not in self.downtime:
-                        self.downtime[channel] = 0
+                    playerlist = self.playerlist.get(channel, OFFLINE)
 
-                    count = self.downtime[channel]
-                    if playerlist == "offline":
+                    health = self.health.get(channel)
+                    count = int(health.downtime / 60)
+                    if playerlist.status is ServerStatus.OFFLINE:
                         thumbnail = FAILED
                         inc = "Minutes."
                         if count >= 60:
@@ -4631,16 +4743,14 @@ class ArkTools(Calls, commands.Cog):
                         else:
                             schannel = channel
                         status += f"{schannel}: Offline for {count} {inc}\n"
-                        if self.downtime[channel] == 10:
+                        if health.alert_due():
                             alerts += f"The **{sname} {cname}** server has been offline for 10 minutes now!\n"
-                        self.downtime[channel] += 2
 
-                    elif playerlist == "empty":
+                    elif playerlist.status is ServerStatus.EMPTY:
                         status += f"{guild.get_channel(channel).mention}: 0 Players\n"
-                        self.downtime[channel] = 0
 
                     else:
-                        playercount = len(playerlist)
+                        playercount = playerlist.count
                         clustertotal += playercount
                         totalplayers += playercount
                         if playercount == 1:
@@ -4660,62 +4770,135 @@ class ArkTools(Calls, commands.Cog):
                     )
 
             # Embed setup
-            tz = settings["timezone"]
-            tz = pytz.timezone(tz)
-            # Cleanup previous message/messages
-            status_data = settings["status"]
-            task_name = f"ArkTools-{guild.name}-StatusCleanup"
-            asyncio.create_task(self.status_cleaner(status_data), name=task_name)
-            now = datetime.datetime.now(pytz.timezone("UTC"))
-            # Nice simple single embed status channel for normal people
             if len(status) <= 4096:
+                # Nice simple single embed status channel for normal people
+                pages = [status]
+            else:  # Person must have a fuck ton of servers for the bot to have use this ugh
+                pages = [p for p in pagify(status)]
+            await self.update_status_board(guild, dest_channel, settings, pages, totalplayers, thumbnail)
+
+    # Edit the live status embeds in place, only pages whose content changed get touched
+    # The graph is on the last page and since attachments can't be edited, that page is reposted when the graph changes
+    async def update_status_board(
+            self,
+            guild: discord.guild,
+            channel: discord.TextChannel,
+            settings: dict,
+            pages: list,
+            totalplayers: int,
+            thumbnail: str
+    ):
+        tz = pytz.timezone(settings["timezone"])
+        hours = int(settings["status"]["time"])
+        store = await self.get_graphstore(guild)
+        # The graph is only checked once per sample window or when its settings change
+        graph_sig = graph_signature(guild.id, hours, settings["timezone"], store.last)
+        board = self.statusboards.get(guild.id)
+        if board and (board.channel_id != channel.id or len(board.messages) != len(pages)):
+            self.statusboards.pop(guild.id, None)
+            await self.clear_status_board(board)
+            board = None
+
+        def build(index: int, page: str, image: bool):
+            if board:
+                color = board.color
+            else:
+                color = discord.Color.random()
+            last_page = index == len(pages) - 1
+            if last_page:
                 embed = discord.Embed(
-                    description=status,
-                    color=discord.Color.random(),
-                    timestamp=now.astimezone(tz)
+                    description=page,
+                    color=color,
+                    timestamp=datetime.datetime.now(pytz.timezone("UTC")).astimezone(tz)
                 )
+            else:
+                embed = discord.Embed(description=page, color=color)
+            if index == 0:
                 embed.set_author(name="Server Status", icon_url=guild.icon_url)
-                embed.add_field(name="Total Players", value=f"`{totalplayers}`")
                 embed.set_thumbnail(url=thumbnail)
-                embed.set_image(url=img)
-                if file:
-                    message = await dest_channel.send(embed=embed, file=file)
+                if len(pages) == 1:
+                    embed.add_field(name="Total Players", value=f"`{totalplayers}`")
+            if last_page and image:
+                embed.set_image(url="attachment://plot.png")
+            return embed, page_hash(index, page, totalplayers, thumbnail, image)
+
+        if not board:
+            # Cleanup whatever was posted before the cog loaded
+            task_name = f"ArkTools-{guild.name}-StatusCleanup"
+            asyncio.create_task(self.status_cleaner(settings["status"]), name=task_name)
+            board = StatusBoard(channel.id, discord.Color.random())
+            png = await self.status_graph(guild, store, settings["timezone"], hours)
+            for index, page in enumerate(pages):
+                last_page = index == len(pages) - 1
+                embed, pagehash = build(index, page, last_page and png is not None)
+                if last_page and png:
+                    message = await channel.send(embed=embed, file=graph_file(png))
+                    board.graph_sent(graph_sig, png)
                 else:
-                    message = await dest_channel.send(embed=embed)
-                await self.config.guild(guild).status.multi.set([])
-                await self.config.guild(guild).status.message.set(message.id)
-            else:  # Person must have a fuck ton of servers for the bot to have use this ugh
-                # Embed is too dummy thicc and needs multiple embeds
-                pages = 0
-                for _ in pagify(status):
-                    pages += 1
-                new_message_list = []
-                count = 1
-                color = discord.Color.random()
-                for p in pagify(status):
-                    if count == pages:
-                        embed = discord.Embed(
-                            description=p,
-                            color=color,
-                            timestamp=now.astimezone(tz)
-                        )
-                    else:
-                        embed = discord.Embed(
-                            description=p,
-                            color=color
-                        )
-                    if count == 1:
-                        embed.set_author(name="Server Status", icon_url=guild.icon_url)
-                        embed.set_thumbnail(url=thumbnail)
-                    if count == pages:
-                        embed.set_image(url=img)
-                        message = await dest_channel.send(embed=embed, file=file)
-                    else:
-                        message = await dest_channel.send(embed=embed)
-                    count += 1
-                    new_message_list.append(message.id)
-                await self.config.guild(guild).status.message.set(None)
-                await self.config.guild(guild).status.multi.set(new_message_list)
+                    message = await channel.send(embed=embed)
+                board.messages.append(message)
+                board.hashes.append(pagehash)
+            self.statusboards[guild.id] = board
+            return await self.save_status_board(guild, board)
+
+        try:
+            for index, page in enumerate(pages):
+                last_page = index == len(pages) - 1
+                if last_page and board.graph_stale(graph_sig):
+                    png = await self.status_graph(guild, store, settings["timezone"], hours)
+                    if png and not board.graph_changed(png):
+                        board.graph_sig = graph_sig
+                    elif png:
+                        embed, pagehash = build(index, page, True)
+                        old = board.messages[index]
+                        board.messages[index] = await channel.send(embed=embed, file=graph_file(png))
+                        board.hashes[index] = pagehash
+                        board.graph_sent(graph_sig, png)
+                        await self.save_status_board(guild, board)
+                        try:
+                            await old.delete()
+                        except discord.HTTPException:
+                            pass
+                        continue
+                embed, pagehash = build(index, page, board.graph_sig is not None)
+                if pagehash == board.hashes[index]:
+                    continue
+                await board.messages[index].edit(embed=embed)
+                board.hashes[index] = pagehash
+        except discord.NotFound:  # Someone deleted one of the status messages, post fresh ones next time
+            self.statusboards.pop(guild.id, None)
+            await self.clear_status_board(board)
+        except discord.HTTPException as e:
+            log.warning(f"Failed to update status channel in {guild.name}: {e}")
+
+    # Post with the previous image rather than holding up the status update on a slow render
+    async def status_graph(
+            self,
+            guild: discord.guild,
+            store: GraphStore,
+            timezone: str,
+            hours: int
+    ) -> typing.Optional[bytes]:
+        return await self.graphs.render(guild.id, store, timezone, hours, timeout=10)
+
+    # Message IDs only get written when messages are actually replaced, so the next load can clean them up
+    async def save_status_board(self, guild: discord.guild, board: StatusBoard):
+        async with self.config.guild(guild).status() as status:
+            if len(board.messages) == 1:
+                status["message"] = board.messages[0].id
+                status["multi"] = []
+            else:
+                status["message"] = None
+                status["multi"] = board.ids
+        self.settings.invalidate(guild.id)
+
+    @staticmethod
+    async def clear_status_board(board: StatusBoard):
+        for message in board.messages:
+            try:
+                await message.delete()
+            except discord.HTTPException:
+                continue
 
     @status_channel.before_loop
     async def before_status_channel(self):
@@ -4724,17 +4907,22 @@ class ArkTools(Calls, commands.Cog):
         log.info("Status Channel loop ready")
 
     # Player stat handler
+    # Playtime is accumulated in memory and each guild's player data is written back in one go by flush_playtime
     @tasks.loop(minutes=2)
     async def player_stats(self):
         current_time = datetime.datetime.now(pytz.timezone("UTC"))
         if not self.time:
             self.time = current_time.isoformat()
+        last = datetime.datetime.fromisoformat(str(self.time))
+        timedifference = int((current_time - last).total_seconds())
         for data in self.servers:
             guild_id = str(data[0])
             guild = self.bot.get_guild(int(guild_id))
             if guild_id not in self.activeguilds:
                 continue
-            settings = await self.config.guild(guild).all()
+            # Loading the registry also seeds the accumulator's last seen maps, after that neither reads the config
+            registry = await self.get_registry(guild)
+            settings = await self.settings.get(guild)
             autofriend = settings["autofriend"]
             server = data[1]
             channel = server["chatchannel"]
@@ -4744,20 +4932,10 @@ class ArkTools(Calls, commands.Cog):
             if channel not in self.playerlist:
                 log.warning(f"Player_Stats: {mapstring} not found in playerlist!")
                 continue
-            if not self.playerlist[channel]:
-                continue
-            if self.playerlist[channel] == "offline":
+            if not self.playerlist[channel].online:
                 continue
-            if self.playerlist[channel] == "empty":
-                continue
-            players = settings["players"]
-            for player in self.playerlist[channel]:
-                last = datetime.datetime.fromisoformat(str(self.time))
-                timedifference = current_time - last
-                timedifference = int(timedifference.total_seconds())
-                xuid = player[1]
-                gamertag = player[0]
-                if xuid not in players:  # New player found
+            for xuid, gamertag in self.playerlist[channel].names.items():
+                if xuid not in registry.keys:  # New player found
                     task_name = f"ArkTools-{guild.name}-InitNewPlayer"
                     asyncio.create_task(
                         self.init_new_player(
@@ -4765,60 +4943,65 @@ class ArkTools(Calls, commands.Cog):
                         ),
                         name=task_name
                     )
-                else:
-                    last_seen = players[xuid]["lastseen"]["map"]
-                    if not last_seen:
-                        if "tokens" in server and autofriend:
-                            async with aiohttp.ClientSession() as session:
-                                tokens = server["tokens"]
-                                xbl_client, token = await self.auth_manager(
-                                    session,
-                                    cname,
-                                    sname,
-                                    tokens,
-                                    ctx=None,
-                                    guild=guild
-                                )
-                                if autofriend and xbl_client:
-                                    task_name = f"ArkTools-{guild.name}-AutoFriend"
-                                    asyncio.create_task(self.add_friend(str(xuid), token), name=task_name)
-                    async with self.config.guild(guild).players() as stats:
-                        if str(channel) not in stats[xuid]["ingame"]:
-                            stats[xuid]["ingame"][str(channel)] = {
-                                "implant": None,
-                                "name": None,
-                                "previous_names": [],
-                                "stats": {
-                                    "pvpkills": 0,
-                                    "pvpdeaths": 0,
-                                    "pvedeaths": 0,
-                                    "tamed": 0
-                                }
-                            }
-                        if mapstring not in stats[xuid]["playtime"]:
-                            stats[xuid]["playtime"][mapstring] = 0
-                        else:
-                            stats[xuid]["playtime"][mapstring] += timedifference
-                            stats[xuid]["playtime"]["total"] += timedifference
-                            stats[xuid]["lastseen"] = {
-                                "time": current_time.isoformat(),
-                                "map": mapstring
-                            }
-                            ranks = settings["ranks"]
-                            hours = int(stats[xuid]["playtime"]["total"] / 3600)
-                            if str(hours) in ranks:
-                                role = ranks[str(hours)]
-                                role = guild.get_role(role)
-                                if role and "rank" in stats[xuid] and "discord" in stats[xuid]:
-                                    current_rank = stats[xuid]["rank"]
-                                    if role.id != current_rank:
-                                        task_name = f"ArkTools-{guild.name}-UpdatingRanks"
-                                        asyncio.create_task(
-                                            self.update_ranks(guild, settings, stats, xuid),
-                                            name=task_name
-                                        )
-                                stats[xuid]["rank"] = role.id
+                    continue
+                # No last seen map means the player was unfriended for inactivity, so add them back
+                if not self.playtime.last_map(guild.id, xuid):
+                    if "tokens" in server and autofriend:
+                        session = self.get_session()
+                        tokens = server["tokens"]
+                        xbl_client, token = await self.auth_manager(
+                            session,
+                            cname,
+                            sname,
+                            tokens,
+                            ctx=None,
+                            guild=guild
+                        )
+                        if autofriend and xbl_client:
+                            task_name = f"ArkTools-{guild.name}-AutoFriend"
+                            host = (guild.id, cname, sname)
+                            asyncio.create_task(self.add_friend(str(xuid), token, host), name=task_name)
+                self.playtime.add(guild.id, xuid, mapstring, str(channel), timedifference, current_time.isoformat())
+                registry.seen(xuid, current_time.timestamp())
         self.time = datetime.datetime.now(pytz.timezone("UTC")).isoformat()
+        if self.playtime.due():
+            await self.flush_playtime()
+
+    # Write accumulated playtime back to the config, one transaction per guild
+    async def flush_playtime(self, guild: discord.guild = None):
+        if guild:
+            guild_ids = [guild.id] if self.playtime.seen_guild(guild.id) else []
+        else:
+            self.playtime.last_flush = time.monotonic()
+            guild_ids = self.playtime.dirty
+        for guild_id in guild_ids:
+            guild = self.bot.get_guild(guild_id)
+            pending = self.playtime.take(guild_id)
+            if not guild:
+                continue
+            try:
+                ranks = await self.config.guild(guild).ranks()
+                autoremove = await self.config.guild(guild).autoremove()
+                async with self.config.guild(guild).players() as stats:
+                    updated = apply_pending(stats, pending)
+                    for xuid in updated:
+                        self.index_player(guild, xuid, stats[xuid])
+                        hours = int(stats[xuid]["playtime"]["total"] / 3600)
+                        if str(hours) not in ranks:
+                            continue
+                        role = guild.get_role(ranks[str(hours)])
+                        if role and "rank" in stats[xuid] and "discord" in stats[xuid]:
+                            if role.id != stats[xuid]["rank"]:
+                                task_name = f"ArkTools-{guild.name}-UpdatingRanks"
+                                asyncio.create_task(
+                                    self.update_ranks(guild, {"ranks": ranks, "autoremove": autoremove}, stats, xuid),
+                                    name=task_name
+                                )
+                        if role:
+                            stats[xuid]["rank"] = role.id
+            except Exception as e:
+                log.warning(f"Failed to flush playtime for {guild.name}: {e}")
+                self.playtime.restore(guild_id, pending)
 
     @staticmethod
     async def update_ranks(guild: discord.guild, settings: dict, stats: dict, xuid: str):
@@ -4895,116 +5078,118 @@ class ArkTools(Calls, commands.Cog):
                 "lastseen": {"time": current_time.isoformat(), "map": mapstring},
                 "ingame": {}
             }
+            self.index_player(guild, xuid, stats[xuid])
+        self.playtime.set_map(guild.id, xuid, mapstring)
         newplayermessage = f"**{gamertag}** added to the database.\n"
         if "tokens" in server and (autowelcome or autofriend):
-            async with aiohttp.ClientSession() as session:
-                host = server["gamertag"]
-                tokens = server["tokens"]
-                xbl_client, token = await self.auth_manager(
-                    session,
-                    cname,
-                    sname,
-                    tokens,
-                    ctx=None,
-                    guild=guild
-                )
-                if autowelcome and xbl_client:
-                    try:
-                        inv = await guild.vanity_invite()
-                    except discord.Forbidden:
-                        try:
-                            inv = await channel_obj.create_invite(unique=False, reason="New Player")
-                        except Exception as e:
-                            log.exception(f"INVITE CREATION FAILED: {e}")
-                    if settings["welcomemsg"]:
-                        params = {
-                            "discord": guild.name,
-                            "gamertag": gamertag,
-                            "link": inv
-                        }
-                        welcome = settings["welcomemsg"]
-                        welcome = welcome.format(**params)
-                    else:
-                        welcome = f"Welcome to {guild.name}!\nThis is an automated message:\n" \
-                                  f"You appear to be a new player, " \
-                                  f"here is an invite to the Discord server:\n\n{inv}"
+            session = self.get_session()
+            host = server["gamertag"]
+            tokens = server["tokens"]
+            xbl_client, token = await self.auth_manager(
+                session,
+                cname,
+                sname,
+                tokens,
+                ctx=None,
+                guild=guild
+            )
+            if autowelcome and xbl_client:
+                try:
+                    inv = await guild.vanity_invite()
+                except discord.Forbidden:
                     try:
-                        task_name = f"ArkTools-{guild.name}-NewPlayerSendXboxDM"
-                        asyncio.create_task(
-                            xbl_client.message.send_message(str(xuid), welcome), name=task_name
-                        )
-                        newplayermessage += f"DM sent: ✅\n"
+                        inv = await channel_obj.create_invite(unique=False, reason="New Player")
                     except Exception as e:
-                        log.warning(f"{gamertag} Failed to DM New Player in guild {guild}: {e}")
-                        newplayermessage += f"DM sent: ❌ {e}\n"
+                        log.exception(f"INVITE CREATION FAILED: {e}")
+                if settings["welcomemsg"]:
+                    params = {
+                        "discord": guild.name,
+                        "gamertag": gamertag,
+                        "link": inv
+                    }
+                    welcome = settings["welcomemsg"]
+                    welcome = welcome.format(**params)
+                else:
+                    welcome = f"Welcome to {guild.name}!\nThis is an automated message:\n" \
+                              f"You appear to be a new player, " \
+                              f"here is an invite to the Discord server:\n\n{inv}"
+                try:
+                    task_name = f"ArkTools-{guild.name}-NewPlayerSendXboxDM"
+                    asyncio.create_task(
+                        xbl_client.message.send_message(str(xuid), welcome), name=task_name
+                    )
+                    newplayermessage += f"DM sent: ✅\n"
+                except Exception as e:
+                    log.warning(f"{gamertag} Failed to DM New Player in guild {guild}: {e}")
+                    newplayermessage += f"DM sent: ❌ {e}\n"
 
-                if autofriend and xbl_client:
-                    status = await self.add_friend(str(xuid), token)
-                    if 200 <= status <= 204:
-                        newplayermessage += f"Added by {host}: ✅\n"
-                    else:
-                        log.warning(f"{host} FAILED to add {gamertag} in guild {guild}")
-                        newplayermessage += f"Added by {host}: ❌\n"
+            if autofriend and xbl_client:
+                status = await self.add_friend(str(xuid), token, (guild.id, cname, sname))
+                if 200 <= status <= 204:
+                    newplayermessage += f"Added by {host}: ✅\n"
+                else:
+                    log.warning(f"{host} FAILED to add {gamertag} in guild {guild}")
+                    newplayermessage += f"Added by {host}: ❌\n"
 
-                alt = settings["alt"]
-                if alt["on"] and xbl_client:  # If alt detection is on
-                    try:
-                        profile = json.loads(
-                            (
-                                await xbl_client.profile.get_profile_by_gamertag(gamertag)
-                            ).json()
-                        )
-                        friends = json.loads(
-                            (
-                                await xbl_client.people.get_friends_summary_by_gamertag(gamertag)
-                            ).json()
-                        )
-                    except aiohttp.ClientResponseError:
-                        profile = None
-                        friends = None
-                    if profile and friends:
-                        sus, reasons = detect_sus(alt, profile, friends)
-                        if sus:
-                            yes = "✅"
-                            no = "❌"
-                            if alt["autoban"] and int(xuid) not in alt["whitelist"]:
-                                banned = yes
-                                command = f"banplayer {xuid}"
-                                for tup in self.servers:
-                                    sguild = tup[0]
-                                    server = tup[1]
-                                    task_name = f"ArkTools-{guild.name}-{server['name']}-" \
-                                                f"{server['cluster']}-Banplayer"
-                                    if sguild == guild.id:
-                                        asyncio.create_task(
-                                            self.executor(guild, server, command),
-                                            name=task_name
-                                        )
-                                log.info(f"Banning {gamertag} - {xuid} from all servers")
-                            else:
-                                banned = no
-                            if alt["msgtoggle"] and alt["msg"]:
-                                warning = yes
-                                params = {"reasons": reasons}
-                                msg = alt["msg"].format(**params)
-                                await xbl_client.message.send_message(str(xuid), msg)
-                            else:
-                                warning = no
-                            if eventlog:
-                                embed = discord.Embed(
-                                    description=f"**Suspicious account detected!**\n"
-                                                f"**{gamertag}** - `{xuid}`\n"
-                                                f"`Auto-Banned:  `{banned}\n"
-                                                f"`Sent Warning: `{warning}\n"
-                                                f"**Reasons**\n"
-                                                f"{box(reasons)}",
-                                    color=discord.Color.orange()
-                                )
-                                try:
-                                    await eventlog.send(embed=embed)
-                                except discord.HTTPException:
-                                    log.warning("Sus account message failed.")
-                                    pass
+            alt = settings["alt"]
+            if alt["on"] and xbl_client:  # If alt detection is on
+                try:
+                    profile = json.loads(
+                        (
+                            await xbl_client.profile.get_profile_by_gamertag(gamertag)
+                        ).json()
+                    )
+                    friends = json.loads(
+                        (
+                            await xbl_client.people.get_friends_summary_by_gamertag(gamertag)
+                        ).json()
+                    )
+                except aiohttp.ClientResponseError:
+                    profile = None
+                    friends = None
+                if profile and friends:
+                    sus, reasons = detect_sus(alt, profile, friends)
+                    if sus:
+                        yes = "✅"
+                        no = "❌"
+                        if alt["autoban"] and int(xuid) not in alt["whitelist"]:
+                            banned = yes
+                            command = f"banplayer {xuid}"
+                            for tup in self.servers:
+                                sguild = tup[0]
+                                server = tup[1]
+                                task_name = f"ArkTools-{guild.name}-{server['name']}-" \
+                                            f"{server['cluster']}-Banplayer"
+                                if sguild == guild.id:
+                                    asyncio.create_task(
+                                        self.executor(guild, server, command),
+                                        name=task_name
+                                    )
+                            log.info(f"Banning {gamertag} - {xuid} from all servers")
+                        else:
+                            banned = no
+                        if alt["msgtoggle"] and alt["msg"]:
+                            warning = yes
+                            params = {"reasons": reasons}
+                            msg = alt["msg"].format(**params)
+                            await xbl_client.message.send_message(str(xuid), msg)
+                        else:
+                            warning = no
+                        if eventlog:
+                            embed = discord.Embed(
+                                description=f"**Suspicious account detected!**\n"
+                                            f"**{gamertag}** - `{xuid}`\n"
+                                            f"`Auto-Banned:  `{banned}\n"
+                                            f"`Sent Warning: `{warning}\n"
+                                            f"**Reasons**\n"
+                                            f"{box(reasons)}",
+                                color=discord.Color.orange()
+                            )
+                            try:
+                                await eventlog.send(embed=embed)
+                            except discord.HTTPException:
+                                log.warning("Sus account message failed.")
+                                pass
 
         if eventlog:
             embed = discord.Embed(
@@ -5029,6 +5214,8 @@ class ArkTools(Calls, commands.Cog):
         if not autoclear:
             return
         await self.config.guild(guild).clear()
+        self.settings.invalidate(guild.id)
+        await self.delete_graphstore(guild)
         await self.initialize()
         log.info(f"Guild {guild.name}'s config has been cleared for kicking the bot")
 
@@ -5057,27 +5244,28 @@ class ArkTools(Calls, commands.Cog):
                                 tokendata.append((xuid, cname, sname, server["tokens"]))
         if len(tokendata) == 0:
             return
-        async with aiohttp.ClientSession() as session:
-            for item in tokendata:
-                xbl_client, token = await self.auth_manager(
-                    session,
-                    item[1],
-                    item[2],
-                    item[3],
-                    ctx=None,
-                    guild=member.guild
-                )
-                if token:
-                    task_name = f"ArkTools-{member.guild.name}-Unfriending-{member.name}"
-                    asyncio.create_task(self.remove_friend(item[0], token), name=task_name)
-            if eventlog:
-                eventlog = member.guild.get_channel(eventlog)
-                embed = discord.Embed(
-                    description=f"**{member.display_name}** - `{member.id}` was unfriended by the host Gamertags "
-                                f"for leaving the Discord.",
-                    color=discord.Color.blurple()
-                )
-                await eventlog.send(embed=embed)
+        session = self.get_session()
+        for item in tokendata:
+            xbl_client, token = await self.auth_manager(
+                session,
+                item[1],
+                item[2],
+                item[3],
+                ctx=None,
+                guild=member.guild
+            )
+            if token:
+                task_name = f"ArkTools-{member.guild.name}-Unfriending-{member.name}"
+                host = (member.guild.id, item[1], item[2])
+                asyncio.create_task(self.remove_friend(item[0], token, host), name=task_name)
+        if eventlog:
+            eventlog = member.guild.get_channel(eventlog)
+            embed = discord.Embed(
+                description=f"**{member.display_name}** - `{member.id}` was unfriended by the host Gamertags "
+                            f"for leaving the Discord.",
+                color=discord.Color.blurple()
+            )
+            await eventlog.send(embed=embed)
 
     # Unfriends players if they havent been seen on any server for the set amount of time
     @tasks.loop(hours=2)
@@ -5087,19 +5275,13 @@ class ArkTools(Calls, commands.Cog):
             return
         for guild in self.activeguilds:
             guild = self.bot.get_guild(int(guild))
-            settings = await self.config.guild(guild).all()
+            settings = await self.settings.get(guild)
             autofriend = settings["autofriend"]
             if not autofriend:
                 continue
             eventlog = settings["eventlog"]
             eventlog = guild.get_channel(eventlog)
-            stats = settings["players"]
             unfriendtime = int(settings["unfriendafter"])
-            # List of users who havent been detected on the servers in X amount of time
-            expired = await expired_players(stats, unfriendtime)
-            if len(expired) == 0:
-                continue
-
             tokendata = []
             for cname, cluster in settings["clusters"].items():
                 for sname, server in cluster["servers"].items():
@@ -5108,41 +5290,61 @@ class ArkTools(Calls, commands.Cog):
             if len(tokendata) == 0:
                 continue
 
+            # Users who havent been detected on the servers in X amount of time, oldest first
+            registry = await self.get_registry(guild)
+            cutoff = time.time() - unfriendtime * 86400
+            expired = registry.lastseen.pop_expired(cutoff)
+            if len(expired) == 0:
+                continue
+
             # Remove players from host Gamertags' friends list
-            async with aiohttp.ClientSession() as session:
-                for item in tokendata:
-                    xbl_client, token = await self.auth_manager(
-                        session,
-                        item[0],
-                        item[1],
-                        item[2],
-                        ctx=None,
-                        guild=guild
-                    )
-                    if token:
-                        host = f"{item[1].capitalize()} {item[0].upper()}"
-                        # Adding expired players to unfriend queue
-                        async with self.config.guild(guild).players() as playerstats:
-                            for user in expired:
-                                xuid = user[0]
-                                playerstats[xuid]["lastseen"]["map"] = None
-                                player = user[1]
-                                status = await self.remove_friend(xuid, token)
-                                if 200 <= status <= 204:
-                                    # Set last seen to None
-                                    msg = "This is an automated message:\n\n" \
-                                          "You have been unfriended by this Gamertag.\n" \
-                                          f"Reason: No activity in any server over the last {unfriendtime} days\n" \
-                                          f"To play this map again simply friend the account and join session."
-                                    await xbl_client.message.send_message(str(xuid), msg)
-                                else:
-                                    log.info(f"Failed to unfriend {player} - {xuid} by the host {host} "
-                                             f"for exceeding {unfriendtime} days of inactivity.")
+            session = self.get_session()
+            sessions = []
+            hosts = []
+            xuids = [xuid for xuid, _ in expired]
+            for cname, sname, tokens in tokendata:
+                xbl_client, token = await self.auth_manager(
+                    session,
+                    cname,
+                    sname,
+                    tokens,
+                    ctx=None,
+                    guild=guild
+                )
+                if token:
+                    host = (guild.id, cname, sname)
+                    hosts.append(host)
+                    sessions.append(self.budget.run(
+                        host,
+                        self.maintenance_session(xbl_client, token, host, xuids, unfriendtime)
+                    ))
+            if not sessions:
+                # No host could be authorized, try these players again next run
+                for xuid, timestamp in expired:
+                    registry.seen(xuid, timestamp)
+                continue
+            results = await asyncio.gather(*sessions, return_exceptions=True)
+
+            # Set last seen to None for everyone in one write
+            names = {}
+            async with self.config.guild(guild).players() as playerstats:
+                for xuid in xuids:
+                    if xuid not in playerstats:
+                        continue
+                    playerstats[xuid]["lastseen"]["map"] = None
+                    self.playtime.set_map(guild.id, xuid, None)
+                    names[xuid] = playerstats[xuid]["username"]
+
+            for (_, cname, sname), result in zip(hosts, results):
+                if isinstance(result, Exception):
+                    log.warning(f"Maintenance Session Error: {result}")
+                    continue
+                for xuid in result:
+                    log.info(f"Failed to unfriend {names.get(xuid)} - {xuid} by the host "
+                             f"{sname.capitalize()} {cname.upper()} for exceeding {unfriendtime} days of inactivity.")
 
             if eventlog:
-                for user in expired:
-                    player = user[1]
-                    xuid = user[0]
+                for xuid, player in names.items():
                     embed = discord.Embed(
                         description=f"**{player}** - `{xuid}` was unfriended by the "
                                     f"host Gamertags for exceeding {unfriendtime} days of inactivity.",
@@ -5150,6 +5352,22 @@ class ArkTools(Calls, commands.Cog):
                     )
                     await eventlog.send(embed=embed)
 
+    # Unfriend a batch of players from one host, returns the xuids that failed
+    async def maintenance_session(self, xbl_client, token, host, xuids, unfriendtime) -> typing.List[str]:
+        failed = []
+        for xuid in xuids:
+            status = await self.remove_friend(xuid, token, host)
+            if 200 <= status <= 204:
+                msg = "This is an automated message:\n\n" \
+                      "You have been unfriended by this Gamertag.\n" \
+                      f"Reason: No activity in any server over the last {unfriendtime} days\n" \
+                      f"To play this map again simply friend the account and join session."
+                await self.budget.wait(host)
+                await xbl_client.message.send_message(str(xuid), msg)
+            else:
+                failed.append(xuid)
+        return failed
+
     @maintenance.before_loop
     async def before_maintenance(self):
         await self.bot.wait_until_red_ready()
@@ -5161,30 +5379,33 @@ class ArkTools(Calls, commands.Cog):
         cid = await self.config.clientid()
         if not cid:
             return
+        session = self.get_session()
+        sessions = []
         for guild in self.activeguilds:
             guild = self.bot.get_guild(int(guild))
-            settings = await self.config.guild(guild).all()
+            settings = await self.settings.get(guild)
             autofriend = settings["autofriend"]
             if not autofriend:
                 continue
             eventlog = settings["eventlog"]
             eventlog = guild.get_channel(eventlog)
-            tokendata = []
             for cname, cluster in settings["clusters"].items():
                 for sname, server in cluster["servers"].items():
                     if "tokens" in server:
-                        tokendata.append((cname, sname, server["tokens"]))
-            if len(tokendata) == 0:
-                continue
-
-            async with aiohttp.ClientSession() as session:
-                for item in tokendata:
-                    cname = item[0]
-                    sname = item[1]
-                    tokens = item[2]
-                    await self.autofriend_session(session, guild, cname, sname, tokens, eventlog)
+                        sessions.append(self.budget.run(
+                            (guild.id, cname, sname),
+                            self.autofriend_session(session, guild, cname, sname, server["tokens"], eventlog)
+                        ))
+        if not sessions:
+            return
+        # Every host Gamertag runs at once, the budget limits how many and how fast they hit Xbox Live
+        results = await asyncio.gather(*sessions, return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                log.warning(f"Autofriend Session Error: {result}")
 
     async def autofriend_session(self, session, guild: discord.guild, cname, sname, tokens, eventlog):
+        host = (guild.id, cname, sname)
         xbl_client, token = await self.auth_manager(
             session,
             cname,
@@ -5195,9 +5416,17 @@ class ArkTools(Calls, commands.Cog):
         )
         if token:
             try:
+                await self.budget.wait(host)
                 friends = json.loads((await xbl_client.people.get_friends_own()).json())
+            except aiohttp.ClientResponseError as e:
+                if e.status == 429:
+                    self.budget.backoff(host, retry_after(e.headers))
+                else:
+                    log.warning(f"Autofriend Session Error: {e}")
+                return
             except Exception as e:
                 if "Too Many Requests" in str(e):
+                    self.budget.backoff(host, DEFAULT_RETRY)
                     return
                 elif "validation error" in str(e):
                     return
@@ -5205,7 +5434,7 @@ class ArkTools(Calls, commands.Cog):
                     log.warning(f"Autofriend Session Error: {e}")
                     return
             friends = friends["people"]
-            followers = await self.get_followers_own(token)
+            followers = await self.get_followers_own(token, host)
             if "people" not in followers:
                 return
             followers = followers["people"]
@@ -5216,7 +5445,7 @@ class ArkTools(Calls, commands.Cog):
             cname = cname.upper()
             if len(people_to_add) > 0:
                 for xuid, username in people_to_add:
-                    status = await self.add_friend(xuid, token)
+                    status = await self.add_friend(xuid, token, host)
                     if 200 <= status <= 204 and eventlog:
                         embed = discord.Embed(
                             description=f"**{sname} {cname}** accepted **{username}**'s friend request.",
@@ -5229,6 +5458,7 @@ class ArkTools(Calls, commands.Cog):
                                 pass
                         welcome = f"Friend request accepted! " \
                                   f"{username}, you can now join session from this account's profile page"
+                        await self.budget.wait(host)
                         await xbl_client.message.send_message(str(xuid), welcome)
                     else:
                         embed = discord.Embed(
@@ -5254,11 +5484,12 @@ class ArkTools(Calls, commands.Cog):
                 time = datetime.datetime.now(tz)
                 timedifference = time - added
                 if not following and timedifference.days > 0:
-                    status = await self.remove_friend(xuid, token)
+                    status = await self.remove_friend(xuid, token, host)
                     if 200 <= status <= 204:
                         ustatus = "successfully"
                         msg = f"Hi {username}, you have been unfollowed by this account for not following back.\n" \
                               "To play this map again simply add the account again and join session."
+                        await self.budget.wait(host)
                         await xbl_client.message.send_message(str(xuid), msg)
                     else:
                         ustatus = "unsuccessfully"
@@ -5276,39 +5507,6 @@ class ArkTools(Calls, commands.Cog):
         await asyncio.sleep(30)
         log.info("Autofriend loop ready")
 
-    @tasks.loop(hours=5)
-    async def graphdata_prune(self):
-        pruned = 0
-        for guild in self.activeguilds:
-            guild = self.bot.get_guild(int(guild))
-            if not guild:
-                continue
-            stats = {}
-            data = await self.config.guild(guild).serverstats()
-            exp = data["expiration"]
-            curcounts = data["counts"]
-            to_keep = exp * 1440
-            stats["expiration"] = exp
-            for item, dat in data.items():
-                if item != "expiration":
-                    if len(dat) > to_keep:
-                        dat.reverse()
-                        newdat = dat[:to_keep]
-                        newdat.reverse()
-                        stats[str(item)] = newdat
-            if len(curcounts) > to_keep:
-                diff = len(curcounts) - to_keep
-                pruned += diff
-                await self.config.guild(guild).serverstats.set(stats)
-        if pruned:
-            log.info(f"Pruned {pruned} graph data points")
-
-    @graphdata_prune.before_loop
-    async def before_graphdata_prune(self):
-        await self.bot.wait_until_red_ready()
-        await asyncio.sleep(60)
-        log.info("Janitor ready")
-
     @commands.command(name="alltasks")
     @commands.is_owner()
     @commands.guild_only()
@@ -5355,3 +5553,60 @@ class ArkTools(Calls, commands.Cog):
                 os.remove(fname)
             except Exception as e:
                 log.warning(f"Failed to delete txt file: {e}")
+
+    @commands.command(name="pollstats")
+    @commands.is_owner()
+    @commands.guild_only()
+    async def get_poll_stats(self, ctx):
+        """View the achieved RCON poll rate, health and latency for each server"""
+        table = []
+        for (channel, command), stats in self.scheduler.stats.items():
+            guild_id, server = self.scheduler.targets[(channel, command)]
+            if guild_id != ctx.guild.id:
+                continue
+            queue = self.outbound.get(channel)
+            health = self.health.get(channel)
+            latency = health.latency.get(command)
+            table.append([
+                f"{server['name']} {server['cluster']}",
+                command,
+                f"{round(stats.rate, 1)}/m",
+                f"{stats.interval}s",
+                stats.failures,
+                health.state.value,
+                f"{round(latency.percentile(50) * 1000)}/{round(latency.percentile(95) * 1000)}ms" if latency else "-",
+                queue.depth if queue else 0,
+                f"{round(queue.last_latency * 1000)}ms" if queue else "-"
+            ])
+        if not table:
+            return await ctx.send("No servers are being polled in this guild")
+        headers = ["Server", "Command", "Rate", "Interval", "Fails", "Health", "p50/p95", "Queue", "Flush"]
+        for p in pagify(tabulate.tabulate(table, headers, tablefmt="presto")):
+            await ctx.send(box(p, lang="python"))
+
+    @commands.command(name="xboxstats")
+    @commands.is_owner()
+    @commands.guild_only()
+    async def get_xbox_stats(self, ctx):
+        """View autofriend/maintenance sweep times and rate limits for each host Gamertag"""
+        table = []
+        now = time.monotonic()
+        for host, stats in self.budget.stats.items():
+            guild_id, cname, sname = host
+            if guild_id != ctx.guild.id:
+                continue
+            blocked = self.budget.blocked.get(host, 0.0) - now
+            table.append([
+                f"{sname.capitalize()} {cname.upper()}",
+                stats.sweeps,
+                f"{round(stats.last_sweep, 1)}s",
+                f"{round(stats.slowest, 1)}s",
+                stats.requests,
+                stats.limited,
+                f"{round(blocked)}s" if blocked > 0 else "-"
+            ])
+        if not table:
+            return await ctx.send("No host Gamertags have been swept in this guild yet")
+        headers = ["Host", "Sweeps", "Last", "Slowest", "Requests", "429s", "Paused"]
+        for p in pagify(tabulate.tabulate(table, headers, tablefmt="presto")):
+            await ctx.send(box(p, lang="python"))
@@ -0,0 +1,168 @@
+import asyncio
+import itertools
+import logging
+import struct
+import typing
+
+log = logging.getLogger("red.vrt.arktools.asyncrcon")
+
+# Source RCON packet types
+SERVERDATA_AUTH = 3
+SERVERDATA_AUTH_RESPONSE = 2
+SERVERDATA_EXECCOMMAND = 2
+SERVERDATA_RESPONSE_VALUE = 0
+
+# Servers split responses into packets with bodies of this size, a full packet means more are coming
+MAX_BODY = 4096
+# How long to wait for the next fragment of a split response to the last command in flight,
+# replies to earlier commands are known to be complete as soon as the next reply starts
+FRAGMENT_TIMEOUT = 0.25
+# Ignore anything claiming to be bigger than this, the stream is out of sync at that point
+MAX_PACKET = 1 << 16
+
+HEADER = struct.Struct("<ii")
+SIZE = struct.Struct("<i")
+
+
+class RconError(Exception):
+    pass
+
+
+class RconAuthError(RconError):
+    pass
+
+
+def encode_packet(request_id: int, packet_type: int, body: str) -> bytes:
+    payload = HEADER.pack(request_id, packet_type) + body.encode("utf-8") + b"\x00\x00"
+    return SIZE.pack(len(payload)) + payload
+
+
+async def read_packet(reader: asyncio.StreamReader) -> typing.Tuple[int, int, str]:
+    size = SIZE.unpack(await reader.readexactly(4))[0]
+    if size < 10 or size > MAX_PACKET:
+        raise RconError(f"Invalid packet size {size}")
+    data = await reader.readexactly(size)
+    request_id, packet_type = HEADER.unpack(data[:8])
+    body = data[8:-2].decode("utf-8", errors="replace")
+    return request_id, packet_type, body
+
+
+class AsyncRconClient:
+    """
+    Native asyncio Source RCON client
+
+    Pipelined commands are answered in order, responses that span multiple packets are reassembled
+    before returning. Packets that arrive for a later command while reading one are kept until that command
+    reads them, so a long reply never costs the next command its answer
+    """
+    def __init__(self, host: str, port: int, passwd: str):
+        self.host = host
+        self.port = port
+        self.passwd = passwd
+        self.reader: typing.Optional[asyncio.StreamReader] = None
+        self.writer: typing.Optional[asyncio.StreamWriter] = None
+        self.ids = itertools.count(1)
+        # Request IDs that were written but haven't been read yet
+        self.outstanding: typing.Set[int] = set()
+        # Request ID -> fragments read ahead while waiting on an earlier reply
+        self.buffered: typing.Dict[int, typing.List[str]] = {}
+        # Packet read that outlived a fragment timeout, the next read picks it up so the stream stays in sync
+        self.reading: typing.Optional[asyncio.Future] = None
+
+    @property
+    def connected(self) -> bool:
+        return self.writer is not None and not self.writer.is_closing()
+
+    async def connect(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        auth_id = next(self.ids)
+        self.writer.write(encode_packet(auth_id, SERVERDATA_AUTH, self.passwd))
+        await self.writer.drain()
+        # Servers send an empty RESPONSE_VALUE before the actual AUTH_RESPONSE
+        while True:
+            request_id, packet_type, _ = await read_packet(self.reader)
+            if packet_type == SERVERDATA_AUTH_RESPONSE:
+                break
+        if request_id == -1 or request_id != auth_id:
+            self.close()
+            raise RconAuthError(f"Authentication failed for {self.host}:{self.port}")
+
+    async def run(self, command: str) -> str:
+        if not self.connected:
+            await self.connect()
+        request_id = next(self.ids)
+        self.outstanding.add(request_id)
+        self.writer.write(encode_packet(request_id, SERVERDATA_EXECCOMMAND, command))
+        await self.writer.drain()
+        return await self.read_response(request_id)
+
+    # Pipeline several commands, all packets are written before any responses are read
+    # Responses are appended to the given list as they arrive, so callers can tell how far a failed batch got
+    async def run_many(self, commands: typing.List[str], responses: typing.List[str] = None) -> typing.List[str]:
+        if not self.connected:
+            await self.connect()
+        request_ids = []
+        for command in commands:
+            request_id = next(self.ids)
+            request_ids.append(request_id)
+            self.outstanding.add(request_id)
+            self.writer.write(encode_packet(request_id, SERVERDATA_EXECCOMMAND, command))
+        await self.writer.drain()
+        if responses is None:
+            responses = []
+        for request_id in request_ids:
+            responses.append(await self.read_response(request_id))
+        return responses
+
+    async def next_packet(self, timeout: float = None) -> typing.Tuple[int, int, str]:
+        # The read is never cancelled part way through a packet, a timeout leaves it running for the next call
+        if self.reading is None:
+            self.reading = asyncio.ensure_future(read_packet(self.reader))
+        done, _ = await asyncio.wait({self.reading}, timeout=timeout)
+        if not done:
+            raise asyncio.TimeoutError
+        reading, self.reading = self.reading, None
+        return reading.result()
+
+    # Keep a packet for a later command, returns False if it's a late reply to something that already gave up
+    def stash(self, request_id: int, fragment: str) -> bool:
+        if request_id not in self.outstanding:
+            log.debug(f"{self.host}:{self.port} discarded stale packet {request_id}")
+            return False
+        self.buffered.setdefault(request_id, []).append(fragment)
+        return True
+
+    async def read_response(self, request_id: int) -> str:
+        try:
+            fragments = self.buffered.pop(request_id, [])
+            while not fragments:
+                rid, _, fragment = await self.next_packet()
+                if rid == request_id:
+                    fragments.append(fragment)
+                else:
+                    self.stash(rid, fragment)
+            # Replies come back in order, once a later command's reply has started this one is complete
+            while len(fragments[-1].encode("utf-8")) >= MAX_BODY and not self.buffered:
+                try:
+                    rid, _, fragment = await self.next_packet(FRAGMENT_TIMEOUT)
+                except asyncio.TimeoutError:
+                    break
+                if rid == request_id:
+                    fragments.append(fragment)
+                else:
+                    self.stash(rid, fragment)
+            return "".join(fragments)
+        finally:
+            self.outstanding.discard(request_id)
+
+    def close(self):
+        writer = self.writer
+        self.reader = None
+        self.writer = None
+        self.outstanding.clear()
+        self.buffered.clear()
+        if self.reading:
+            self.reading.cancel()
+            self.reading = None
+        if writer:
+            writer.close()
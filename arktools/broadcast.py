@@ -0,0 +1,124 @@
+import asyncio
+import time
+import typing
+
+# How long each reboot phase waits on the servers before moving on, in seconds
+ALERT_DEADLINE = 5.0
+TICK_DEADLINE = 0.9
+SAVE_DEADLINE = 15.0
+EXIT_DEADLINE = 10.0
+# Seconds between saving and exiting so the save can finish writing
+SAVE_GRACE = 2
+
+# Sends a command to a server, returns the response or None if it failed
+Runner = typing.Callable[[dict, str], typing.Awaitable[typing.Optional[str]]]
+
+
+class ServerResult:
+    def __init__(self, name: str):
+        self.name = name
+        # Phase name -> (succeeded, seconds), None if it didn't answer before the deadline
+        self.phases: typing.Dict[str, typing.Tuple[bool, typing.Optional[float]]] = {}
+        self.ticks = 0
+        self.missed = 0
+
+
+class Broadcaster:
+    """
+    Runs commands on a set of servers at once, one phase at a time
+
+    Each phase waits on the servers up to its deadline and records how each one did,
+    a server that is slow to answer only delays itself and never the phase or the servers after it
+    """
+    def __init__(self, servers: typing.List[dict], run: Runner):
+        self.servers = servers
+        self.run = run
+        # Chat channel ID -> the command still running on that server
+        self.inflight: typing.Dict[int, asyncio.Task] = {}
+        self.results = {
+            server["chatchannel"]: ServerResult(f"{server['name']} {server['cluster']}") for server in servers
+        }
+
+    async def timed(self, server: dict, command: str, previous: asyncio.Task = None) -> typing.Tuple[bool, float]:
+        # Commands on the same server stay in order
+        if previous and not previous.done():
+            await asyncio.wait({previous})
+        start = time.monotonic()
+        res = await self.run(server, command)
+        return bool(res), time.monotonic() - start
+
+    # Send to every server, servers still busy with the last command are skipped unless wait_busy is set
+    async def send(
+            self,
+            command: str,
+            deadline: float,
+            wait_busy: bool = False
+    ) -> typing.Dict[int, typing.Optional[typing.Tuple[bool, typing.Optional[float]]]]:
+        tasks = {}
+        skipped = []
+        for server in self.servers:
+            key = server["chatchannel"]
+            previous = self.inflight.get(key)
+            if previous and not previous.done() and not wait_busy:
+                skipped.append(key)
+                continue
+            task = asyncio.create_task(self.timed(server, command, previous))
+            task.add_done_callback(self.discard)
+            self.inflight[key] = task
+            tasks[task] = key
+        done = set()
+        if tasks:
+            done, _ = await asyncio.wait(tasks, timeout=deadline)
+        results = {key: None for key in skipped}
+        for task, key in tasks.items():
+            if task in done and not task.exception():
+                results[key] = task.result()
+            else:
+                results[key] = (False, None)
+        return results
+
+    async def phase(self, name: str, command: str, deadline: float):
+        for key, result in (await self.send(command, deadline, wait_busy=True)).items():
+            self.results[key].phases[name] = result
+
+    # Count down to zero, each tick is scheduled against the start time so slow servers can't make it drift
+    async def countdown(self, seconds: int, message: typing.Callable[[int], str]):
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        for i in range(seconds, 0, -1):
+            delay = start + seconds - i - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            elif delay < -TICK_DEADLINE:
+                # Fell behind, skip the tick rather than send a number that's already wrong
+                for result in self.results.values():
+                    result.missed += 1
+                continue
+            for key, result in (await self.send(message(i), TICK_DEADLINE)).items():
+                if result and result[0]:
+                    self.results[key].ticks += 1
+                else:
+                    self.results[key].missed += 1
+        delay = start + seconds - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def table(self, phases: typing.List[str]) -> typing.List[list]:
+        rows = []
+        for result in self.results.values():
+            row = [result.name]
+            for name in phases:
+                ok, latency = result.phases.get(name, (False, None))
+                if latency is None:
+                    row.append("timeout" if name in result.phases else "-")
+                else:
+                    row.append(f"{'ok' if ok else 'failed'} {round(latency * 1000)}ms")
+            row.append(f"{result.ticks}/{result.ticks + result.missed}")
+            rows.append(row)
+        return rows
+
+    @staticmethod
+    def discard(task: asyncio.Task):
+        # Retrieve errors from commands that outlived their phase so they aren't logged as never retrieved
+        if not task.cancelled():
+            task.exception()
@@ -1,51 +1,84 @@
 import json
+import typing
 
 import aiohttp
 
+from .xboxbudget import HostKey, RETRIES, XboxBudget, retry_after
+
 HEADERS = {
     'x-xbl-contract-version': '2',
     'Authorization': '',
     'Accept-Language': 'en-US',
 }
+# Most connections the shared session keeps open at once
+SESSION_LIMIT = 20
 
 
 class Calls:
     """XSAPI endpoints that xbox-webapi doesn't have"""
-    async def add_friend(self, xuid: str, token: str) -> int:
+    session: typing.Optional[aiohttp.ClientSession] = None
+    budget: typing.Optional[XboxBudget] = None
+
+    # One session for the life of the cog so every Xbox call reuses the same connections
+    def get_session(self) -> aiohttp.ClientSession:
+        if not self.session or self.session.closed:
+            self.session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=SESSION_LIMIT))
+        return self.session
+
+    @staticmethod
+    def headers(token: str) -> dict:
+        return {**HEADERS, "Authorization": token}
+
+    # Calls made for a host go through its request budget and wait out 429s, command calls are sent right away
+    async def request(
+            self,
+            method: str,
+            url: str,
+            token: str,
+            host: HostKey = None,
+            data: str = None,
+            read: bool = False
+    ) -> typing.Tuple[int, typing.Optional[dict]]:
+        budgeted = host is not None and self.budget is not None
+        attempt = 0
+        while True:
+            if budgeted:
+                await self.budget.wait(host)
+            async with self.get_session().request(method, url, headers=self.headers(token), data=data) as res:
+                if res.status == 429 and budgeted:
+                    self.budget.backoff(host, retry_after(res.headers))
+                    if attempt < RETRIES:
+                        attempt += 1
+                        continue
+                if read and res.status == 200:
+                    return res.status, await res.json()
+                return res.status, None
+
+    async def add_friend(self, xuid: str, token: str, host: HostKey = None) -> int:
         url = f"https://social.xboxlive.com/users/me/people/xuid({xuid})"
-        HEADERS["Authorization"] = token
-        async with aiohttp.ClientSession() as session:
-            async with session.put(url=url, headers=HEADERS) as res:
-                return res.status
+        status, _ = await self.request("PUT", url, token, host)
+        return status
 
-    async def remove_friend(self, xuid: str, token: str) -> int:
+    async def remove_friend(self, xuid: str, token: str, host: HostKey = None) -> int:
         url = f"https://social.xboxlive.com/users/me/people/xuid({xuid})"
-        HEADERS["Authorization"] = token
-        async with aiohttp.ClientSession() as session:
-            async with session.delete(url=url, headers=HEADERS) as res:
-                return res.status
+        status, _ = await self.request("DELETE", url, token, host)
+        return status
 
     async def block_player(self, xuid: int, token: str) -> int:
         url = f"https://privacy.xboxlive.com/users/me/people/never"
-        HEADERS["Authorization"] = token
         payload = {"xuid": xuid}
         payload = json.dumps(payload)
-        async with aiohttp.ClientSession() as session:
-            async with session.put(url=url, headers=HEADERS, data=payload) as res:
-                return res.status
+        async with self.get_session().put(url=url, headers=self.headers(token), data=payload) as res:
+            return res.status
 
     async def unblock_player(self, xuid: int, token: str) -> int:
         url = f"https://privacy.xboxlive.com/users/me/people/never"
-        HEADERS["Authorization"] = token
         payload = {"xuid": xuid}
         payload = json.dumps(payload)
-        async with aiohttp.ClientSession() as session:
-            async with session.delete(url=url, headers=HEADERS, data=payload) as res:
-                return res.status
+        async with self.get_session().delete(url=url, headers=self.headers(token), data=payload) as res:
+            return res.status
 
-    async def get_followers_own(self, token: str) -> dict:
+    async def get_followers_own(self, token: str, host: HostKey = None) -> dict:
         url = "https://peoplehub.xboxlive.com/users/me/people/followers/decoration/details"
-        HEADERS["Authorization"] = token
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url=url, headers=HEADERS) as res:
-                return await res.json()
+        status, data = await self.request("GET", url, token, host, read=True)
+        return data or {}
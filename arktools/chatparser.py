@@ -0,0 +1,72 @@
+import enum
+import re
+import time
+import typing
+
+ADMIN_PREFIX = "AdminCmd:"
+# Discord chat sent to the server by to_server_chat, never relay it back
+ECHO_PREFIX = "SERVER:"
+TRIBE_LOG = re.compile(r"Tribe .+, ID .+:")
+# (gamertag) (character name): (message)
+CHAT = re.compile(r"(.+)\s\((.+)\): (.+)")
+# How long a guild's prefixes are trusted before being fetched from the bot again
+PREFIX_TTL = 300
+
+
+class LineType(enum.Enum):
+    ADMIN = "admin"
+    TRIBE = "tribe"
+    CHAT = "chat"
+    ECHO = "echo"
+
+
+class ChatLine(typing.NamedTuple):
+    kind: LineType
+    raw: str
+    gamertag: typing.Optional[str] = None
+    character: typing.Optional[str] = None
+    message: typing.Optional[str] = None
+
+
+def parse_line(line: str) -> ChatLine:
+    if line.startswith(ECHO_PREFIX):
+        return ChatLine(LineType.ECHO, line)
+    if line.startswith(ADMIN_PREFIX):
+        return ChatLine(LineType.ADMIN, line)
+    if TRIBE_LOG.match(line):
+        return ChatLine(LineType.TRIBE, line)
+    match = CHAT.match(line)
+    if match:
+        gamertag, character, message = match.groups()
+        return ChatLine(LineType.CHAT, line, gamertag, character, message)
+    # Anything else is ignored, like wrapped sentences from to_server_chat
+    return ChatLine(LineType.ECHO, line)
+
+
+# Classify every line in a getchat buffer, blank lines are skipped
+def parse_getchat(res: str) -> typing.List[ChatLine]:
+    return [parse_line(line) for line in res.split("\n") if line.strip()]
+
+
+class ChatFilter:
+    """Per-guild in-game command prefixes and blacklisted character names, loaded once instead of per message"""
+    def __init__(self, prefixes: typing.Iterable[str], badnames: typing.Iterable[str]):
+        self.prefixes = tuple(prefixes)
+        # Lowercase name -> name as it was blacklisted
+        self.badnames = {name.lower(): name for name in badnames}
+        self.loaded = time.monotonic()
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() - self.loaded >= PREFIX_TTL
+
+    # Split off the prefix if the message is an in-game command
+    def command(self, message: str) -> typing.Optional[typing.Tuple[str, str]]:
+        if not message.startswith(self.prefixes):
+            return None
+        for prefix in self.prefixes:
+            if message.startswith(prefix):
+                return prefix, message[len(prefix):]
+
+    def badname(self, character: str) -> typing.Optional[str]:
+        return self.badnames.get(character.lower())
@@ -0,0 +1,186 @@
+import asyncio
+import bisect
+import logging
+import typing
+
+from redbot.core.config import Group
+
+log = logging.getLogger("red.vrt.arktools.cleanup")
+
+# Players checked between yields to the event loop
+CHUNK_SIZE = 500
+# Marks a config path to be cleared rather than set
+DELETE = object()
+
+# (config path under the players group, new value or DELETE)
+Change = typing.Tuple[typing.Tuple[str, ...], typing.Any]
+
+
+class CleanupReport:
+    def __init__(self, dry_run: bool = False):
+        self.dry_run = dry_run
+        self.checked = 0
+        self.old_maps = 0
+        self.invalid = 0
+        self.fixed = 0
+        self.tribes = 0
+        self.no_username = 0
+
+    @property
+    def changed(self) -> bool:
+        return any([self.old_maps, self.invalid, self.fixed, self.tribes, self.no_username])
+
+    def summary(self) -> str:
+        lines = []
+        if self.dry_run and self.changed:
+            lines.append("Dry run, nothing was changed. This is what a cleanup would do:")
+        if self.old_maps:
+            lines.append(f"Removed old maps from {self.old_maps} players")
+        if self.invalid or self.fixed:
+            lines.append(f"Removed {self.invalid} players from the database with invalid ID's "
+                         f"and fixed {self.fixed} of them")
+        if self.tribes:
+            lines.append(f"Fixed {self.tribes} Tribe configs with old data")
+        if self.no_username:
+            lines.append(f"Removed {self.no_username} players that for whatever reason "
+                         f"had no username attached to their ID")
+        return "\n".join(lines)
+
+
+# Changes needed to bring a single player up to date, current_names are the lowercase "server cluster" map names
+def clean_player(xuid: str, player: dict, current_names: typing.Set[str], report: CleanupReport) -> typing.List[Change]:
+    # Make sure user ID's are valid
+    if not xuid.isdigit() or not 20 > len(xuid) > 15:
+        report.invalid += 1
+        return [((xuid,), DELETE)]
+    # Maybe bot crash while registering idk
+    if "username" not in player:
+        report.no_username += 1
+        return [((xuid,), DELETE)]
+
+    changes = []
+    # Old map data in their playtime
+    playtime = player.get("playtime")
+    if playtime:
+        old_maps = [name for name in playtime if name != "total" and name not in current_names]
+        if old_maps:
+            report.old_maps += 1
+            changes.extend(((xuid, "playtime", name), DELETE) for name in old_maps)
+
+    ingame = player.get("ingame")
+    if ingame is None:
+        report.fixed += 1
+        changes.append(((xuid, "ingame"), {}))
+    elif ingame:
+        # Only newer config has a dict in it, Pre-V2 data maps channels straight to implant IDs
+        if not any(isinstance(value, dict) for value in ingame.values()):
+            report.fixed += 1
+            fixed_stats = {}
+            for channel, implant in ingame.items():
+                fixed_stats[channel] = {
+                    "implant": implant,
+                    "name": None,
+                    "previous_names": [],
+                    "stats": {
+                        "pvpkills": 0,
+                        "pvpdeaths": 0,
+                        "pvedeaths": 0,
+                        "tamed": 0
+                    }
+                }
+            changes.append(((xuid, "ingame"), fixed_stats))
+        elif "stats" in ingame:  # Supposed to be channel ID's not channel, cleanup from oopsie
+            report.fixed += 1
+            changes.append(((xuid, "ingame", "stats"), DELETE))
+    return changes
+
+
+def clean_tribe(tribe_id: str, data: dict, report: CleanupReport) -> typing.Optional[dict]:
+    if "kills" in data:
+        return None
+    log.warning(f"TribeID {tribe_id}: {data}")
+    report.tribes += 1
+    return {
+        "tribename": None,
+        "owner": data["owner"],
+        "channel": data["channel"],
+        "allowed": data["allowed"],
+        "kills": 0,
+        "servername": None
+    }
+
+
+# Apply one change to an already loaded config dict, paths that no longer exist are skipped
+def apply_change(data: dict, path: typing.Tuple[str, ...], value):
+    for key in path[:-1]:
+        data = data.get(key)
+        if not isinstance(data, dict):
+            return
+    if value is DELETE:
+        data.pop(path[-1], None)
+    else:
+        data[path[-1]] = value
+
+
+class CleanupJob:
+    """
+    Removes old maps and broken player/tribe data from a guild's config
+
+    Players are read one at a time in chunks that yield to the event loop, and the fixes for every player are
+    collected and written back together in a single config write at the end, so it can run in the background
+    while the task loops keep updating the same config. Every change is idempotent, so re-checking a player is
+    always safe. Graph data lives in the GraphStore and is pruned by the cleanup command, not here.
+
+    The cursor and collected fixes only live as long as the job object: a job that fails part way picks up after
+    the last chunk it finished when it's run again, but a bot restart starts the next cleanup from the first player
+    """
+    def __init__(self, group: Group, xuids: typing.Iterable[str], dry_run: bool = False):
+        self.group = group
+        # Sorted so the cursor can find its place again
+        self.xuids = sorted(xuids)
+        self.report = CleanupReport(dry_run)
+        # Last xuid checked
+        self.cursor: typing.Optional[str] = None
+        # Fixes found so far, written once every player has been checked
+        self.changes: typing.List[Change] = []
+        self.done = False
+
+    async def run(self) -> CleanupReport:
+        dry_run = self.report.dry_run
+        clusters = await self.group.clusters()
+        current_names = set()
+        for cname, data in clusters.items():
+            for server in data["servers"]:
+                current_names.add(f"{server.lower()} {cname.lower()}")
+
+        start = bisect.bisect_right(self.xuids, self.cursor) if self.cursor is not None else 0
+        for i in range(start, len(self.xuids), CHUNK_SIZE):
+            chunk = self.xuids[i:i + CHUNK_SIZE]
+            for xuid in chunk:
+                try:
+                    player = await self.group.players.get_raw(xuid)
+                except KeyError:  # Removed since the job started
+                    continue
+                self.changes.extend(clean_player(xuid, player, current_names, self.report))
+            self.report.checked += len(chunk)
+            self.cursor = chunk[-1]
+            await asyncio.sleep(0)
+
+        if self.changes and not dry_run:
+            async with self.group.players() as players:
+                for path, value in self.changes:
+                    apply_change(players, path, value)
+        self.changes = []
+
+        tribes = await self.group.tribes()
+        fixed_tribes = {}
+        for tribe_id, data in tribes.items():
+            fixed = clean_tribe(tribe_id, data, self.report)
+            if fixed:
+                fixed_tribes[tribe_id] = fixed
+        if fixed_tribes and not dry_run:
+            async with self.group.tribes() as tribes:
+                tribes.update(fixed_tribes)
+
+        self.done = True
+        return self.report
@@ -0,0 +1,74 @@
+import collections
+import time
+import typing
+
+# How long lines wait in the buffer so everything from the same poll goes out as one message
+FLUSH_DELAY = 1.0
+# Discord's message content limit
+MESSAGE_LIMIT = 2000
+# Most lines a channel can have waiting, the oldest ones are dropped past this
+BACKLOG = 300
+# Messages allowed per channel in RATE_PERIOD seconds, matches Discord's per channel send limit
+RATE_LIMIT = 5
+RATE_PERIOD = 5.0
+
+
+class ChannelBuffer:
+    """
+    Lines waiting to be sent to a single Discord channel
+
+    Lines are packed into as few messages as fit the character limit and sends are paced by a token bucket,
+    so a burst like a full server dropping doesn't turn into dozens of rate limited sends
+    """
+    def __init__(self, backlog: int = BACKLOG):
+        self.lines: typing.Deque[str] = collections.deque()
+        self.backlog = backlog
+        self.flushing = False
+        # Token bucket
+        self.allowance = float(RATE_LIMIT)
+        self.checked = time.monotonic()
+        # Metrics
+        self.sent = 0
+        self.messages = 0
+        self.dropped = 0
+
+    @property
+    def depth(self) -> int:
+        return len(self.lines)
+
+    # Returns False if the backlog was full and the oldest line got dropped
+    def add(self, line: str) -> bool:
+        overflow = len(self.lines) >= self.backlog
+        if overflow:
+            self.lines.popleft()
+            self.dropped += 1
+        self.lines.append(line)
+        return not overflow
+
+    # Seconds until another message can be sent, takes a token if one is available
+    def acquire(self) -> float:
+        now = time.monotonic()
+        self.allowance = min(RATE_LIMIT, self.allowance + (now - self.checked) * RATE_LIMIT / RATE_PERIOD)
+        self.checked = now
+        if self.allowance >= 1:
+            self.allowance -= 1
+            return 0.0
+        return (1 - self.allowance) * RATE_PERIOD / RATE_LIMIT
+
+    # Pop as many lines as fit in one message, lines too long on their own are split
+    def pack(self, limit: int = MESSAGE_LIMIT) -> typing.Tuple[str, int]:
+        content = ""
+        count = 0
+        while self.lines:
+            line = self.lines[0]
+            if len(line) > limit:
+                if content:
+                    break
+                self.lines[0] = line[limit:]
+                return line[:limit], 0
+            if content and len(content) + len(line) + 1 > limit:
+                break
+            content = f"{content}\n{line}" if content else line
+            count += 1
+            self.lines.popleft()
+        return content, count
@@ -0,0 +1,41 @@
+import typing
+
+import numpy as np
+
+# Roughly how many points each line on a graph gets, regardless of how long the window is
+TARGET_POINTS = 2000
+
+
+# Stack series into one 2D array, shorter series (clusters added later) are right-aligned and zero padded
+def align(series: typing.List[typing.Sequence[int]]) -> np.ndarray:
+    length = max(len(s) for s in series)
+    if all(len(s) == length for s in series):
+        return np.array(series, dtype=np.int32)
+    aligned = np.zeros((len(series), length), dtype=np.int32)
+    for row, values in zip(aligned, series):
+        if len(values):
+            row[length - len(values):] = values
+    return aligned
+
+
+def minmax_indices(values: np.ndarray, target: int = TARGET_POINTS) -> np.ndarray:
+    """
+    Per-bucket min/max downsampling of every row at once
+
+    Returns a (rows, points) array of sorted indexes into each row, keeping the lowest and highest value of
+    every bucket plus both endpoints, so peaks survive no matter how much the data is thinned
+    """
+    rows, length = values.shape
+    if length <= target:
+        return np.tile(np.arange(length), (rows, 1))
+    buckets = max(target // 2 - 1, 1)
+    width = -(-length // buckets)
+    # Pad the last bucket by repeating the final value so everything reshapes evenly
+    padded = np.pad(values, ((0, 0), (0, buckets * width - length)), mode="edge")
+    shaped = padded.reshape(rows, buckets, width)
+    offsets = np.arange(buckets) * width
+    low = shaped.argmin(axis=2) + offsets
+    high = shaped.argmax(axis=2) + offsets
+    ends = np.tile([0, length - 1], (rows, 1))
+    indexes = np.concatenate([ends, low, high], axis=1)
+    return np.sort(np.minimum(indexes, length - 1), axis=1)
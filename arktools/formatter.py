@@ -3,16 +3,25 @@ import io
 import logging
 import math
 import re
+import typing
 import unicodedata
 
 import discord
+import numpy as np
 import pytz
 import tabulate
-from matplotlib import pyplot as plt
+from matplotlib import style
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 from matplotlib.dates import DateFormatter
+from matplotlib.figure import Figure
 from matplotlib.ticker import MaxNLocator, AutoMinorLocator
 from redbot.core.utils.chat_formatting import box, pagify
 
+from .downsample import align, minmax_indices
+from .graphstore import GraphData
+from .leaderboard import Leaderboard
+from .menus import PageSource
+
 log = logging.getLogger("red.vrt.arktools")
 
 # Hard coded item blueprint paths for the imstuck command
@@ -134,43 +143,16 @@ def profile_format(data: dict):
     return gt, xuid, gs, pfp
 
 
-# Returns players that havent been on any server in X days
-async def expired_players(stats: dict, unfriendtime: int):
-    expired = []
-    tz = pytz.timezone("UTC")
-    now = datetime.datetime.now(tz)
-    for xuid, data in stats.items():
-        user = data["username"]
-        lastseen = data["lastseen"]["time"]
-        if data["lastseen"]["map"]:
-            timestamp = datetime.datetime.fromisoformat(lastseen)
-            timestamp = timestamp.astimezone(tz)
-            timedifference = now - timestamp
-            if timedifference.days >= unfriendtime:
-                expired.append((xuid, user))
-    return expired
-
-
 # overview embed formatter
-def overview_format(stats: dict, guild: discord.guild, timezone: str):
-    embeds = []
-    leaderboard = {}
-    global_time = 0
-    # Global cumulative time
-    for xuid, data in stats.items():
-        if "playtime" in data:
-            time = data["playtime"]["total"]
-            if time:
-                leaderboard[xuid] = time
-                global_time = global_time + time
-    global_playtime = time_formatter(global_time)
-    sorted_players = sorted(leaderboard.items(), key=lambda x: x[1], reverse=True)
+def overview_format(leaderboard: Leaderboard, saved: int, guild: discord.guild, timezone: str) -> PageSource:
+    global_playtime = time_formatter(leaderboard.global_time)
+    ranked = leaderboard.ranked
     # Figure out how many pages the lb menu will be
-    pages = math.ceil(len(sorted_players) / 10)
-    start = 0
-    stop = 10
-    saved = "{:,}".format(len(stats.keys()))
-    for p in range(pages):
+    pages = math.ceil(ranked / 10)
+    saved = "{:,}".format(saved)
+    tz = pytz.timezone(timezone)
+
+    async def page(p: int) -> discord.Embed:
         embed = discord.Embed(
             title="Player Overview",
             description=f"Global Cumulative Playtime: `{global_playtime}`\n\n"
@@ -178,25 +160,19 @@ def overview_format(stats: dict, guild: discord.guild, timezone: str):
             color=discord.Color.random()
         )
         embed.set_thumbnail(url=guild.icon_url)
-        # Put 10 players per page, adding 10 to the start and stop values after each loop
-        if stop > len(sorted_players):
-            stop = len(sorted_players)
-        for i in range(start, stop, 1):
-            xuid = sorted_players[i][0]
+        # Put 10 players per page
+        start = p * 10
+        now = datetime.datetime.now(tz)
+        for i, (xuid, total) in enumerate(leaderboard.top(start, min(start + 10, ranked)), start):
             maps = ""
-            username = stats[xuid]["username"]
-            for mapname, timeplayed in stats[xuid]["playtime"].items():
-                if mapname != "total":
-                    playtime = time_formatter(timeplayed)
-                    maps += f"{mapname.capitalize()}: `{playtime}`\n"
-            total = sorted_players[i][1]
+            username = leaderboard.names[xuid]
+            for mapname, timeplayed in leaderboard.player_maps[xuid].items():
+                playtime = time_formatter(timeplayed)
+                maps += f"{mapname.capitalize()}: `{playtime}`\n"
             total_playtime = time_formatter(total)
-            tz = pytz.timezone(timezone)
-            time = datetime.datetime.now(tz)
-            last_seen = stats[xuid]['lastseen']["time"]
-            timestamp = datetime.datetime.fromisoformat(last_seen)
+            timestamp = datetime.datetime.fromisoformat(leaderboard.lastseen[xuid])
             timestamp = timestamp.astimezone(tz)
-            timedifference = time - timestamp
+            timedifference = now - timestamp
             td = int(timedifference.total_seconds())
             lseen = time_formatter(td)
             embed.add_field(
@@ -206,43 +182,28 @@ def overview_format(stats: dict, guild: discord.guild, timezone: str):
                       f"Last Seen: `{lseen} ago`"
             )
         embed.set_footer(text=f"Pages {p + 1}/{pages}")
-        embeds.append(embed)
-        start += 10
-        stop += 10
-    return embeds
+        return embed
+
+    return PageSource(pages, page)
 
 
 # Leaderboard embed formatter
-def lb_format(stats: dict, guild: discord.guild):
-    embeds = []
-    leaderboard = {}
-    global_time = 0
-    # Global cumulative time
-    for xuid, data in stats.items():
-        if "playtime" in data:
-            time = data["playtime"]["total"]
-            if time:
-                leaderboard[xuid] = time
-                global_time = global_time + time
-    global_playtime = time_formatter(global_time)
-    sorted_players = sorted(leaderboard.items(), key=lambda x: x[1], reverse=True)
+def lb_format(leaderboard: Leaderboard, saved: int, guild: discord.guild) -> PageSource:
+    global_playtime = time_formatter(leaderboard.global_time)
+    ranked = leaderboard.ranked
     # Figure out how many pages the lb menu will be
-    pages = math.ceil(len(sorted_players) / 10)
-    start = 0
-    stop = 10
-    for p in range(pages):
-        # Put 10 players per page, adding 10 to the start and stop values after each loop
-        if stop > len(sorted_players):
-            stop = len(sorted_players)
+    pages = math.ceil(ranked / 10)
+    saved = "{:,}".format(saved)
+
+    async def page(p: int) -> discord.Embed:
+        # Put 10 players per page
+        start = p * 10
         table = []
-        for i in range(start, stop, 1):
-            xuid = sorted_players[i][0]
-            username = stats[xuid]["username"]
-            total = sorted_players[i][1]
+        for i, (xuid, total) in enumerate(leaderboard.top(start, min(start + 10, ranked)), start):
+            username = leaderboard.names[xuid]
             total_playtime = time_formatter(total)
             table.append([i + 1, total_playtime, username])
         players = tabulate.tabulate(table, tablefmt="presto")
-        saved = "{:,}".format(len(stats.keys()))
         embed = discord.Embed(
             title="Playtime Leaderboard",
             description=f"Global Playtime: `{global_playtime}`\n"
@@ -252,10 +213,9 @@ def lb_format(stats: dict, guild: discord.guild):
         )
         embed.set_thumbnail(url=guild.icon_url)
         embed.set_footer(text=f"Pages {p + 1}/{pages}")
-        embeds.append(embed)
-        start += 10
-        stop += 10
-    return embeds
+        return embed
+
+    return PageSource(pages, page)
 
 
 # Leaderboard embed tribe formatter
@@ -327,23 +287,9 @@ def tribe_lb_format(tribes: dict, guild: discord.guild):
 
 
 # Same thing as ark leaderboard but cluster specific
-def cstats_format(stats: dict, guild: discord.guild):
+def cstats_format(leaderboard: Leaderboard, guild: discord.guild):
     embeds = []
-    maps = {}
-    total_playtimes = {}
-    for data in stats.values():
-        if "playtime" in data:
-            for mapname, playtime in data["playtime"].items():
-                if mapname != "total":
-                    total_playtimes[mapname] = {}
-                    maps[mapname] = 0
-    for xuid, data in stats.items():
-        for mapn, playtime in data["playtime"].items():
-            if mapn != "total":
-                player = data["username"]
-                total_playtimes[mapn][player] = playtime
-                maps[mapn] += playtime
-    sorted_maps = sorted(maps.items(), key=lambda x: x[1], reverse=True)
+    sorted_maps = leaderboard.sorted_maps()
     count = 1
     pages = math.ceil(len(sorted_maps) / 10)
     start = 0
@@ -358,16 +304,14 @@ def cstats_format(stats: dict, guild: discord.guild):
         if stop > len(sorted_maps):
             stop = len(sorted_maps)
         for i in range(start, stop, 1):
-            mapname = sorted_maps[i][0]
-            total_playtime = sorted_maps[i][1]
-            total_time_played = time_formatter(total_playtime)
+            mapname, mapstats = sorted_maps[i]
+            total_time_played = time_formatter(mapstats.total)
 
-            top_player = max(total_playtimes[mapname], key=total_playtimes[mapname].get)
-            top_player_time = total_playtimes[mapname][top_player]
-            top_player_playtime = time_formatter(top_player_time)
+            top_player = leaderboard.names.get(mapstats.top, mapstats.top)
+            top_player_playtime = time_formatter(mapstats.players[mapstats.top])
 
             embed.add_field(
-                name=f"{count}. {mapname.capitalize()} - {len(total_playtimes[mapname].keys())} Players",
+                name=f"{count}. {mapname.capitalize()} - {len(mapstats.players)} Players",
                 value=f"Total Time Played: `{total_time_played}`\n"
                       f"Top Player: `{top_player}` - `{top_player_playtime}`",
                 inline=False
@@ -380,153 +324,141 @@ def cstats_format(stats: dict, guild: discord.guild):
     return embeds
 
 
-# Format stats for an individual player
-def player_stats(settings: dict, guild: discord.guild, gamertag: str):
-    kit = settings["kit"]
-    stats = settings["players"]
-    leaderboard = {}
-    global_time = 0
-    # Global cumulative time
-    for xuid, data in stats.items():
-        if "playtime" in data:
-            ptime = data["playtime"]["total"]
-            leaderboard[xuid] = ptime
-            global_time = global_time + ptime
-
+# Format stats for an individual player, rank and share of global playtime come from the leaderboard index
+def player_stats(
+        guild: discord.guild,
+        xuid: str,
+        data: dict,
+        leaderboard: Leaderboard,
+        kit_claimed: bool,
+        timezone: str
+):
     position = ""
-    sorted_players = sorted(leaderboard.items(), key=lambda x: x[1], reverse=True)
+    rank = leaderboard.rank(xuid)
+    if rank:
+        position = f"{rank}/{len(leaderboard)}"
+    total_playtime = leaderboard.totals.get(xuid, 0)
     current_time = datetime.datetime.now(pytz.timezone("UTC"))
-    for xuid, data in stats.items():
-        if gamertag.lower() == data["username"].lower():
-            total_playtime = data["playtime"]["total"]
-            for i in sorted_players:
-                if i[0] == xuid:
-                    pos = sorted_players.index(i)
-                    position = f"{pos + 1}/{len(sorted_players)}"
-            timestamp = datetime.datetime.fromisoformat(data["lastseen"]["time"])
-            timestamp = timestamp.astimezone(pytz.timezone("UTC"))
-            timedifference = current_time - timestamp
-            td = int(timedifference.total_seconds())
-            td = abs(td)  # shouldnt matter any more since config setup was changed
-            # Last seen dhm
-            last_seen = time_formatter(td)
-            lastmap = data["lastseen"]["map"]
-            if lastmap:
-                last_seen = f"`{last_seen} ago on {lastmap}`"
-            else:
-                last_seen = f"`{last_seen} ago`"
-            # Time played dhm
-            total_playtime_string = time_formatter(total_playtime)
-            registration = "Not Registered"
-            in_server = True
-            color = discord.Color.random()
-            pfp = None
-            if "discord" in data:
-                member = guild.get_member(data["discord"])
-                if member:
-                    color = member.colour
-                    pfp = member.avatar_url
-                    registration = f"{member.mention}-{member.id}"
-                else:
-                    registration = f"{data['discord']}"
-                    in_server = False
-            claimed = "Unclaimed"
-            if xuid in kit["claimed"]:
-                claimed = "Claimed"
-            desc = f"`Discord:     `{registration}\n" \
-                   f"`Game ID:     `{xuid}\n" \
-                   f"`Time Played: `{total_playtime_string}\n" \
-                   f"`Starter Kit: `{claimed}"
-            if "rank" in data:
-                r = data["rank"]
-                r = guild.get_role(r)
-                if r:
-                    desc += f"\n`Player Rank: `{r.mention}"
-            embed = discord.Embed(
-                title=f"Player Stats for {data['username']}",
-                description=desc,
-                color=color
+    timestamp = datetime.datetime.fromisoformat(data["lastseen"]["time"])
+    timestamp = timestamp.astimezone(pytz.timezone("UTC"))
+    timedifference = current_time - timestamp
+    td = int(timedifference.total_seconds())
+    td = abs(td)  # shouldnt matter any more since config setup was changed
+    # Last seen dhm
+    last_seen = time_formatter(td)
+    lastmap = data["lastseen"]["map"]
+    if lastmap:
+        last_seen = f"`{last_seen} ago on {lastmap}`"
+    else:
+        last_seen = f"`{last_seen} ago`"
+    # Time played dhm
+    total_playtime_string = time_formatter(total_playtime)
+    registration = "Not Registered"
+    in_server = True
+    color = discord.Color.random()
+    pfp = None
+    if "discord" in data:
+        member = guild.get_member(data["discord"])
+        if member:
+            color = member.colour
+            pfp = member.avatar_url
+            registration = f"{member.mention}-{member.id}"
+        else:
+            registration = f"{data['discord']}"
+            in_server = False
+    claimed = "Claimed" if kit_claimed else "Unclaimed"
+    desc = f"`Discord:     `{registration}\n" \
+           f"`Game ID:     `{xuid}\n" \
+           f"`Time Played: `{total_playtime_string}\n" \
+           f"`Starter Kit: `{claimed}"
+    if "rank" in data:
+        r = data["rank"]
+        r = guild.get_role(r)
+        if r:
+            desc += f"\n`Player Rank: `{r.mention}"
+    embed = discord.Embed(
+        title=f"Player Stats for {data['username']}",
+        description=desc,
+        color=color
+    )
+    if pfp:
+        embed.set_thumbnail(url=pfp)
+    embed.add_field(
+        name="Last Seen",
+        value=last_seen,
+        inline=False
+    )
+    if "leftdiscordon" in data and not in_server:
+        left_on = data["leftdiscordon"]
+        left_on = datetime.datetime.fromisoformat(left_on)
+        timezone = pytz.timezone(timezone)
+        left_on = left_on.astimezone(timezone)
+        embed.add_field(
+            name="Left Discord",
+            value=f"`{left_on.strftime('%m/%d/%y at %I:%M %p')}`"
+        )
+    for mapname, playtime in leaderboard.player_maps.get(xuid, {}).items():
+        ptime = time_formatter(playtime)
+        if int(playtime):
+            embed.add_field(
+                name=f"Time on {mapname.capitalize()}",
+                value=f"`{ptime}`"
             )
-            if pfp:
-                embed.set_thumbnail(url=pfp)
+    pstats = ""
+    for mapid, info in data["ingame"].items():
+        channel = guild.get_channel(int(mapid))
+        if channel:
+            mapid = channel.mention
+
+        implant = info["implant"]
+        name = info["name"]
+        if not implant and not name:
+            continue
+        pk = info["stats"]["pvpkills"]
+        pd = info["stats"]["pvpdeaths"]
+        ped = info["stats"]["pvedeaths"]
+        tamed = info["stats"]["tamed"]
+        prev_names = info["previous_names"]
+        pstats += f"**{mapid}**\n"
+        if implant:
+            pstats += f"`Implant:        `{implant}\n"
+        if name:
+            pstats += f"`Character Name: `{name}\n"
+        if pk and pd:
+            kd_ratio = round(pk / pd, 2)
+            pstats += f"`PvP K/D:        `{pk}/{pd} ({kd_ratio})\n"
+        if ped:
+            pstats += f"`PvE Deaths:     `{ped}\n"
+        if tamed:
+            pstats += f"`Dinos Tamed:    `{tamed}\n"
+        if prev_names:
+            names = ""
+            for name in prev_names:
+                if name:
+                    names += f"{name}, "
+            if names:
+                names = names.rstrip(", ")
+                pstats += f"`Previous Names: `{names}\n"
+    if pstats:
+        if len(pstats) <= 1024:
             embed.add_field(
-                name="Last Seen",
-                value=last_seen,
+                name="In-Game Stats",
+                value=pstats,
                 inline=False
             )
-            if "leftdiscordon" in data and not in_server:
-                left_on = data["leftdiscordon"]
-                left_on = datetime.datetime.fromisoformat(left_on)
-                timezone = settings["timezone"]
-                timezone = pytz.timezone(timezone)
-                left_on = left_on.astimezone(timezone)
+        else:
+            page = 1
+            for p in pagify(pstats, page_length=1024):
                 embed.add_field(
-                    name="Left Discord",
-                    value=f"`{left_on.strftime('%m/%d/%y at %I:%M %p')}`"
+                    name=f"In-Game Stats {page}",
+                    value=p,
+                    inline=False
                 )
-            for mapname, playtime in data["playtime"].items():
-                if mapname != "total":
-                    ptime = time_formatter(playtime)
-                    if int(playtime):
-                        embed.add_field(
-                            name=f"Time on {mapname.capitalize()}",
-                            value=f"`{ptime}`"
-                        )
-            pstats = ""
-            for mapid, info in data["ingame"].items():
-                channel = guild.get_channel(int(mapid))
-                if channel:
-                    mapid = channel.mention
-
-                implant = info["implant"]
-                name = info["name"]
-                if not implant and not name:
-                    continue
-                pk = info["stats"]["pvpkills"]
-                pd = info["stats"]["pvpdeaths"]
-                ped = info["stats"]["pvedeaths"]
-                tamed = info["stats"]["tamed"]
-                prev_names = info["previous_names"]
-                pstats += f"**{mapid}**\n"
-                if implant:
-                    pstats += f"`Implant:        `{implant}\n"
-                if name:
-                    pstats += f"`Character Name: `{name}\n"
-                if pk and pd:
-                    kd_ratio = round(pk / pd, 2)
-                    pstats += f"`PvP K/D:        `{pk}/{pd} ({kd_ratio})\n"
-                if ped:
-                    pstats += f"`PvE Deaths:     `{ped}\n"
-                if tamed:
-                    pstats += f"`Dinos Tamed:    `{tamed}\n"
-                if prev_names:
-                    names = ""
-                    for name in prev_names:
-                        if name:
-                            names += f"{name}, "
-                    if names:
-                        names = names.rstrip(", ")
-                        pstats += f"`Previous Names: `{names}\n"
-            if pstats:
-                if len(pstats) <= 1024:
-                    embed.add_field(
-                        name="In-Game Stats",
-                        value=pstats,
-                        inline=False
-                    )
-                else:
-                    page = 1
-                    for p in pagify(pstats, page_length=1024):
-                        embed.add_field(
-                            name=f"In-Game Stats {page}",
-                            value=p,
-                            inline=False
-                        )
-                        page += 1
-            if position and global_time:
-                percent = round((total_playtime / global_time) * 100, 2)
-                embed.set_footer(text=f"Rank: {position} with {percent}% of global playtime")
-            return embed
+                page += 1
+    if position and leaderboard.global_time:
+        percent = round((total_playtime / leaderboard.global_time) * 100, 2)
+        embed.set_footer(text=f"Rank: {position} with {percent}% of global playtime")
+    return embed
 
 
 # Detect recent followers and return list of people to add back
@@ -588,154 +520,14 @@ def detect_sus(alt: dict, profile: dict, friends: dict):
     return sus, reasons
 
 
-# Takes config and removes funky stuff from it
-# Fixes various things like incomplete player data, old deleted maps, or anything that messed up from a bot crash
-async def cleanup_config(settings: dict):
-    cleanup_status = ""
-    # First off, fix any old cluster data for the server graph
-    newgraphdata = {}
-    count = 0
-    for cname, countlist in settings["serverstats"].items():
-        # Just add these to the newdata dict
-        if cname == "dates" or cname == "counts" or cname == "expiration":
-            newgraphdata[cname] = countlist
-        # Only adds the player count list to the newdata if the cluster still exists in main settings
-        else:
-            if cname in settings["clusters"]:
-                newgraphdata[cname] = countlist
-            else:
-                count += 1
-    if count > 0:
-        cleanup_status += f"Deleted {count} old clusters from graph data\n"
-    count = 0
-    settings["serverstats"] = newgraphdata
-
-    # Next is fixing players that have old map data in their player stats
-    current_names = []
-    for cname, data in settings["clusters"].items():  # Go through all clusters
-        servers = data["servers"]
-        for server in servers:  # Then go through all servers in that cluster
-            name = f"{server.lower()} {cname.lower()}"
-            current_names.append(name)  # Append that name to the current names list
-    updated_players = {}
-    for uid, player in settings["players"].items():  # NOW go through every player in the database
-        if "playtime" in player:  # If the player actually has playtime logged
-            updated_player = {}
-            for k, v in player.items():
-                if k == "playtime":
-                    new_playtime = {"total": player["playtime"]["total"]}
-                    # Iterate through the existing map names and only add the ones that still exist
-                    for n in current_names:
-                        if n in player["playtime"]:  # If the map string still exists, add it to the new dict
-                            new_playtime[n] = player["playtime"][n]
-                    updated_player["playtime"] = new_playtime
-                    if len(player["playtime"]) != len(new_playtime):  # See if old and new data is different
-                        count += 1
-                else:
-                    updated_player[k] = v  # Add other not relevant data back to the updated player by default
-            updated_players[uid] = updated_player  # Add the single updated player to the updated players dict
-        else:
-            updated_players[uid] = player  # If they dont have playtime data just add them to the new dict
-    if count > 0:
-        cleanup_status += f"Removed old maps from {count} players\n"
-    count = 0
-    settings["players"] = updated_players
-
-    # Rehash player data to make sure user ID's are valid and config is up-to-data
-    rehashed_players = {}
-    fixed = 0
-    for xuid, playerdata in settings["players"].items():
-        if xuid.isdigit():
-            if 20 > len(xuid) > 15:
-                if "ingame" not in playerdata:
-                    playerdata["ingame"] = {}
-                    fixed += 1
-                if playerdata["ingame"]:
-                    old = True
-                    for value in playerdata["ingame"].values():
-                        if isinstance(value, dict):  # Only newer config has a dict in it, so config is not old
-                            old = False
-                            break
-                    if old:
-                        fixed_stats = {}
-                        for channel, implant in playerdata["ingame"].items():
-                            fixed_stats[channel] = {
-                                "implant": implant,
-                                "name": None,
-                                "previous_names": [],
-                                "stats": {
-                                    "pvpkills": 0,
-                                    "pvpdeaths": 0,
-                                    "pvedeaths": 0,
-                                    "tamed": 0
-                                }
-                            }
-                        playerdata["ingame"] = fixed_stats
-                        fixed += 1
-                    else:  # Make sure everything else is straight
-                        keys_to_delete = []
-                        for channel, data in playerdata["ingame"].items():
-                            if channel == "stats":  # Supposed to be channel ID's not channel, cleanup from oopsie
-                                keys_to_delete.append(channel)
-                        if keys_to_delete:
-                            for key in keys_to_delete:
-                                del playerdata["ingame"][key]
-                                fixed += 1
-                rehashed_players[xuid] = playerdata
-            else:
-                count += 1
-        else:
-            count += 1
-    if count > 0 or fixed > 0:
-        cleanup_status += f"Removed {count} players from the database with invalid ID's and fixed {fixed} of them\n"
-    count = 0
-    settings["players"] = rehashed_players
-
-    # Fix any tribe issues
-    tribes = settings["tribes"]
-    newtribedata = {}
-    for tribe_id, data in tribes.items():
-        if "kills" not in data:
-            log.warning(f"TribeID {tribe_id}: {data}")
-            newtribedata[tribe_id] = {
-                "tribename": None,
-                "owner": data["owner"],
-                "channel": data["channel"],
-                "allowed": data["allowed"],
-                "kills": 0,
-                "servername": None
-            }
-            count += 1
-        else:
-            newtribedata[tribe_id] = data
-    settings["tribes"] = newtribedata
-    if count:
-        cleanup_status += f"Fixed {count} Tribe configs with old data\n"
-        count = 0
-
-    # Make sure players have a username for whatever reason they wouldn't, maybe bot crash while registering idk
-    no_username = []
-    for xuid, data in settings["players"].items():
-        if "username" not in data:
-            no_username.append(xuid)
-            count += 1
-    for xuid in no_username:
-        del settings["players"][xuid]
-    if count > 0:
-        cleanup_status += f"Removed {count} players that for whatever reason had no username attached to their ID"
-    else:
-        cleanup_status = cleanup_status.rstrip("\n")
-    return settings, cleanup_status
-
-
 # Plot player count for each cluster
-# Instead of relying on matplotlibs date formatter, the data points are selected manually with set ticks
-async def get_graph(settings: dict, hours: int):
+# Long windows are thinned with per-bucket min/max so peaks still show up
+# Runs in a worker process so it only uses the Figure API, returns the PNG bytes
+def render_graph(data: GraphData, timezone: str, hours: int) -> typing.Optional[bytes]:
     lim = hours * 60
     days = int(hours / 24)
-    times = settings["serverstats"]["dates"]
-    counts = settings["serverstats"]["counts"]
-    timezone = settings['timezone']
+    times = data.times
+    counts = data.totals
     tz = pytz.timezone(timezone)
     if len(counts) == 0 or len(times) == 0:
         return None
@@ -752,30 +544,17 @@ async def get_graph(settings: dict, hours: int):
         lim = len(times)
     if hours == 1:
         title = f"Player Count Over the Last Hour"
-    stagger = math.ceil(lim * 0.001)
-    c = {}
-    for cname, countlist in settings["serverstats"].items():
-        cname = str(cname.lower())
-        if cname != "dates" and cname != "counts" and cname != "expiration":
-            cl = countlist[:-lim:-stagger]
-            cl.reverse()
-            c[cname] = cl
-    dates = times[:-lim:-stagger]
-    x = []
-    y = counts[:-lim:-stagger]
-    # Unstaggered list is for the max player count for the given time
-    y_unstaggered = counts[:-lim:-1]
-    y_unstaggered.reverse()
-    maxplayers = max(y_unstaggered)
-    for d in dates:
-        d = datetime.datetime.fromisoformat(d)
-        x.append(d)
-
-    # Reverse the new lists, so they're in the correct order
-    x.reverse()
-    y.reverse()
-    if len(y) < 3:
+    # Align every series into one array, total first, then thin them all in one pass
+    names = [str(cname.lower()) for cname in data.clusters]
+    values = align([counts[-lim:]] + [countlist[-lim:] for countlist in data.clusters.values()])
+    if values.shape[1] < 3:
         return None
+    dates = np.asarray(times[-lim:], dtype="datetime64[s]")
+    maxplayers = int(values[0].max())
+    indexes = minmax_indices(values)
+    x = dates[indexes[0]]
+    y = values[0, indexes[0]]
+    c = {name: (dates[indexes[i]], values[i, indexes[i]]) for i, name in enumerate(names, start=1)}
     clist = ["red",
              "cyan",
              "gold",
@@ -789,41 +568,34 @@ async def get_graph(settings: dict, hours: int):
              "plum",
              "purple"]
     cindex = 0
-    with plt.style.context("dark_background"):
-        fig, ax = plt.subplots()
+    with style.context("dark_background"):
+        fig = Figure()
+        FigureCanvasAgg(fig)
+        ax = fig.subplots()
         clusters = len(c.keys())
         if len(clist) >= clusters:
             usecolors = True
         else:
             usecolors = False
         # Plot each cluster in addition to the total graph line
-        for cname, countlist in c.items():
-            if len(countlist) < len(y):
-                countlist.reverse()
-                n = 0
-                while n == 0:
-                    countlist.append(0)
-                    if len(countlist) == len(y):
-                        countlist.reverse()
-                        n += 1
-                        break
+        for cname, (cx, countlist) in c.items():
             if len(clist) >= cindex - 1 and usecolors:
                 color = f"xkcd:{clist[cindex]}"
-                plt.plot(x, countlist, label=cname, color=color, linewidth=0.7)
+                ax.plot(cx, countlist, label=cname, color=color, linewidth=0.7)
             else:
-                plt.plot(x, countlist, label=cname, linewidth=0.7)
+                ax.plot(cx, countlist, label=cname, linewidth=0.7)
             cindex += 1
-        plt.plot(x, y, color="xkcd:green", label="Total", linewidth=0.7)
-        plt.ylim([0, max(y) + 2])
-        plt.xlabel(f"Time ({timezone})", fontsize=10)
-        plt.ylabel(f"Player Count (Max: {maxplayers})", fontsize=10)
-        plt.title(title)
-        plt.tight_layout()
-        plt.legend(loc=3)
-        plt.yticks(fontsize=10)
-        plt.subplots_adjust(bottom=0.2)
-        plt.grid(axis="y")
-        plt.grid(axis="x")
+        ax.plot(x, y, color="xkcd:green", label="Total", linewidth=0.7)
+        ax.set_ylim([0, max(y) + 2])
+        ax.set_xlabel(f"Time ({timezone})", fontsize=10)
+        ax.set_ylabel(f"Player Count (Max: {maxplayers})", fontsize=10)
+        ax.set_title(title)
+        fig.tight_layout()
+        ax.legend(loc=3)
+        ax.tick_params(axis="y", labelsize=10)
+        fig.subplots_adjust(bottom=0.2)
+        ax.grid(axis="y")
+        ax.grid(axis="x")
 
         # Major x-axis ticks/size
         major_locator = MaxNLocator(nbins='auto', integer=True, min_n_ticks=10)
@@ -841,13 +613,9 @@ async def get_graph(settings: dict, hours: int):
         minor_locator = AutoMinorLocator()
         ax.xaxis.set_minor_locator(minor_locator)
 
-        plt.xticks(fontsize=size)
+        ax.tick_params(axis="x", labelsize=size)
 
         fig.autofmt_xdate()
         result = io.BytesIO()
-        plt.savefig(result, format="png", dpi=200)
-        plt.close()
-        result.seek(0)
-        file = discord.File(result, filename="plot.png")
-        result.close()
-        return file
+        fig.savefig(result, format="png", dpi=200)
+        return result.getvalue()
@@ -0,0 +1,124 @@
+import asyncio
+import logging
+import typing
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from .formatter import render_graph
+from .graphstore import GraphStore
+
+log = logging.getLogger("red.vrt.arktools.graphrender")
+
+# Rendered graphs kept around, one per (guild, hours, timezone)
+CACHE_SIZE = 32
+# Times a worker process pool that died (killed by the OOM killer for example) is recreated before using threads
+POOL_RESTARTS = 1
+
+# (guild ID, hours, timezone)
+GraphKey = typing.Tuple[int, int, str]
+
+
+class GraphRenderer:
+    """
+    Renders player count graphs in a worker process and caches the PNGs
+
+    A graph is only re-rendered when its store has recorded a new sample since the cached image,
+    and callers can set a timeout to fall back to the previous image while a slow render finishes
+    """
+    def __init__(self, workers: int = 1):
+        self.workers = workers
+        self.pool: typing.Optional[ProcessPoolExecutor] = None
+        self.restarts = 0
+        # Set if worker processes can't be used or keep dying. render_graph switches matplotlib styles,
+        # which changes the process wide rcParams, so thread renders run one at a time on a single thread
+        self.use_threads = False
+        self.thread: typing.Optional[ThreadPoolExecutor] = None
+        # key -> (last sample, png bytes)
+        self.cache: typing.OrderedDict[GraphKey, typing.Tuple[typing.Tuple[int, int], typing.Optional[bytes]]] = OrderedDict()
+        # (key, last sample) -> render in progress
+        self.pending: typing.Dict[typing.Tuple[GraphKey, typing.Tuple[int, int]], asyncio.Future] = {}
+
+    def get_pool(self) -> Executor:
+        if not self.use_threads and not self.pool:
+            try:
+                self.pool = ProcessPoolExecutor(max_workers=self.workers)
+            except (OSError, NotImplementedError) as e:
+                log.warning(f"Can't start graph render processes, rendering in a thread instead: {e}")
+                self.use_threads = True
+        if self.use_threads:
+            if not self.thread:
+                self.thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ArkTools-GraphRender")
+            return self.thread
+        return self.pool
+
+    # A worker died, every render queued on that pool fails with it but only the first one handles it
+    def broken(self, pool: Executor):
+        if pool is not self.pool:
+            return
+        self.pool.shutdown(wait=False)
+        self.pool = None
+        if self.restarts < POOL_RESTARTS:
+            self.restarts += 1
+            log.warning("Graph render process died, starting a new one")
+            return
+        log.warning("Graph render process keeps dying, rendering in a thread from now on")
+        self.use_threads = True
+
+    def done(self, key: GraphKey, last: typing.Tuple[int, int], pool: Executor, future: asyncio.Future):
+        self.pending.pop((key, last), None)
+        if future.cancelled():
+            return
+        exc = future.exception()
+        if isinstance(exc, BrokenProcessPool):
+            self.broken(pool)
+            return
+        if exc:
+            log.warning(f"Failed to render graph: {exc}")
+            return
+        # Not enough data is cached too so it isn't retried until the next sample
+        self.cache[key] = (last, future.result())
+        self.cache.move_to_end(key)
+        while len(self.cache) > CACHE_SIZE:
+            self.cache.popitem(last=False)
+
+    async def render(
+            self,
+            guild_id: int,
+            store: GraphStore,
+            timezone: str,
+            hours: int,
+            timeout: float = None
+    ) -> typing.Optional[bytes]:
+        """Get the PNG for a graph, returns the previous image if the new one takes longer than the timeout"""
+        key = (guild_id, hours, timezone)
+        last = store.last
+        cached = self.cache.get(key)
+        if cached and cached[0] == last:
+            return cached[1]
+        future = self.pending.get((key, last))
+        if not future:
+            loop = asyncio.get_running_loop()
+            pool = self.get_pool()
+            try:
+                future = loop.run_in_executor(pool, render_graph, store.snapshot(hours * 60), timezone, hours)
+            except BrokenProcessPool:
+                self.broken(pool)
+                return cached[1] if cached else None
+            future.add_done_callback(lambda f: self.done(key, last, pool, f))
+            self.pending[(key, last)] = future
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            return cached[1] if cached else None
+        except Exception:
+            # Already logged by the done callback
+            return cached[1] if cached else None
+
+    def close(self):
+        if self.pool:
+            self.pool.shutdown(wait=False)
+            self.pool = None
+        if self.thread:
+            self.thread.shutdown(wait=False)
+            self.thread = None
@@ -0,0 +1,233 @@
+import datetime
+import os
+import struct
+import typing
+from array import array
+
+# Header: magic, version, capacity, head (next slot to write), size (slots filled), series count
+HEADER = struct.Struct("<4sHIIIH")
+MAGIC = b"ARKG"
+VERSION = 1
+NAME = struct.Struct("<H")
+# One data point per minute
+POINTS_PER_DAY = 1440
+# Series name for the combined player count of all clusters
+TOTAL = "total"
+
+
+class GraphData(typing.NamedTuple):
+    """Chronological snapshot of the most recent points in a store"""
+    times: typing.List[int]
+    totals: typing.List[int]
+    clusters: typing.Dict[str, typing.List[int]]
+
+
+class GraphStore:
+    """
+    Fixed capacity columnar ring buffer of player counts for a single guild
+
+    Timestamps are stored as epoch seconds and counts as uint16, one column per cluster plus the total.
+    Appends overwrite the oldest slot once the buffer is full, so expiry needs no pruning, and only the
+    slot that changed is written to disk
+    """
+    def __init__(self, path: str, capacity: int):
+        self.path = path
+        self.capacity = max(int(capacity), 1)
+        self.head = 0
+        self.size = 0
+        self.times = array("q", bytes(8 * self.capacity))
+        self.series: typing.Dict[str, array] = {TOTAL: array("H", bytes(2 * self.capacity))}
+
+    @classmethod
+    def load(cls, path: str, capacity: int) -> "GraphStore":
+        store = cls(path, capacity)
+        if not os.path.exists(path):
+            return store
+        with open(path, "rb") as file:
+            raw = file.read()
+        magic, version, filecap, head, size, count = HEADER.unpack_from(raw, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a graph data file")
+        offset = HEADER.size
+        names = []
+        for _ in range(count):
+            (length,) = NAME.unpack_from(raw, offset)
+            offset += NAME.size
+            names.append(raw[offset:offset + length].decode())
+            offset += length
+        old = cls(path, filecap)
+        old.head = head
+        old.size = size
+        old.times = array("q", raw[offset:offset + 8 * filecap])
+        offset += 8 * filecap
+        old.series = {}
+        for name in names:
+            old.series[name] = array("H", raw[offset:offset + 2 * filecap])
+            offset += 2 * filecap
+        if filecap == store.capacity:
+            return old
+        # Expiration was changed while unloaded
+        old.resize(store.capacity)
+        return old
+
+    @property
+    def clusters(self) -> typing.List[str]:
+        return [name for name in self.series if name != TOTAL]
+
+    # Byte offsets of each column in the file
+    def offsets(self) -> typing.Tuple[int, typing.Dict[str, int]]:
+        offset = HEADER.size + sum(NAME.size + len(name.encode()) for name in self.series)
+        times_offset = offset
+        offset += 8 * self.capacity
+        columns = {}
+        for name in self.series:
+            columns[name] = offset
+            offset += 2 * self.capacity
+        return times_offset, columns
+
+    def header(self) -> bytes:
+        return HEADER.pack(MAGIC, VERSION, self.capacity, self.head, self.size, len(self.series))
+
+    # Write the whole file, used when the layout changes
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "wb") as file:
+            file.write(self.header())
+            for name in self.series:
+                encoded = name.encode()
+                file.write(NAME.pack(len(encoded)))
+                file.write(encoded)
+            file.write(self.times.tobytes())
+            for column in self.series.values():
+                file.write(column.tobytes())
+        os.replace(tmp, self.path)
+
+    # Write a single slot and the header in place
+    def save_slot(self, index: int):
+        if not os.path.exists(self.path):
+            return self.save()
+        times_offset, columns = self.offsets()
+        with open(self.path, "r+b") as file:
+            file.write(self.header())
+            file.seek(times_offset + 8 * index)
+            file.write(struct.pack("<q", self.times[index]))
+            for name, offset in columns.items():
+                file.seek(offset + 2 * index)
+                file.write(struct.pack("<H", self.series[name][index]))
+
+    def add_series(self, name: str):
+        self.series[name] = array("H", bytes(2 * self.capacity))
+
+    # Append one data point, returns True if the file layout changed and needs a full save
+    def append(self, timestamp: int, total: int, cluster_counts: typing.Dict[str, int]) -> bool:
+        relayout = False
+        for cname in cluster_counts:
+            if cname not in self.series:
+                self.add_series(cname)
+                relayout = True
+        index = self.head
+        self.times[index] = int(timestamp)
+        self.series[TOTAL][index] = min(int(total), 65535)
+        for name, column in self.series.items():
+            if name != TOTAL:
+                column[index] = min(int(cluster_counts.get(name, 0)), 65535)
+        self.head = (self.head + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+        return relayout
+
+    # Append and persist, only the new slot is written unless a cluster was added
+    def record(self, timestamp: int, total: int, cluster_counts: typing.Dict[str, int]):
+        index = self.head
+        if self.append(timestamp, total, cluster_counts):
+            self.save()
+        else:
+            self.save_slot(index)
+
+    # Identifies the newest sample, changes whenever a point is recorded or the store is reset
+    @property
+    def last(self) -> typing.Tuple[int, int]:
+        if not self.size:
+            return 0, 0
+        return self.size, self.times[(self.head - 1) % self.capacity]
+
+    def column(self, data: array, points: int = None) -> typing.List[int]:
+        points = self.size if points is None else max(min(points, self.size), 0)
+        if not points:
+            return []
+        start = (self.head - points) % self.capacity
+        if start + points <= self.capacity:
+            return data[start:start + points].tolist()
+        return data[start:].tolist() + data[:self.head].tolist()
+
+    def snapshot(self, points: int = None) -> GraphData:
+        return GraphData(
+            times=self.column(self.times, points),
+            totals=self.column(self.series[TOTAL], points),
+            clusters={name: self.column(self.series[name], points) for name in self.clusters}
+        )
+
+    # Change capacity keeping the most recent points
+    def resize(self, capacity: int):
+        capacity = max(int(capacity), 1)
+        data = self.snapshot(capacity)
+        self.capacity = capacity
+        self.head = 0
+        self.size = 0
+        self.times = array("q", bytes(8 * capacity))
+        self.series = {name: array("H", bytes(2 * capacity)) for name in self.series}
+        for i, timestamp in enumerate(data.times):
+            self.append(
+                timestamp,
+                data.totals[i],
+                {name: counts[i] for name, counts in data.clusters.items()}
+            )
+
+    def clear(self):
+        self.head = 0
+        self.size = 0
+        self.times = array("q", bytes(8 * self.capacity))
+        self.series = {TOTAL: array("H", bytes(2 * self.capacity))}
+
+    # Drop cluster columns that no longer exist, returns how many were removed
+    def prune_series(self, keep: typing.Iterable[str]) -> int:
+        keep = set(keep)
+        removed = [name for name in self.clusters if name not in keep]
+        for name in removed:
+            del self.series[name]
+        return len(removed)
+
+    # Export in the old serverstats layout, used for backups
+    def to_legacy(self, expiration: int) -> dict:
+        data = self.snapshot()
+        legacy = {
+            "dates": [
+                datetime.datetime.fromtimestamp(t, datetime.timezone.utc).isoformat() for t in data.times
+            ],
+            "counts": data.totals,
+            "expiration": expiration
+        }
+        legacy.update(data.clusters)
+        return legacy
+
+    # Replace the contents with data in the old serverstats layout
+    # Cluster lists that started later than the dates list are aligned to the most recent points
+    def from_legacy(self, legacy: dict):
+        self.clear()
+        dates = legacy.get("dates", [])
+        counts = legacy.get("counts", [])
+        points = min(len(dates), len(counts))
+        clusters = {
+            k: v for k, v in legacy.items()
+            if k not in ("dates", "counts", "expiration") and isinstance(v, list)
+        }
+        for cname in clusters:
+            self.add_series(cname)
+        start = max(points - self.capacity, 0)
+        for i in range(start, points):
+            timestamp = int(datetime.datetime.fromisoformat(dates[i]).timestamp())
+            cluster_counts = {}
+            for cname, countlist in clusters.items():
+                pos = len(countlist) - (points - i)
+                cluster_counts[cname] = countlist[pos] if pos >= 0 else 0
+            self.append(timestamp, counts[i], cluster_counts)
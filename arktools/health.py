@@ -0,0 +1,130 @@
+import bisect
+import enum
+import time
+import typing
+
+# Seconds a server is skipped after its first failure, doubles with each failed probe
+BASE_BACKOFF = 15
+MAX_BACKOFF = 300
+# How long a server has to be down before the admin log gets pinged, in seconds
+OFFLINE_ALERT = 600
+# Upper bounds of the latency histogram buckets in seconds, anything slower lands in the last bucket
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class BreakerState(enum.Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+
+class LatencyHistogram:
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.total = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def add(self, seconds: float):
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.total += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.total if self.total else 0.0
+
+    # Upper bound of the bucket the given percentile falls in, the slowest time seen if it's past the last bucket
+    def percentile(self, pct: float) -> float:
+        if not self.total:
+            return 0.0
+        target = self.total * pct / 100
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.counts):
+            seen += count
+            if seen >= target:
+                return bound
+        return self.max
+
+
+class ServerHealth:
+    """
+    Circuit breaker for a single server
+
+    A failed command opens the breaker and the server is skipped by everything but priority commands,
+    once the backoff runs out a single probe is let through to see if it's back.
+    Any success closes it again, every timestamp is monotonic
+    """
+    def __init__(self):
+        self.state = BreakerState.CLOSED
+        self.failures = 0
+        self.retry_at = 0.0
+        # When the current outage started, None while the server is healthy
+        self.down_since: typing.Optional[float] = None
+        self.alerted = False
+        self.latency: typing.Dict[str, LatencyHistogram] = {}
+
+    @property
+    def healthy(self) -> bool:
+        return self.state is BreakerState.CLOSED
+
+    @property
+    def downtime(self) -> float:
+        if self.down_since is None:
+            return 0.0
+        return time.monotonic() - self.down_since
+
+    # Whether a command should be sent, priority commands always go through
+    def allow(self, priority: bool = False) -> bool:
+        if priority or self.state is BreakerState.CLOSED:
+            return True
+        if self.state is BreakerState.OPEN and time.monotonic() >= self.retry_at:
+            # This caller is the probe, everyone else keeps waiting until it reports back
+            self.state = BreakerState.HALF_OPEN
+            return True
+        return False
+
+    def success(self, command: str, seconds: float):
+        self.state = BreakerState.CLOSED
+        self.failures = 0
+        self.down_since = None
+        self.alerted = False
+        histogram = self.latency.get(command)
+        if histogram is None:
+            histogram = self.latency[command] = LatencyHistogram()
+        histogram.add(seconds)
+
+    def failure(self):
+        now = time.monotonic()
+        self.failures += 1
+        if self.down_since is None:
+            self.down_since = now
+        self.retry_at = now + min(BASE_BACKOFF * 2 ** (self.failures - 1), MAX_BACKOFF)
+        self.state = BreakerState.OPEN
+
+    # True once per outage when it passes the alert threshold
+    def alert_due(self) -> bool:
+        if self.alerted or self.downtime < OFFLINE_ALERT:
+            return False
+        self.alerted = True
+        return True
+
+
+class HealthTracker:
+    """Health of every configured server, keyed by chat channel ID"""
+    def __init__(self):
+        self.servers: typing.Dict[int, ServerHealth] = {}
+
+    def get(self, channel_id: int) -> ServerHealth:
+        health = self.servers.get(channel_id)
+        if health is None:
+            health = self.servers[channel_id] = ServerHealth()
+        return health
+
+    # Forget servers that were removed from every config
+    def prune(self, channel_ids: typing.Iterable[int]):
+        keep = set(channel_ids)
+        for channel_id in list(self.servers):
+            if channel_id not in keep:
+                del self.servers[channel_id]
@@ -0,0 +1,122 @@
+import asyncio
+import collections
+import logging
+import time
+import typing
+import uuid
+
+from .rconpool import RconPool, Responses
+
+log = logging.getLogger("red.vrt.arktools.itemgrant")
+
+# Items pipelined per batch, the server's pooled connection is free for other commands between batches
+BATCH_SIZE = 50
+# Timeout for a batch, plus a little more for each item in it
+GRANT_TIMEOUT = 5
+ITEM_TIMEOUT = 0.1
+# Times a batch that never reached the server is retried, and how long to wait first so the connection can reconnect
+RETRIES = 1
+RETRY_DELAY = 2
+# How long unfinished deliveries are remembered so a retry with the same ID only sends what's missing
+DELIVERY_TTL = 3600
+
+
+class ServerDelivery:
+    def __init__(self, name: str, total: int):
+        self.name = name
+        self.total = total
+        # Commands the server has acknowledged, a retry picks up after these
+        self.confirmed = 0
+        self.attempts = 0
+        self.latency = 0.0
+
+    @property
+    def done(self) -> bool:
+        return self.confirmed >= self.total
+
+
+class Delivery:
+    def __init__(self, delivery_id: str):
+        self.id = delivery_id
+        self.created = time.monotonic()
+        self.servers: typing.Dict[str, ServerDelivery] = {}
+
+    @property
+    def success(self) -> typing.List[str]:
+        return [name for name, result in self.servers.items() if result.done]
+
+    @property
+    def failed(self) -> typing.List[str]:
+        return [name for name, result in self.servers.items() if not result.done]
+
+
+class ItemGrants:
+    """
+    Sends giveitemtoplayer commands for bulksend, ArkShop purchases and the in-game item commands
+
+    Every server gets its items pipelined over its pooled connection in small batches and all servers are sent to
+    at once. Progress is tracked per delivery ID, so granting again with the same ID resumes each server
+    after the last item it acknowledged instead of sending everything twice.
+    A batch is only retried automatically if it never reached the server, one that timed out may have been
+    partly granted so it's left for the caller to decide
+    """
+    def __init__(self, pool: RconPool):
+        self.pool = pool
+        self.deliveries: typing.Dict[str, Delivery] = collections.OrderedDict()
+
+    async def grant(
+            self,
+            servers: typing.Iterable[typing.Tuple[str, dict]],
+            implant_id: str,
+            paths: typing.List[str],
+            repeat: int = 1,
+            delivery_id: str = None
+    ) -> Delivery:
+        self.prune()
+        if delivery_id is None:
+            delivery_id = uuid.uuid4().hex
+        delivery = self.deliveries.get(delivery_id)
+        # Only unfinished deliveries resume, the same ID after everything went through is a new request
+        if delivery is None or (delivery.servers and not delivery.failed):
+            delivery = Delivery(delivery_id)
+            self.deliveries.pop(delivery_id, None)
+            self.deliveries[delivery_id] = delivery
+        commands = [f"giveitemtoplayer {implant_id} {path}" for path in paths] * repeat
+        await asyncio.gather(*(self.deliver(delivery, name, server, commands) for name, server in servers))
+        return delivery
+
+    async def deliver(self, delivery: Delivery, name: str, server: dict, commands: typing.List[str]):
+        result = delivery.servers.get(name)
+        if result is None:
+            result = delivery.servers[name] = ServerDelivery(name, len(commands))
+        retries = 0
+        while not result.done:
+            batch = commands[result.confirmed:result.confirmed + BATCH_SIZE]
+            responses = Responses()
+            start = time.monotonic()
+            await self.pool.run_many(server, batch, GRANT_TIMEOUT + ITEM_TIMEOUT * len(batch), responses)
+            result.latency = time.monotonic() - start
+            result.attempts += 1
+            result.confirmed += len(responses)
+            if len(responses) == len(batch):
+                continue
+            if responses.sent or retries >= RETRIES:
+                # Anything past the acknowledged items may or may not have been granted, don't risk doubling it
+                break
+            # Couldn't connect, nothing was written so it's safe to try again
+            retries += 1
+            await asyncio.sleep(RETRY_DELAY)
+        if not result.done:
+            log.warning(f"Delivery {delivery.id} to {name} stopped after {result.confirmed}/{result.total} items")
+
+    # Caller settled the delivery (charged for it), a grant with the same ID starts over
+    def forget(self, delivery_id: str):
+        self.deliveries.pop(delivery_id, None)
+
+    def prune(self):
+        cutoff = time.monotonic() - DELIVERY_TTL
+        while self.deliveries:
+            delivery_id, delivery = next(iter(self.deliveries.items()))
+            if delivery.created > cutoff:
+                break
+            del self.deliveries[delivery_id]
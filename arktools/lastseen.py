@@ -0,0 +1,64 @@
+import datetime
+import heapq
+import typing
+
+# Rebuild the heap once stale entries outnumber live ones by this factor
+COMPACT_RATIO = 2
+
+
+def seen_timestamp(lastseen: typing.Optional[dict]) -> typing.Optional[float]:
+    """Epoch time from a player's lastseen config entry, None if they were unfriended or never seen"""
+    if not lastseen or not lastseen.get("map") or not lastseen.get("time"):
+        return None
+    try:
+        return datetime.datetime.fromisoformat(lastseen["time"]).timestamp()
+    except ValueError:
+        return None
+
+
+class LastSeenIndex:
+    """
+    Min-heap of when each still friended player was last seen on any server
+
+    Updated as players are seen so the maintenance loop can pop everyone past the unfriend cutoff,
+    oldest first, without parsing every player's timestamp each run.
+    Updates leave the old heap entry behind, entries that don't match a player's current time are skipped
+    """
+    def __init__(self):
+        self.heap: typing.List[typing.Tuple[float, str]] = []
+        # xuid -> the live heap entry's timestamp
+        self.times: typing.Dict[str, float] = {}
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    # Only ever moves a player's time forward, None means they were unfriended and should not expire again
+    def update(self, xuid: str, timestamp: typing.Optional[float]):
+        if timestamp is None:
+            self.remove(xuid)
+            return
+        current = self.times.get(xuid)
+        if current is not None and current >= timestamp:
+            return
+        self.times[xuid] = timestamp
+        heapq.heappush(self.heap, (timestamp, xuid))
+        if len(self.heap) > COMPACT_RATIO * len(self.times) + 64:
+            self.compact()
+
+    def remove(self, xuid: str):
+        self.times.pop(xuid, None)
+
+    # Remove and return the players last seen at or before the cutoff as (xuid, timestamp), oldest first
+    def pop_expired(self, cutoff: float) -> typing.List[typing.Tuple[str, float]]:
+        expired = []
+        while self.heap and self.heap[0][0] <= cutoff:
+            timestamp, xuid = heapq.heappop(self.heap)
+            if self.times.get(xuid) != timestamp:
+                continue
+            del self.times[xuid]
+            expired.append((xuid, timestamp))
+        return expired
+
+    def compact(self):
+        self.heap = [(timestamp, xuid) for xuid, timestamp in self.times.items()]
+        heapq.heapify(self.heap)
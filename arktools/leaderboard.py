@@ -0,0 +1,256 @@
+import bisect
+import typing
+
+# Target bucket size for the sorted keys, buckets split once they reach twice this
+LOAD = 256
+
+# (negative total playtime, xuid) so the most played sort first and ties break the same way every time
+RankKey = typing.Tuple[int, str]
+
+
+class SortedKeys:
+    """
+    Sorted list split into buckets, with a Fenwick tree over the bucket sizes
+
+    Inserts and removals only shift one bucket, and the tree turns a position into a bucket (and back)
+    in O(log n), so ranks and slices never have to walk the whole list
+    """
+    def __init__(self, keys: typing.Iterable[RankKey] = ()):
+        keys = sorted(keys)
+        self.buckets: typing.List[typing.List[RankKey]] = [keys[i:i + LOAD] for i in range(0, len(keys), LOAD)]
+        self.maxes: typing.List[RankKey] = [bucket[-1] for bucket in self.buckets]
+        self.size = len(keys)
+        self.tree: typing.List[int] = []
+        self.reindex()
+
+    def __len__(self) -> int:
+        return self.size
+
+    # Rebuild the Fenwick tree, only needed when buckets are added or removed
+    def reindex(self):
+        tree = [0] * (len(self.buckets) + 1)
+        for i, bucket in enumerate(self.buckets, 1):
+            tree[i] += len(bucket)
+            parent = i + (i & -i)
+            if parent < len(tree):
+                tree[parent] += tree[i]
+        self.tree = tree
+
+    def resize(self, pos: int, delta: int):
+        i = pos + 1
+        while i < len(self.tree):
+            self.tree[i] += delta
+            i += i & -i
+
+    # Number of keys in the buckets before this one
+    def before(self, pos: int) -> int:
+        total = 0
+        while pos > 0:
+            total += self.tree[pos]
+            pos -= pos & -pos
+        return total
+
+    # Bucket and offset of the key at an index
+    def locate(self, index: int) -> typing.Tuple[int, int]:
+        pos = 0
+        step = 1 << (len(self.buckets).bit_length() - 1) if self.buckets else 0
+        while step:
+            nxt = pos + step
+            if nxt < len(self.tree) and self.tree[nxt] <= index:
+                pos = nxt
+                index -= self.tree[nxt]
+            step >>= 1
+        return pos, index
+
+    def add(self, key: RankKey):
+        if not self.buckets:
+            self.buckets.append([key])
+            self.maxes.append(key)
+            self.size = 1
+            self.reindex()
+            return
+        pos = bisect.bisect_left(self.maxes, key)
+        if pos == len(self.maxes):
+            pos -= 1
+            self.buckets[pos].append(key)
+            self.maxes[pos] = key
+        else:
+            bisect.insort(self.buckets[pos], key)
+        self.size += 1
+        bucket = self.buckets[pos]
+        if len(bucket) >= LOAD * 2:
+            half = bucket[LOAD:]
+            del bucket[LOAD:]
+            self.buckets.insert(pos + 1, half)
+            self.maxes[pos] = bucket[-1]
+            self.maxes.insert(pos + 1, half[-1])
+            self.reindex()
+        else:
+            self.resize(pos, 1)
+
+    def remove(self, key: RankKey) -> bool:
+        pos = bisect.bisect_left(self.maxes, key)
+        if pos == len(self.maxes):
+            return False
+        bucket = self.buckets[pos]
+        i = bisect.bisect_left(bucket, key)
+        if i == len(bucket) or bucket[i] != key:
+            return False
+        del bucket[i]
+        self.size -= 1
+        if bucket:
+            self.maxes[pos] = bucket[-1]
+            self.resize(pos, -1)
+        else:
+            del self.buckets[pos]
+            del self.maxes[pos]
+            self.reindex()
+        return True
+
+    # How many keys sort before this one
+    def rank(self, key: RankKey) -> int:
+        pos = bisect.bisect_left(self.maxes, key)
+        if pos == len(self.maxes):
+            return self.size
+        return self.before(pos) + bisect.bisect_left(self.buckets[pos], key)
+
+    def slice(self, start: int, stop: int) -> typing.List[RankKey]:
+        start = max(start, 0)
+        stop = min(stop, self.size)
+        keys = []
+        if start >= stop:
+            return keys
+        pos, offset = self.locate(start)
+        while len(keys) < stop - start:
+            keys.extend(self.buckets[pos][offset:offset + stop - start - len(keys)])
+            pos += 1
+            offset = 0
+        return keys
+
+
+class MapStats:
+    def __init__(self):
+        self.total = 0
+        # xuid -> seconds played on this map
+        self.players: typing.Dict[str, int] = {}
+        self.top: typing.Optional[str] = None
+
+    def set(self, xuid: str, seconds: int):
+        previous = self.players.get(xuid, 0)
+        self.total += seconds - previous
+        self.players[xuid] = seconds
+        if self.top is None or (xuid != self.top and seconds > self.players[self.top]):
+            self.top = xuid
+        elif xuid == self.top and seconds < previous:
+            self.find_top()
+
+    def remove(self, xuid: str):
+        self.total -= self.players.pop(xuid, 0)
+        if xuid == self.top:
+            self.find_top()
+
+    # Playtime only goes up, so this only runs when the top player is wiped or their map time drops
+    def find_top(self):
+        self.top = max(self.players, key=self.players.get) if self.players else None
+
+
+class Leaderboard:
+    """
+    Playtime rankings for a guild's players, kept sorted as their playtime changes
+
+    Holds each player's total and per map time along with running totals for every map,
+    so the leaderboard commands can slice out one page or look up a rank without sorting all players
+    """
+    def __init__(self):
+        self.order = SortedKeys()
+        # xuid -> total playtime
+        self.totals: typing.Dict[str, int] = {}
+        # xuid -> {map name: seconds}
+        self.player_maps: typing.Dict[str, typing.Dict[str, int]] = {}
+        self.names: typing.Dict[str, str] = {}
+        # xuid -> last seen time as stored in the config
+        self.lastseen: typing.Dict[str, str] = {}
+        self.maps: typing.Dict[str, MapStats] = {}
+        self.global_time = 0
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    # Build from the whole players config in one sort instead of inserting players one at a time
+    def load(self, players: dict):
+        for xuid, data in players.items():
+            if data.get("playtime"):
+                self.store(xuid, data)
+        self.order = SortedKeys((-total, xuid) for xuid, total in self.totals.items())
+
+    def update(self, xuid: str, data: dict):
+        if not data.get("playtime"):
+            self.remove(xuid)
+            return
+        previous = self.totals.get(xuid)
+        self.store(xuid, data)
+        total = self.totals[xuid]
+        if previous != total:
+            if previous is not None:
+                self.order.remove((-previous, xuid))
+            self.order.add((-total, xuid))
+
+    # Everything but the sorted order
+    def store(self, xuid: str, data: dict):
+        playtime = data["playtime"]
+        total = playtime.get("total", 0)
+        self.global_time += total - self.totals.get(xuid, 0)
+        self.totals[xuid] = total
+        self.names[xuid] = data.get("username", "")
+        self.lastseen[xuid] = data.get("lastseen", {}).get("time")
+        maps = {name: seconds for name, seconds in playtime.items() if name != "total"}
+        previous = self.player_maps.get(xuid, {})
+        for name in previous:
+            if name not in maps:
+                self.remove_map(name, xuid)
+        for name, seconds in maps.items():
+            if previous.get(name) != seconds:
+                stats = self.maps.get(name)
+                if stats is None:
+                    stats = self.maps[name] = MapStats()
+                stats.set(xuid, seconds)
+        self.player_maps[xuid] = maps
+
+    def remove(self, xuid: str):
+        total = self.totals.pop(xuid, None)
+        if total is None:
+            return
+        self.order.remove((-total, xuid))
+        self.global_time -= total
+        for name in self.player_maps.pop(xuid, {}):
+            self.remove_map(name, xuid)
+        self.names.pop(xuid, None)
+        self.lastseen.pop(xuid, None)
+
+    def remove_map(self, name: str, xuid: str):
+        stats = self.maps.get(name)
+        if stats is None:
+            return
+        stats.remove(xuid)
+        if not stats.players:
+            del self.maps[name]
+
+    # 1 based position of a player, None if they have no playtime
+    def rank(self, xuid: str) -> typing.Optional[int]:
+        total = self.totals.get(xuid)
+        if total is None:
+            return None
+        return self.order.rank((-total, xuid)) + 1
+
+    # Players that have actually played, zero playtime sorts last so this is the rank of the first of them
+    @property
+    def ranked(self) -> int:
+        return self.order.rank((0, ""))
+
+    # (xuid, total playtime) for the players between two positions, most played first
+    def top(self, start: int, stop: int) -> typing.List[typing.Tuple[str, int]]:
+        return [(xuid, -total) for total, xuid in self.order.slice(start, stop)]
+
+    # (map name, stats) sorted by total time played on each map
+    def sorted_maps(self) -> typing.List[typing.Tuple[str, MapStats]]:
+        return sorted(self.maps.items(), key=lambda x: x[1].total, reverse=True)
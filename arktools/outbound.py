@@ -0,0 +1,45 @@
+import time
+import typing
+
+# How long commands wait in the queue so everything queued during the same tick is sent together
+FLUSH_DELAY = 0.25
+
+
+# Every serverchat goes out as its own pipelined command, multi-line ones are split per line
+# so each line the server echoes back carries the SERVER: prefix and is never relayed again
+def split_lines(commands: typing.List[str]) -> typing.List[str]:
+    payloads = []
+    for command in commands:
+        if command.startswith("serverchat ") and "\n" in command:
+            text = command.split(" ", 1)[1]
+            payloads.extend(f"serverchat {line}" for line in text.splitlines() if line.strip())
+        else:
+            payloads.append(command)
+    return payloads
+
+
+class OutboundQueue:
+    """Commands waiting to be sent to a single server on the next flush"""
+    def __init__(self):
+        self.commands: typing.List[str] = []
+        self.first_queued = 0.0
+        self.flushing = False
+        # Metrics
+        self.sent = 0
+        self.payloads = 0
+        self.dropped = 0
+        self.last_latency = 0.0
+
+    @property
+    def depth(self) -> int:
+        return len(self.commands)
+
+    def add(self, command: str):
+        if not self.commands:
+            self.first_queued = time.monotonic()
+        self.commands.append(command)
+
+    def drain(self) -> typing.List[str]:
+        commands = self.commands
+        self.commands = []
+        return commands
@@ -0,0 +1,50 @@
+import enum
+import types
+import typing
+
+
+class ServerStatus(enum.Enum):
+    OFFLINE = "offline"
+    EMPTY = "empty"
+    ONLINE = "online"
+
+
+class PlayerList(typing.NamedTuple):
+    """Cached result of the last listplayers poll for a server"""
+    status: ServerStatus
+    xuids: typing.FrozenSet[str]
+    # xuid -> gamertag
+    names: typing.Mapping[str, str]
+
+    @property
+    def online(self) -> bool:
+        return self.status is ServerStatus.ONLINE
+
+    @property
+    def count(self) -> int:
+        return len(self.xuids)
+
+    # Build from listplayers regex matches of (gamertag, xuid)
+    @classmethod
+    def from_players(cls, players: typing.List[typing.Tuple[str, str]]) -> "PlayerList":
+        if not players:
+            return EMPTY
+        names = {xuid: gamertag for gamertag, xuid in players}
+        return cls(ServerStatus.ONLINE, frozenset(names), types.MappingProxyType(names))
+
+    # Players that joined and left going from the last list to this one
+    def diff(self, last: "PlayerList") -> typing.Tuple[typing.FrozenSet[str], typing.FrozenSet[str]]:
+        if self.online and last.online:
+            return self.xuids - last.xuids, last.xuids - self.xuids
+        if last.online:
+            # Went from populated to either offline or empty so everyone left
+            return frozenset(), last.xuids
+        if self.online and last.status is ServerStatus.EMPTY:
+            # Went from empty to populated so everyone joined
+            return self.xuids, frozenset()
+        # Offline to populated is probably a cog reload, so nothing to log
+        return frozenset(), frozenset()
+
+
+OFFLINE = PlayerList(ServerStatus.OFFLINE, frozenset(), types.MappingProxyType({}))
+EMPTY = PlayerList(ServerStatus.EMPTY, frozenset(), types.MappingProxyType({}))
@@ -0,0 +1,129 @@
+import asyncio
+import logging
+import time
+import typing
+
+from .asyncrcon import AsyncRconClient
+
+log = logging.getLogger("red.vrt.arktools.rconpool")
+
+# Connect + auth has its own deadline since it isn't part of the per-command timeout
+CONNECT_TIMEOUT = 5
+# Reconnect backoff grows by powers of 2 up to this many seconds
+MAX_BACKOFF = 30
+
+
+class Responses(list):
+    """Replies collected while a pipelined batch runs, sent is False if it failed before anything was written"""
+    sent = False
+
+
+class RconConnection:
+    """A single authenticated RCON socket that is kept open between commands"""
+    def __init__(self, host: str, port: int, passwd: str):
+        self.host = host
+        self.port = port
+        self.passwd = passwd
+        self.client = AsyncRconClient(host, port, passwd)
+        # Flow control, only one command per server is on the wire at a time
+        self.lock = asyncio.Lock()
+        self.failures = 0
+        self.retry_at = 0.0
+        self.connects = 0
+        self.commands = 0
+
+    @property
+    def connected(self) -> bool:
+        return self.client.connected
+
+    def backing_off(self) -> bool:
+        return time.monotonic() < self.retry_at
+
+    def close(self):
+        self.client.close()
+
+    def fail(self):
+        self.close()
+        self.failures += 1
+        self.retry_at = time.monotonic() + min(2 ** (self.failures - 1), MAX_BACKOFF)
+
+    async def run(self, command: str, timeout: float) -> typing.Optional[str]:
+        res = await self.run_many([command], timeout)
+        return res[0] if res is not None else None
+
+    async def run_many(
+            self,
+            commands: typing.List[str],
+            timeout: float,
+            responses: typing.List[str] = None
+    ) -> typing.Optional[typing.List[str]]:
+        if self.backing_off():
+            return None
+        async with self.lock:
+            # Another caller may have failed while we were waiting on the lock
+            if self.backing_off():
+                return None
+            try:
+                if not self.client.connected:
+                    await asyncio.wait_for(self.client.connect(), timeout=CONNECT_TIMEOUT)
+                    self.connects += 1
+                if isinstance(responses, Responses):
+                    responses.sent = True
+                res = await asyncio.wait_for(self.client.run_many(commands, responses), timeout=timeout)
+            except asyncio.TimeoutError:
+                # Response may still arrive later, drop the socket so it can't be mistaken for the next reply
+                self.fail()
+                return None
+            except (OSError, asyncio.IncompleteReadError) as e:
+                # Server is down or dropped the connection, the loops already handle this as offline
+                log.debug(f"RCON {self.host}:{self.port} connection lost on '{commands[0]}': {e}")
+                self.fail()
+                return None
+            except Exception as e:
+                log.info(f"RCON {self.host}:{self.port} failed on '{commands[0]}': {e}")
+                self.fail()
+                return None
+            self.failures = 0
+            self.commands += len(commands)
+            return res
+
+
+class RconPool:
+    """
+    Long-lived RCON connections shared by every task that talks to a server
+
+    Connections are keyed by host and port so the task loops, crosschat and item sends
+    all reuse the same authenticated socket instead of connecting for each command
+    """
+    def __init__(self):
+        self.connections: typing.Dict[typing.Tuple[str, int], RconConnection] = {}
+
+    def get(self, server: dict) -> RconConnection:
+        key = (server["ip"], int(server["port"]))
+        conn = self.connections.get(key)
+        if conn and conn.passwd != server["password"]:
+            # Password was changed in the config, drop the old authenticated socket
+            conn.close()
+            conn = None
+        if not conn:
+            conn = RconConnection(server["ip"], int(server["port"]), server["password"])
+            self.connections[key] = conn
+        return conn
+
+    async def run(self, server: dict, command: str, timeout: float = 3) -> typing.Optional[str]:
+        return await self.get(server).run(command, timeout)
+
+    async def run_many(self, server: dict, commands: typing.List[str], timeout: float = 3, responses: list = None):
+        return await self.get(server).run_many(commands, timeout, responses)
+
+    # Close connections for servers that are no longer in any config
+    def prune(self, servers: typing.Iterable[dict]):
+        keep = {(s["ip"], int(s["port"])) for s in servers}
+        for key in list(self.connections.keys()):
+            if key not in keep:
+                self.connections.pop(key).close()
+
+    def close(self):
+        for conn in self.connections.values():
+            conn.close()
+        self.connections.clear()
@@ -0,0 +1,107 @@
+import typing
+
+from .lastseen import LastSeenIndex, seen_timestamp
+from .leaderboard import Leaderboard
+
+
+class PlayerRegistry:
+    """
+    Secondary indexes over a guild's player data
+
+    Kept in sync through the same places that mutate the players config,
+    so lookups by gamertag, character name or Discord ID don't have to scan every player.
+    Several players can share a key (lots of characters are just named "Human"),
+    so each key holds every xuid that has it and lookups return the lowest one
+    """
+    def __init__(self, players: dict = None):
+        # Lowercase gamertag -> xuids
+        self.gamertags: typing.Dict[str, typing.Set[str]] = {}
+        # In-game character name -> xuids
+        self.characters: typing.Dict[str, typing.Set[str]] = {}
+        # Discord user ID -> xuids
+        self.discord: typing.Dict[int, typing.Set[str]] = {}
+        # xuid -> the keys it currently owns in the indexes above, so updates can remove stale entries
+        self.keys: typing.Dict[str, typing.Tuple[str, typing.Set[str], typing.Optional[int]]] = {}
+        # When each friended player was last seen, for the maintenance loop's unfriend sweep
+        self.lastseen = LastSeenIndex()
+        # Players ranked by playtime for the leaderboard commands
+        self.leaderboard = Leaderboard()
+        if players:
+            for xuid, data in players.items():
+                self.index(xuid, data)
+            self.leaderboard.load(players)
+
+    def update(self, xuid: str, data: dict):
+        self.index(xuid, data)
+        self.leaderboard.update(xuid, data)
+
+    def index(self, xuid: str, data: dict):
+        self.unindex(xuid)
+        gamertag = str(data.get("username", "")).lower()
+        if gamertag:
+            add_key(self.gamertags, gamertag, xuid)
+        names = set()
+        for details in data.get("ingame", {}).values():
+            if isinstance(details, dict) and details.get("name"):
+                names.add(details["name"])
+        for name in names:
+            add_key(self.characters, name, xuid)
+        discord_id = data.get("discord")
+        if discord_id:
+            add_key(self.discord, int(discord_id), xuid)
+        self.keys[xuid] = (gamertag, names, discord_id)
+        self.lastseen.update(xuid, seen_timestamp(data.get("lastseen")))
+
+    def remove(self, xuid: str):
+        self.unindex(xuid)
+        self.lastseen.remove(xuid)
+        self.leaderboard.remove(xuid)
+
+    # Player was seen on a server by the player stats loop
+    def seen(self, xuid: str, timestamp: float):
+        self.lastseen.update(xuid, timestamp)
+
+    def unindex(self, xuid: str):
+        keys = self.keys.pop(xuid, None)
+        if not keys:
+            return
+        gamertag, names, discord_id = keys
+        if gamertag:
+            drop_key(self.gamertags, gamertag, xuid)
+        for name in names:
+            drop_key(self.characters, name, xuid)
+        if discord_id:
+            drop_key(self.discord, int(discord_id), xuid)
+
+    def by_gamertag(self, gamertag: str) -> typing.Optional[str]:
+        return first(self.gamertags.get(gamertag.lower()))
+
+    def by_character(self, character_name: str) -> typing.Optional[str]:
+        return first(self.characters.get(character_name))
+
+    def by_discord(self, user_id: int) -> typing.Optional[str]:
+        return first(self.discord.get(int(user_id)))
+
+
+def add_key(index: dict, key, xuid: str):
+    xuids = index.get(key)
+    if xuids is None:
+        xuids = index[key] = set()
+    xuids.add(xuid)
+
+
+# The key only goes away once no player has it
+def drop_key(index: dict, key, xuid: str):
+    xuids = index.get(key)
+    if not xuids:
+        return
+    xuids.discard(xuid)
+    if not xuids:
+        del index[key]
+
+
+# Lowest xuid so shared keys always resolve to the same player
+def first(xuids: typing.Optional[typing.Set[str]]) -> typing.Optional[str]:
+    if not xuids:
+        return None
+    return min(xuids, key=lambda x: (len(x), x))
@@ -0,0 +1,31 @@
+import types
+import typing
+
+
+class Routes(typing.NamedTuple):
+    """Immutable lookup tables for routing Discord messages to servers"""
+    # Map chat channel ID -> server
+    chat: typing.Mapping[int, dict]
+    # Cluster global chat channel ID -> every server in that cluster
+    globalchat: typing.Mapping[int, typing.Tuple[dict, ...]]
+    # Guild IDs that have servers configured
+    guilds: typing.FrozenSet[int]
+
+
+# Build the routing tables from the cached server list
+def build_routes(servers: typing.List[typing.Tuple[int, dict]]) -> Routes:
+    chat = {}
+    globalchat = {}
+    guilds = set()
+    for guild_id, server in servers:
+        guilds.add(guild_id)
+        chat[server["chatchannel"]] = server
+        globalchat.setdefault(server["globalchatchannel"], []).append(server)
+    return Routes(
+        chat=types.MappingProxyType(chat),
+        globalchat=types.MappingProxyType({k: tuple(v) for k, v in globalchat.items()}),
+        guilds=frozenset(guilds)
+    )
+
+
+EMPTY_ROUTES = build_routes([])
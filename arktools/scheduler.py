@@ -0,0 +1,110 @@
+import heapq
+import itertools
+import time
+import typing
+
+# Key for a single poll target, (chat channel ID, command)
+PollKey = typing.Tuple[int, str]
+
+# Base interval, fastest interval, and longest backoff for each polled command
+INTERVALS = {
+    "getchat": {"base": 5, "active": 2, "empty": 15, "max": 60},
+    "listplayers": {"base": 30, "active": 30, "empty": 45, "max": 240},
+}
+
+
+class PollStats:
+    def __init__(self):
+        self.started = time.monotonic()
+        self.polls = 0
+        self.failures = 0
+        self.interval = 0.0
+        self.last_duration = 0.0
+
+    @property
+    def rate(self) -> float:
+        """Achieved polls per minute since the target was added"""
+        elapsed = time.monotonic() - self.started
+        if elapsed <= 0:
+            return 0.0
+        return self.polls / elapsed * 60
+
+
+class PollScheduler:
+    """
+    Priority queue of server polls keyed by when they are next due
+
+    Each target is rescheduled when its poll finishes, so a server never has more than one
+    poll of the same command in flight and slow servers don't pile up duplicate tasks
+    """
+    def __init__(self):
+        self.heap: typing.List[typing.Tuple[float, int, PollKey]] = []
+        self.seq = itertools.count()
+        self.queued: typing.Set[PollKey] = set()
+        # key -> (guild ID, server dict)
+        self.targets: typing.Dict[PollKey, typing.Tuple[int, dict]] = {}
+        self.inflight: typing.Dict[PollKey, typing.Any] = {}
+        self.stats: typing.Dict[PollKey, PollStats] = {}
+        # Consecutive failures per key for exponential backoff
+        self.failures: typing.Dict[PollKey, int] = {}
+
+    def push(self, key: PollKey, delay: float):
+        if key in self.queued:
+            return
+        self.queued.add(key)
+        heapq.heappush(self.heap, (time.monotonic() + delay, next(self.seq), key))
+
+    # Sync targets with the cached server list, new servers get queued and removed ones are dropped lazily
+    def sync(self, servers: typing.List[typing.Tuple[int, dict]], delays: typing.Dict[str, float]):
+        targets = {}
+        for guild_id, server in servers:
+            for command in INTERVALS:
+                targets[(server["chatchannel"], command)] = (guild_id, server)
+        for key in targets:
+            if key not in self.queued and key not in self.inflight:
+                self.push(key, delays.get(key[1], 0))
+            if key not in self.stats:
+                self.stats[key] = PollStats()
+        for key in list(self.stats.keys()):
+            if key not in targets:
+                del self.stats[key]
+                self.failures.pop(key, None)
+        self.targets = targets
+
+    # Pop every target that is due right now
+    def due(self) -> typing.List[PollKey]:
+        now = time.monotonic()
+        ready = []
+        while self.heap and self.heap[0][0] <= now:
+            _, _, key = heapq.heappop(self.heap)
+            self.queued.discard(key)
+            if key not in self.targets or key in self.inflight:
+                continue
+            ready.append(key)
+        return ready
+
+    # Work out the next interval from the result of the poll that just finished
+    def reschedule(self, key: PollKey, online: bool, active: bool, empty: bool, duration: float):
+        if key not in self.targets:
+            return
+        intervals = INTERVALS[key[1]]
+        if not online:
+            failures = self.failures.get(key, 0) + 1
+            self.failures[key] = failures
+            interval = min(intervals["base"] * 2 ** (failures - 1), intervals["max"])
+        else:
+            self.failures[key] = 0
+            if active:
+                interval = intervals["active"]
+            elif empty:
+                interval = intervals["empty"]
+            else:
+                interval = intervals["base"]
+        stats = self.stats.get(key)
+        if stats:
+            stats.polls += 1
+            stats.interval = interval
+            stats.last_duration = duration
+            if not online:
+                stats.failures += 1
+        self.push(key, max(interval - duration, 0))
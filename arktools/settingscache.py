@@ -0,0 +1,39 @@
+import typing
+
+import discord
+from redbot.core import Config
+
+# Sections that are large or constantly written by the task loops, these are always read from the config directly
+HEAVY_KEYS = ("players", "serverstats", "tribes", "cooldowns")
+
+
+class SettingsCache:
+    """
+    Snapshot of each guild's small, rarely changing settings
+
+    The hot paths (chat handling, in-game commands, status and autofriend loops) read from here instead of
+    pulling the whole guild blob, which deep copies every player on each call.
+    Snapshots are dropped when a setting changes and rebuilt on the next read, callers must not mutate them
+    """
+    def __init__(self, config: Config):
+        self.config = config
+        self.snapshots: typing.Dict[int, dict] = {}
+
+    async def get(self, guild: discord.guild) -> dict:
+        snapshot = self.snapshots.get(guild.id)
+        if snapshot is None:
+            group = self.config.guild(guild)
+            snapshot = {}
+            for key in group.defaults:
+                if key in HEAVY_KEYS:
+                    continue
+                snapshot[key] = await group.get_attr(key)()
+            self.snapshots[guild.id] = snapshot
+        return snapshot
+
+    # Called whenever something writes to a guild's settings, drop everything if no guild is given
+    def invalidate(self, guild_id: int = None):
+        if guild_id is None:
+            self.snapshots.clear()
+        else:
+            self.snapshots.pop(guild_id, None)
@@ -0,0 +1,53 @@
+import hashlib
+import io
+import typing
+
+import discord
+
+# Samples are grouped into windows this long in seconds, the graph is checked for changes once per window
+GRAPH_REFRESH = 900
+
+
+def page_hash(*parts) -> str:
+    return hashlib.sha1(repr(parts).encode()).hexdigest()
+
+
+class StatusBoard:
+    """
+    The live status messages currently posted for a guild
+
+    Kept in memory so each cycle can edit only the pages whose content changed,
+    the graph lives on the last page and is only reposted when the rendered image changes
+    """
+    def __init__(self, channel_id: int, color: discord.Color):
+        self.channel_id = channel_id
+        # Stable across edits so an unchanged page really is unchanged
+        self.color = color
+        self.messages: typing.List[discord.Message] = []
+        self.hashes: typing.List[str] = []
+        # Render key and sample window of the graph last checked, and a digest of the image that was posted
+        self.graph_sig = None
+        self.graph_digest: typing.Optional[str] = None
+
+    @property
+    def ids(self) -> typing.List[int]:
+        return [message.id for message in self.messages]
+
+    def graph_stale(self, graph_sig) -> bool:
+        return graph_sig != self.graph_sig
+
+    def graph_changed(self, png: bytes) -> bool:
+        return hashlib.sha1(png).hexdigest() != self.graph_digest
+
+    def graph_sent(self, graph_sig, png: bytes):
+        self.graph_sig = graph_sig
+        self.graph_digest = hashlib.sha1(png).hexdigest()
+
+
+# Same render key the graph renderer caches under, plus the window the newest sample falls in
+def graph_signature(guild_id: int, hours: int, timezone: str, last: typing.Tuple[int, int]) -> tuple:
+    return guild_id, hours, timezone, last[1] // GRAPH_REFRESH
+
+
+def graph_file(png: bytes) -> discord.File:
+    return discord.File(io.BytesIO(png), filename="plot.png")
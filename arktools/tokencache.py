@@ -0,0 +1,58 @@
+import datetime
+import typing
+
+# Tokens are refreshed this many seconds before they actually expire
+REFRESH_MARGIN = 300
+
+# (guild ID, cluster name, server name)
+TokenKey = typing.Tuple[int, str, str]
+
+
+class CachedAuth(typing.NamedTuple):
+    client: typing.Any
+    token: str
+    expires: datetime.datetime
+
+
+class TokenCache:
+    """
+    Authorized Xbox Live clients per host Gamertag, kept until their XSTS token is close to expiring
+
+    Without this every Xbox call refreshed the OAuth tokens and wrote them back to the config
+    """
+    def __init__(self):
+        self.auth: typing.Dict[TokenKey, CachedAuth] = {}
+        # Metrics
+        self.hits = 0
+        self.refreshes = 0
+
+    def get(self, key: TokenKey) -> typing.Optional[CachedAuth]:
+        cached = self.auth.get(key)
+        if not cached:
+            return None
+        now = datetime.datetime.now(datetime.timezone.utc)
+        if (cached.expires - now).total_seconds() <= REFRESH_MARGIN:
+            del self.auth[key]
+            return None
+        self.hits += 1
+        return cached
+
+    def set(self, key: TokenKey, client, token: str, expires: datetime.datetime):
+        if expires.tzinfo is None:
+            expires = expires.replace(tzinfo=datetime.timezone.utc)
+        self.auth[key] = CachedAuth(client, token, expires)
+        self.refreshes += 1
+
+    # Drop cached clients for a single host, a guild, or everything
+    def invalidate(self, guild_id: int = None, cname: str = None, sname: str = None):
+        if guild_id is None:
+            self.auth.clear()
+            return
+        for key in list(self.auth.keys()):
+            if key[0] != guild_id:
+                continue
+            if cname and key[1] != cname:
+                continue
+            if sname and key[2] != sname:
+                continue
+            del self.auth[key]
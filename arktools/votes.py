@@ -0,0 +1,81 @@
+import asyncio
+import logging
+import typing
+
+log = logging.getLogger("red.vrt.arktools.votes")
+
+# How long a vote session stays open for more votes, in seconds
+VOTE_DURATION = 120
+
+# (chat channel ID, vote type)
+VoteKey = typing.Tuple[str, str]
+
+
+class VoteSession:
+    def __init__(self, channel_id: str, vote_type: str, server: dict, min_votes: int):
+        self.channel_id = channel_id
+        self.vote_type = vote_type
+        self.server = server
+        self.min_votes = min_votes
+        self.votes: typing.List[str] = []
+        self.timer: typing.Optional[asyncio.TimerHandle] = None
+
+    @property
+    def remaining(self) -> int:
+        return self.min_votes - len(self.votes)
+
+    def add(self, gamertag: str) -> int:
+        if gamertag not in self.votes:
+            self.votes.append(gamertag)
+        return self.remaining
+
+
+class VoteTracker:
+    """
+    Open in-game vote sessions, each vote type on each map is tracked on its own
+
+    Every session schedules its own expiry on the event loop when it starts,
+    the timer is cancelled if the vote passes so nothing runs until a session actually expires
+    """
+    def __init__(self, on_expire: typing.Callable[[VoteSession], typing.Awaitable]):
+        self.on_expire = on_expire
+        self.sessions: typing.Dict[VoteKey, VoteSession] = {}
+
+    def get(self, channel_id: str, vote_type: str) -> typing.Optional[VoteSession]:
+        return self.sessions.get((channel_id, vote_type))
+
+    def start(self, channel_id: str, vote_type: str, server: dict, min_votes: int) -> VoteSession:
+        key = (channel_id, vote_type)
+        session = self.sessions.get(key)
+        if session:
+            return session
+        session = VoteSession(channel_id, vote_type, server, min_votes)
+        loop = asyncio.get_running_loop()
+        session.timer = loop.call_at(loop.time() + VOTE_DURATION, self.expire, key)
+        self.sessions[key] = session
+        return session
+
+    # Vote passed, stop its timer
+    def finish(self, channel_id: str, vote_type: str) -> typing.Optional[VoteSession]:
+        session = self.sessions.pop((channel_id, vote_type), None)
+        if session and session.timer:
+            session.timer.cancel()
+        return session
+
+    def expire(self, key: VoteKey):
+        session = self.sessions.pop(key, None)
+        if not session:
+            return
+        task = asyncio.create_task(self.on_expire(session), name=f"ArkTools-VoteExpired-{session.vote_type}")
+        task.add_done_callback(self.expired)
+
+    @staticmethod
+    def expired(task: asyncio.Task):
+        if not task.cancelled() and task.exception():
+            log.warning(f"Failed to close expired vote session: {task.exception()}")
+
+    def close(self):
+        for session in self.sessions.values():
+            if session.timer:
+                session.timer.cancel()
+        self.sessions.clear()
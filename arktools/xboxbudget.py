@@ -0,0 +1,141 @@
+import asyncio
+import email.utils
+import time
+import typing
+
+# Requests per second each host Gamertag may make, and how many it can burst at once
+HOST_RATE = 1.0
+HOST_BURST = 5
+# Shared by every host Gamertag on the bot
+GLOBAL_RATE = 10.0
+GLOBAL_BURST = 20
+# Host sessions the autofriend and maintenance loops run at once
+CONCURRENCY = 5
+# Wait used when a 429 comes back without a usable Retry-After, and the longest wait honoured
+DEFAULT_RETRY = 30.0
+MAX_RETRY = 300.0
+# Times a rate limited call is retried after waiting out Retry-After
+RETRIES = 2
+
+# (guild ID, cluster name, server name) of a host Gamertag
+HostKey = typing.Tuple[int, str, str]
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.allowance = float(burst)
+        self.checked = time.monotonic()
+
+    # Seconds until a request can be made, takes a token if one is available
+    def acquire(self) -> float:
+        now = time.monotonic()
+        self.allowance = min(self.burst, self.allowance + (now - self.checked) * self.rate)
+        self.checked = now
+        if self.allowance >= 1:
+            self.allowance -= 1
+            return 0.0
+        return (1 - self.allowance) / self.rate
+
+    # Give back a token that was taken but not used
+    def refund(self):
+        self.allowance = min(self.burst, self.allowance + 1)
+
+
+# Seconds to wait from a Retry-After header, which can be either a number of seconds or an HTTP date
+def retry_after(headers: typing.Optional[typing.Mapping[str, str]]) -> float:
+    value = headers.get("Retry-After") if headers else None
+    if not value:
+        return DEFAULT_RETRY
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = email.utils.parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return DEFAULT_RETRY
+    return min(max(seconds, 0.0), MAX_RETRY)
+
+
+class HostStats:
+    def __init__(self):
+        self.sweeps = 0
+        self.last_sweep = 0.0
+        self.slowest = 0.0
+        self.requests = 0
+        self.limited = 0
+
+
+class XboxBudget:
+    """
+    Request budget for the Xbox Live calls made by the task loops
+
+    Each host Gamertag gets its own token bucket on top of one shared by the whole bot,
+    a 429 pauses only the host that got it for as long as Retry-After asks.
+    Host sessions run concurrently, up to CONCURRENCY at a time
+    """
+    def __init__(self):
+        self.total = TokenBucket(GLOBAL_RATE, GLOBAL_BURST)
+        self.buckets: typing.Dict[HostKey, TokenBucket] = {}
+        # Monotonic time a rate limited host may make requests again
+        self.blocked: typing.Dict[HostKey, float] = {}
+        self.stats: typing.Dict[HostKey, HostStats] = {}
+        self.semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    def host_stats(self, host: HostKey) -> HostStats:
+        stats = self.stats.get(host)
+        if stats is None:
+            stats = self.stats[host] = HostStats()
+        return stats
+
+    # Wait until both the host and the global bucket allow another request
+    async def wait(self, host: HostKey):
+        bucket = self.buckets.get(host)
+        if bucket is None:
+            bucket = self.buckets[host] = TokenBucket(HOST_RATE, HOST_BURST)
+        while True:
+            delay = self.blocked.get(host, 0.0) - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+            delay = bucket.acquire()
+            if delay:
+                await asyncio.sleep(delay)
+                continue
+            delay = self.total.acquire()
+            if delay:
+                bucket.refund()
+                await asyncio.sleep(delay)
+                continue
+            self.host_stats(host).requests += 1
+            return
+
+    def backoff(self, host: HostKey, seconds: float):
+        self.host_stats(host).limited += 1
+        self.blocked[host] = max(self.blocked.get(host, 0.0), time.monotonic() + seconds)
+
+    # Run a host's session in one of the concurrency slots and record how long it took
+    async def run(self, host: HostKey, coro: typing.Awaitable):
+        async with self.semaphore:
+            start = time.monotonic()
+            try:
+                return await coro
+            finally:
+                stats = self.host_stats(host)
+                stats.sweeps += 1
+                stats.last_sweep = time.monotonic() - start
+                stats.slowest = max(stats.slowest, stats.last_sweep)
+
+    # Drop state for hosts that were removed, everything for a guild if no names are given
+    def forget(self, guild_id: int, cname: str = None, sname: str = None):
+        for host in list(self.stats) + list(self.buckets) + list(self.blocked):
+            if host[0] != guild_id:
+                continue
+            if cname is not None and host[1] != cname:
+                continue
+            if sname is not None and host[2] != sname:
+                continue
+            self.stats.pop(host, None)
+            self.buckets.pop(host, None)
+            self.blocked.pop(host, None)
@@ -4,7 +4,8 @@ import sys
 import discord
 import tabulate
 from redbot.core import commands, Config
-from redbot.core.utils.menus import menu, DEFAULT_CONTROLS
+
+from .menus import menu, PageSource, DEFAULT_CONTROLS
 
 
 class EmojiTracker(commands.Cog):
@@ -147,13 +148,14 @@ class EmojiTracker(commands.Cog):
                 total_emojis += count
         sorted_emojis = sorted(emojis.items(), key=lambda x: x[1], reverse=True)
         pages = math.ceil(len(sorted_emojis) / 10)
-        start = 0
-        stop = 10
+        if not pages:
+            return await ctx.send("No reactions saved yet!")
         color = discord.Color.random()
-        embeds = []
-        for p in range(pages):
-            if stop > len(sorted_emojis):
-                stop = len(sorted_emojis)
+
+        # Only the pages someone flips to get built
+        async def page(p: int) -> discord.Embed:
+            start = p * 10
+            stop = min(start + 10, len(sorted_emojis))
             top = ""
             for i in range(start, stop, 1):
                 emoji = sorted_emojis[i][0]
@@ -165,12 +167,9 @@ class EmojiTracker(commands.Cog):
                 color=color
             )
             embed.set_footer(text=f"Pages {p + 1}/{pages}")
-            embeds.append(embed)
-            start += 10
-            stop += 10
-        if not embeds:
-            return await ctx.send("No reactions saved yet!")
-        await menu(ctx, embeds, DEFAULT_CONTROLS)
+            return embed
+
+        await menu(ctx, PageSource(pages, page), DEFAULT_CONTROLS)
 
     @commands.command(name="reactlb")
     @commands.guild_only()
@@ -0,0 +1,266 @@
+import asyncio
+import contextlib
+import functools
+from collections import OrderedDict
+from typing import Awaitable, Callable, Iterable, List, Union
+
+import discord
+from redbot.core import commands
+from redbot.core.utils.predicates import ReactionPredicate
+
+_ReactableEmoji = Union[str, discord.Emoji]
+
+
+class PageSource:
+    """
+    Pages that are built as they're viewed, pass one to the menu in place of a list
+
+    The factory gets a page number and returns that page's embed or string,
+    the most recently viewed pages are kept so flipping back and forth doesn't rebuild them
+    """
+    def __init__(
+            self,
+            count: int,
+            factory: Callable[[int], Awaitable[Union[str, discord.Embed]]],
+            cache_size: int = 5
+    ):
+        self.count = count
+        self.factory = factory
+        self.cache_size = cache_size
+        self.cache: "OrderedDict[int, Union[str, discord.Embed]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return self.count
+
+    async def get(self, page: int) -> Union[str, discord.Embed]:
+        if page in self.cache:
+            self.cache.move_to_end(page)
+            return self.cache[page]
+        current_page = await self.factory(page)
+        if not isinstance(current_page, (discord.Embed, str)):
+            raise RuntimeError("Pages must be of type discord.Embed or str")
+        self.cache[page] = current_page
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return current_page
+
+
+Pages = Union[List[str], List[discord.Embed], PageSource]
+
+
+async def get_page(pages: Pages, page: int) -> Union[str, discord.Embed]:
+    if isinstance(pages, PageSource):
+        return await pages.get(page)
+    return pages[page]
+
+
+async def menu(
+        ctx: commands.Context,
+        pages: Pages,
+        controls: dict,
+        message: discord.Message = None,
+        page: int = 0,
+        timeout: float = 60.0,
+):
+    """
+    Parameters
+    ----------
+    ctx: commands.Context
+        The command context
+    pages: `list` of `str` or `discord.Embed`, or a `PageSource`
+        The pages of the menu.
+    controls: dict
+        A mapping of emoji to the function which handles the action for the
+        emoji.
+    message: discord.Message
+        The message representing the menu. Usually :code:`None` when first opening
+        the menu
+    page: int
+        The current page number of the menu
+    timeout: float
+        The time (in seconds) to wait for a reaction
+
+    Raises
+    ------
+    RuntimeError
+        If either of the notes above are violated
+    """
+    # Page sources check each page as it's built
+    if not isinstance(pages, PageSource):
+        if not isinstance(pages[0], (discord.Embed, str)):
+            raise RuntimeError("Pages must be of type discord.Embed or str")
+        if not all(isinstance(x, discord.Embed) for x in pages) and not all(
+                isinstance(x, str) for x in pages
+        ):
+            raise RuntimeError("All pages must be of the same type")
+    for key, value in controls.items():
+        maybe_coro = value
+        if isinstance(value, functools.partial):
+            maybe_coro = value.func
+        if not asyncio.iscoroutinefunction(maybe_coro):
+            raise RuntimeError("Function must be a coroutine")
+    current_page = await get_page(pages, page)
+
+    if not message:
+        if isinstance(current_page, discord.Embed):
+            message = await ctx.send(embed=current_page)
+        else:
+            message = await ctx.send(current_page)
+        # Don't wait for reactions to be added (GH-1797)
+        # noinspection PyAsyncCall
+        start_adding_reactions(message, controls.keys())
+    else:
+        try:
+            if isinstance(current_page, discord.Embed):
+                await message.edit(embed=current_page)
+            else:
+                await message.edit(content=current_page)
+        except discord.NotFound:
+            return
+
+    try:
+        react, user = await ctx.bot.wait_for(
+            "reaction_add",
+            check=ReactionPredicate.with_emojis(tuple(controls.keys()), message, ctx.author),
+            timeout=timeout,
+        )
+    except asyncio.TimeoutError:
+        if not ctx.me:
+            return
+        try:
+            if message.channel.permissions_for(ctx.me).manage_messages:
+                await message.clear_reactions()
+            else:
+                raise RuntimeError
+        except (discord.Forbidden, RuntimeError):  # cannot remove all reactions
+            for key in controls.keys():
+                try:
+                    await message.remove_reaction(key, ctx.bot.user)
+                except discord.Forbidden:
+                    return
+                except discord.HTTPException:
+                    pass
+        except discord.NotFound:
+            return
+    else:
+        return await controls[react.emoji](
+            ctx, pages, controls, message, page, timeout, react.emoji
+        )
+
+
+async def next_page(
+        ctx: commands.Context,
+        pages: Pages,
+        controls: dict,
+        message: discord.Message,
+        page: int,
+        timeout: float,
+        emoji: str,
+):
+    perms = message.channel.permissions_for(ctx.me)
+    if perms.manage_messages:  # Can manage messages, so remove react
+        with contextlib.suppress(discord.NotFound):
+            await message.remove_reaction(emoji, ctx.author)
+    if page == len(pages) - 1:
+        page = 0  # Loop around to the first item
+    else:
+        page = page + 1
+    return await menu(ctx, pages, controls, message=message, page=page, timeout=timeout)
+
+
+async def skip_ten(
+        ctx: commands.Context,
+        pages: Pages,
+        controls: dict,
+        message: discord.Message,
+        page: int,
+        timeout: float,
+        emoji: str,
+):
+    perms = message.channel.permissions_for(ctx.me)
+    if perms.manage_messages:  # Can manage messages, so remove react
+        with contextlib.suppress(discord.NotFound):
+            await message.remove_reaction(emoji, ctx.author)
+    if len(pages) < 10:
+        page = page  # Do nothing if there arent enough pages
+    elif page >= len(pages) - 10:
+        page = 10 - (len(pages) - page)  # Loop around to the first item
+    else:
+        page = page + 10
+    return await menu(ctx, pages, controls, message=message, page=page, timeout=timeout)
+
+
+async def prev_page(
+        ctx: commands.Context,
+        pages: Pages,
+        controls: dict,
+        message: discord.Message,
+        page: int,
+        timeout: float,
+        emoji: str,
+):
+    perms = message.channel.permissions_for(ctx.me)
+    if perms.manage_messages:  # Can manage messages, so remove react
+        with contextlib.suppress(discord.NotFound):
+            await message.remove_reaction(emoji, ctx.author)
+    if page == 0:
+        page = len(pages) - 1  # Loop around to the last item
+    else:
+        page = page - 1
+    return await menu(ctx, pages, controls, message=message, page=page, timeout=timeout)
+
+
+async def back_ten(
+        ctx: commands.Context,
+        pages: Pages,
+        controls: dict,
+        message: discord.Message,
+        page: int,
+        timeout: float,
+        emoji: str,
+):
+    perms = message.channel.permissions_for(ctx.me)
+    if perms.manage_messages:  # Can manage messages, so remove react
+        with contextlib.suppress(discord.NotFound):
+            await message.remove_reaction(emoji, ctx.author)
+    if len(pages) < 10:
+        page = page  # Do nothing if there arent enough pages
+    elif page < 10:
+        page = page + len(pages) - 10  # Loop around to the last item
+    else:
+        page = page - 10
+    return await menu(ctx, pages, controls, message=message, page=page, timeout=timeout)
+
+
+async def close_menu(
+        ctx: commands.Context,
+        pages: Pages,
+        controls: dict,
+        message: discord.Message,
+        page: int,
+        timeout: float,
+        emoji: str,
+):
+    with contextlib.suppress(discord.NotFound):
+        await message.delete()
+
+
+def start_adding_reactions(
+        message: discord.Message, emojis: Iterable[_ReactableEmoji]
+) -> asyncio.Task:
+    async def task():
+        # The task should exit silently if the message is deleted
+        with contextlib.suppress(discord.NotFound):
+            for emoji in emojis:
+                await message.add_reaction(emoji)
+
+    return asyncio.create_task(task())
+
+
+DEFAULT_CONTROLS = {
+    "\N{BLACK LEFT-POINTING DOUBLE TRIANGLE}": back_ten,
+    "\N{LEFTWARDS BLACK ARROW}\N{VARIATION SELECTOR-16}": prev_page,
+    "\N{CROSS MARK}": close_menu,
+    "\N{BLACK RIGHTWARDS ARROW}\N{VARIATION SELECTOR-16}": next_page,
+    "\N{BLACK RIGHT-POINTING DOUBLE TRIANGLE}": skip_ten,
+}
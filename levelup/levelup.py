@@ -30,7 +30,7 @@ from .formatter import (
     profile_embed,
 )
 from .generator import Generator
-from .menus import menu, DEFAULT_CONTROLS
+from .menus import menu, PageSource, DEFAULT_CONTROLS
 
 matplotlib.use("agg")
 plt.switch_backend("agg")
@@ -1690,7 +1690,6 @@ class LevelUp(commands.Cog):
         conf = await self.config.guild(ctx.guild).all()
         base = conf["base"]
         exp = conf["exp"]
-        embeds = []
         prestige_req = conf["prestige"]
         leaderboard = {}
         total_messages = 0
@@ -1714,20 +1713,18 @@ class LevelUp(commands.Cog):
 
         # Get your place in the LB
         you = ""
-        for i in sorted_users:
-            uid = i[0]
+        for i, (uid, _) in enumerate(sorted_users):
             if str(uid) == str(ctx.author.id):
-                i = sorted_users.index(i)
                 you = f"You: {i + 1}/{len(sorted_users)}\n"
 
         pages = math.ceil(len(sorted_users) / 10)
-        start = 0
-        stop = 10
-        for p in range(pages):
-            title = f"**Total Messages:** `{'{:,}'.format(total_messages)}`\n" \
-                    f"**Total VoiceTime:** `{voice}`\n"
-            if stop > len(sorted_users):
-                stop = len(sorted_users)
+        title = f"**Total Messages:** `{'{:,}'.format(total_messages)}`\n" \
+                f"**Total VoiceTime:** `{voice}`\n"
+
+        # Only the pages someone flips to get built
+        async def page(p: int) -> discord.Embed:
+            start = p * 10
+            stop = min(start + 10, len(sorted_users))
             table = []
             for i in range(start, stop, 1):
                 label = i + 1
@@ -1754,24 +1751,18 @@ class LevelUp(commands.Cog):
                 embed.set_footer(text=f"Pages {p + 1}/{pages} ｜ {you}")
             else:
                 embed.set_footer(text=f"Pages {p + 1}/{pages}")
-            embeds.append(embed)
-            start += 10
-            stop += 10
-        if embeds:
-            if len(embeds) == 1:
-                embed = embeds[0]
-                await ctx.send(embed=embed)
-            else:
-                await menu(ctx, embeds, DEFAULT_CONTROLS)
+            return embed
+
+        if pages == 1:
+            await ctx.send(embed=await page(0))
         else:
-            return await ctx.send("No user data yet!")
+            await menu(ctx, PageSource(pages, page), DEFAULT_CONTROLS)
 
     @commands.command(name="startop", aliases=["starlb"])
     @commands.guild_only()
     async def star_leaderboard(self, ctx: commands.Context):
         """View the star leaderboard"""
         conf = await self.config.guild(ctx.guild).all()
-        embeds = []
         leaderboard = {}
         total_stars = 0
         for user, data in conf["users"].items():
@@ -1786,21 +1777,19 @@ class LevelUp(commands.Cog):
 
         # Get your place in the LB
         you = ""
-        for i in sorted_users:
-            uid = i[0]
+        for i, (uid, _) in enumerate(sorted_users):
             if str(uid) == str(ctx.author.id):
-                i = sorted_users.index(i)
                 you = f"You: {i + 1}/{len(sorted_users)}\n"
 
         pages = math.ceil(len(sorted_users) / 10)
-        start = 0
-        stop = 10
         startotal = "{:,}".format(total_stars)
-        for p in range(pages):
-            title = f"**Star Leaderboard**\n" \
-                    f"**Total ⭐'s: {startotal}**\n"
-            if stop > len(sorted_users):
-                stop = len(sorted_users)
+        title = f"**Star Leaderboard**\n" \
+                f"**Total ⭐'s: {startotal}**\n"
+
+        # Only the pages someone flips to get built
+        async def page(p: int) -> discord.Embed:
+            start = p * 10
+            stop = min(start + 10, len(sorted_users))
             table = []
             for i in range(start, stop, 1):
                 uid = sorted_users[i][0]
@@ -1822,14 +1811,9 @@ class LevelUp(commands.Cog):
                 embed.set_footer(text=f"Pages {p + 1}/{pages} ｜ {you}")
             else:
                 embed.set_footer(text=f"Pages {p + 1}/{pages}")
-            embeds.append(embed)
-            start += 10
-            stop += 10
-        if embeds:
-            if len(embeds) == 1:
-                embed = embeds[0]
-                await ctx.send(embed=embed)
-            else:
-                await menu(ctx, embeds, DEFAULT_CONTROLS)
+            return embed
+
+        if pages == 1:
+            await ctx.send(embed=await page(0))
         else:
-            return await ctx.send("No user data yet!")
+            await menu(ctx, PageSource(pages, page), DEFAULT_CONTROLS)
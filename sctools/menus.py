@@ -1,7 +1,8 @@
 import asyncio
 import contextlib
 import functools
-from typing import Iterable, List, Union
+from collections import OrderedDict
+from typing import Awaitable, Callable, Iterable, List, Union
 
 import discord
 from redbot.core import commands
@@ -10,9 +11,52 @@ from redbot.core.utils.predicates import ReactionPredicate
 _ReactableEmoji = Union[str, discord.Emoji]
 
 
+class PageSource:
+    """
+    Pages that are built as they're viewed, pass one to the menu in place of a list
+
+    The factory gets a page number and returns that page's embed or string,
+    the most recently viewed pages are kept so flipping back and forth doesn't rebuild them
+    """
+    def __init__(
+            self,
+            count: int,
+            factory: Callable[[int], Awaitable[Union[str, discord.Embed]]],
+            cache_size: int = 5
+    ):
+        self.count = count
+        self.factory = factory
+        self.cache_size = cache_size
+        self.cache: "OrderedDict[int, Union[str, discord.Embed]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return self.count
+
+    async def get(self, page: int) -> Union[str, discord.Embed]:
+        if page in self.cache:
+            self.cache.move_to_end(page)
+            return self.cache[page]
+        current_page = await self.factory(page)
+        if not isinstance(current_page, (discord.Embed, str)):
+            raise RuntimeError("Pages must be of type discord.Embed or str")
+        self.cache[page] = current_page
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return current_page
+
+
+Pages = Union[List[str], List[discord.Embed], PageSource]
+
+
+async def get_page(pages: Pages, page: int) -> Union[str, discord.Embed]:
+    if isinstance(pages, PageSource):
+        return await pages.get(page)
+    return pages[page]
+
+
 async def menu(
         ctx: commands.Context,
-        pages: Union[List[str], List[discord.Embed]],
+        pages: Pages,
         controls: dict,
         message: discord.Message = None,
         page: int = 0,
@@ -23,7 +67,7 @@ async def menu(
     ----------
     ctx: commands.Context
         The command context
-    pages: `list` of `str` or `discord.Embed`
+    pages: `list` of `str` or `discord.Embed`, or a `PageSource`
         The pages of the menu.
     controls: dict
         A mapping of emoji to the function which handles the action for the
@@ -41,19 +85,21 @@ async def menu(
     RuntimeError
         If either of the notes above are violated
     """
-    if not isinstance(pages[0], (discord.Embed, str)):
-        raise RuntimeError("Pages must be of type discord.Embed or str")
-    if not all(isinstance(x, discord.Embed) for x in pages) and not all(
-            isinstance(x, str) for x in pages
-    ):
-        raise RuntimeError("All pages must be of the same type")
+    # Page sources check each page as it's built
+    if not isinstance(pages, PageSource):
+        if not isinstance(pages[0], (discord.Embed, str)):
+            raise RuntimeError("Pages must be of type discord.Embed or str")
+        if not all(isinstance(x, discord.Embed) for x in pages) and not all(
+                isinstance(x, str) for x in pages
+        ):
+            raise RuntimeError("All pages must be of the same type")
     for key, value in controls.items():
         maybe_coro = value
         if isinstance(value, functools.partial):
             maybe_coro = value.func
         if not asyncio.iscoroutinefunction(maybe_coro):
             raise RuntimeError("Function must be a coroutine")
-    current_page = pages[page]
+    current_page = await get_page(pages, page)
 
     if not message:
         if isinstance(current_page, discord.Embed):
@@ -104,7 +150,7 @@ async def menu(
 
 async def next_page(
         ctx: commands.Context,
-        pages: list,
+        pages: Pages,
         controls: dict,
         message: discord.Message,
         page: int,
@@ -124,7 +170,7 @@ async def next_page(
 
 async def skip_ten(
         ctx: commands.Context,
-        pages: list,
+        pages: Pages,
         controls: dict,
         message: discord.Message,
         page: int,
@@ -146,7 +192,7 @@ async def skip_ten(
 
 async def prev_page(
         ctx: commands.Context,
-        pages: list,
+        pages: Pages,
         controls: dict,
         message: discord.Message,
         page: int,
@@ -166,7 +212,7 @@ async def prev_page(
 
 async def back_ten(
         ctx: commands.Context,
-        pages: list,
+        pages: Pages,
         controls: dict,
         message: discord.Message,
         page: int,
@@ -188,7 +234,7 @@ async def back_ten(
 
 async def close_menu(
         ctx: commands.Context,
-        pages: list,
+        pages: Pages,
         controls: dict,
         message: discord.Message,
         page: int,
@@ -0,0 +1,53 @@
+"""
+Micro-benchmark for the getchat parser over a recorded getchat dump
+
+Compares parse_getchat with the per-line checks message_handler used to run, which called an uncompiled
+re.findall for every chat line. Run from the repo root:
+
+    python tests/bench_chatparser.py [path to getchat dump] [repeat]
+"""
+import pathlib
+import re
+import sys
+import timeit
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent))
+import conftest  # noqa: F401,E402  registers the arktools package
+
+from arktools.chatparser import parse_getchat  # noqa: E402
+
+RECORDED = pathlib.Path(__file__).parent / "data" / "getchat.txt"
+
+
+# The old message_handler classification, kept here only to compare against
+def legacy(res: str) -> list:
+    parsed = []
+    for msg in res.split("\n"):
+        if not msg or msg == " ":
+            continue
+        if msg.startswith("SERVER:"):
+            continue
+        if msg.startswith("AdminCmd:"):
+            parsed.append(msg)
+        elif "Tribe" and ", ID" in msg:
+            parsed.append(msg)
+        elif "):" in msg:
+            parsed.append(re.findall(r"(.+)\s\((.+)\): (.+)", msg))
+    return parsed
+
+
+def main():
+    path = pathlib.Path(sys.argv[1]) if len(sys.argv) > 1 else RECORDED
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    dump = path.read_text(encoding="utf-8")
+    # Scale the dump up to a busy cluster's buffer
+    res = "\n".join([dump] * repeat)
+    lines = res.count("\n") + 1
+    runs = 200
+    for name, func in (("parse_getchat", parse_getchat), ("legacy", legacy)):
+        best = min(timeit.repeat(lambda: func(res), number=runs, repeat=5)) / runs
+        print(f"{name:>14}: {best * 1000:.3f}ms per buffer, {best / lines * 1e6:.2f}us per line ({lines} lines)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,16 @@
+import pathlib
+import sys
+import types
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+
+
+# A cog's __init__ only wires it into Red, so register the package without running it
+# and the standalone modules can be imported without discord or redbot installed
+def cog_package(name: str):
+    package = types.ModuleType(name)
+    package.__path__ = [str(ROOT / name)]
+    sys.modules[name] = package
+
+
+cog_package("arktools")
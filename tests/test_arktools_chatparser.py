@@ -0,0 +1,66 @@
+import pathlib
+
+from arktools.chatparser import ChatFilter, LineType, parse_getchat, parse_line
+from arktools.outbound import split_lines
+
+RECORDED = pathlib.Path(__file__).parent / "data" / "getchat.txt"
+
+
+def test_echo():
+    line = parse_line("SERVER: Vertyco: hello from discord")
+    assert line.kind is LineType.ECHO
+    # Relayed chat keeps its player format behind the prefix, it must never be relayed again
+    assert parse_line("SERVER: Ragnarok: Bob (Bobby): hi").kind is LineType.ECHO
+
+
+def test_chat():
+    line = parse_line("xXDinoKingXx (Rex Rider): anyone selling wyvern milk")
+    assert line.kind is LineType.CHAT
+    assert line.gamertag == "xXDinoKingXx"
+    assert line.character == "Rex Rider"
+    assert line.message == "anyone selling wyvern milk"
+
+
+def test_tribe_log():
+    line = parse_line("Tribe Nomads, ID 1002938475: Day 88, 03:10:55: Ace froze Tribemember Nova - Lvl 98!")
+    assert line.kind is LineType.TRIBE
+    # Only ", ID" used to be checked, so chat like this was treated as a tribe log
+    assert parse_line('LostPenguin (Pingu): what does ", ID" mean').kind is LineType.CHAT
+
+
+def test_admin_command():
+    line = parse_line("AdminCmd: saveworld (PlayerName: Vertyco, ARKID: 184223781, SteamID: 2535417326123456)")
+    assert line.kind is LineType.ADMIN
+
+
+def test_multi_line_serverchat_echo():
+    # Discord messages can span lines and quote in-game chat
+    payloads = split_lines(["serverchat Vertyco: look at this\nBob (Bobby): free rex at base\n\nNova (N): lol"])
+    assert payloads == [
+        "serverchat Vertyco: look at this",
+        "serverchat Bob (Bobby): free rex at base",
+        "serverchat Nova (N): lol",
+    ]
+    # The server echoes every serverchat back into the getchat buffer with its own prefix
+    echoed = "\n".join(f"SERVER: {p.split(' ', 1)[1]}" for p in payloads)
+    assert [line.kind for line in parse_getchat(echoed)] == [LineType.ECHO] * 3
+
+
+def test_split_lines_leaves_other_commands_alone():
+    commands = ["serverchat hi", 'renameplayer "bad" good', "broadcast line one\nline two"]
+    assert split_lines(commands) == commands
+
+
+def test_recorded_getchat():
+    lines = parse_getchat(RECORDED.read_text(encoding="utf-8"))
+    counts = {kind: sum(1 for line in lines if line.kind is kind) for kind in LineType}
+    assert counts == {LineType.ADMIN: 2, LineType.TRIBE: 4, LineType.CHAT: 8, LineType.ECHO: 4}
+
+
+def test_chat_filter():
+    chatfilter = ChatFilter(["!", "?"], ["BadName"])
+    assert chatfilter.command("!kit") == ("!", "kit")
+    assert chatfilter.command("?players") == ("?", "players")
+    assert chatfilter.command("hello !kit") is None
+    assert chatfilter.badname("badname") == "BadName"
+    assert chatfilter.badname("Human") is None
@@ -0,0 +1,163 @@
+import asyncio
+
+import pytest
+
+from arktools import rconpool
+from arktools.asyncrcon import (
+    AsyncRconClient,
+    MAX_BODY,
+    RconAuthError,
+    SERVERDATA_AUTH,
+    SERVERDATA_AUTH_RESPONSE,
+    SERVERDATA_RESPONSE_VALUE,
+    encode_packet,
+    read_packet,
+)
+from arktools.rconpool import RconConnection, RconPool
+
+PASSWORD = "hunter2"
+
+
+class FakeRconServer:
+    """
+    Minimal Source RCON server on localhost
+
+    "echo <text>" replies with the text, "big <n>" replies with n characters split into MAX_BODY packets
+    the way Ark does, and "hang" never replies
+    """
+    def __init__(self, password: str = PASSWORD):
+        self.password = password
+        self.server = None
+        self.port = 0
+        self.connections = 0
+        self.commands = []
+
+    async def __aenter__(self):
+        self.server = await asyncio.start_server(self.handle, "127.0.0.1", 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def __aexit__(self, *args):
+        self.server.close()
+        await self.server.wait_closed()
+
+    @staticmethod
+    def reply(command: str):
+        if command.startswith("echo "):
+            return command[5:]
+        if command.startswith("big "):
+            return "x" * int(command[4:])
+        return None
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        try:
+            while True:
+                request_id, packet_type, body = await read_packet(reader)
+                if packet_type == SERVERDATA_AUTH:
+                    writer.write(encode_packet(request_id, SERVERDATA_RESPONSE_VALUE, ""))
+                    auth_id = request_id if body == self.password else -1
+                    writer.write(encode_packet(auth_id, SERVERDATA_AUTH_RESPONSE, ""))
+                    await writer.drain()
+                    continue
+                self.commands.append(body)
+                reply = self.reply(body)
+                if reply is None:
+                    continue
+                for i in range(0, max(len(reply), 1), MAX_BODY):
+                    writer.write(encode_packet(request_id, SERVERDATA_RESPONSE_VALUE, reply[i:i + MAX_BODY]))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+class Clock:
+    """Stands in for the time module in rconpool so backoff can be skipped without sleeping"""
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+def run(coro):
+    return asyncio.run(asyncio.wait_for(coro, 10))
+
+
+def test_auth_failure():
+    async def main():
+        async with FakeRconServer() as server:
+            client = AsyncRconClient("127.0.0.1", server.port, "wrong")
+            with pytest.raises(RconAuthError):
+                await client.connect()
+            assert not client.connected
+
+            conn = RconConnection("127.0.0.1", server.port, "wrong")
+            assert await conn.run("echo hi", timeout=1) is None
+            assert conn.failures == 1
+            assert conn.backing_off()
+            assert server.commands == []
+
+    run(main())
+
+
+def test_pipelined_replies_stay_in_order():
+    async def main():
+        async with FakeRconServer() as server:
+            conn = RconConnection("127.0.0.1", server.port, PASSWORD)
+            res = await conn.run_many(["echo one", "echo two", "echo three"], timeout=2)
+            assert res == ["one", "two", "three"]
+            assert await conn.run("echo four", timeout=2) == "four"
+            # Both batches went over the same authenticated socket
+            assert server.connections == 1
+            assert conn.commands == 4
+
+    run(main())
+
+
+@pytest.mark.parametrize("size", [MAX_BODY - 1, MAX_BODY, MAX_BODY * 2, MAX_BODY * 2 + 100])
+def test_split_replies_are_reassembled(size: int):
+    async def main():
+        async with FakeRconServer() as server:
+            conn = RconConnection("127.0.0.1", server.port, PASSWORD)
+            # A long reply in the middle of a batch must not take the next command's packets with it
+            res = await conn.run_many(["echo before", f"big {size}", "echo after"], timeout=3)
+            assert res == ["before", "x" * size, "after"]
+            # Last command in flight relies on the fragment timeout to know it's complete
+            assert await conn.run(f"big {size}", timeout=3) == "x" * size
+
+    run(main())
+
+
+def test_timeout_backs_off_then_reconnects(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rconpool, "time", clock)
+
+    async def main():
+        async with FakeRconServer() as server:
+            pool = RconPool()
+            config = {"ip": "127.0.0.1", "port": server.port, "password": PASSWORD}
+            assert await pool.run(config, "hang", timeout=0.2) is None
+            conn = pool.get(config)
+            assert conn.failures == 1
+            assert not conn.connected
+
+            # Still backing off, nothing is sent
+            assert await pool.run(config, "echo skipped") is None
+            assert server.commands == ["hang"]
+
+            # Backoff doubles with each failure
+            clock.now = conn.retry_at
+            assert await pool.run(config, "hang", timeout=0.2) is None
+            assert conn.failures == 2
+            assert conn.retry_at == clock.now + 2
+
+            # Once the backoff is over the next command reconnects and the late reply isn't mistaken for it
+            clock.now = conn.retry_at
+            assert await pool.run(config, "echo back") == "back"
+            assert conn.failures == 0
+            assert server.connections == 3
+
+    run(main())
@@ -6,6 +6,8 @@ import discord
 import tabulate
 from redbot.core.utils.chat_formatting import box
 
+from .menus import PageSource
+
 
 # Check if an object is None
 def check(data):
@@ -191,10 +193,11 @@ def profile_embed(data):
 
 # Format screnshot json for sending to the menu
 def screenshot_embeds(data, gamertag):
-    pages = []
-    length = len(data["screenshots"])
-    cur_page = 1
-    for pic in data["screenshots"]:
+    screenshots = data["screenshots"]
+    length = len(screenshots)
+
+    async def page(p: int) -> discord.Embed:
+        pic = screenshots[p]
         game = pic["title_name"]
         name = pic["screenshot_name"]
         if name == "":
@@ -217,10 +220,10 @@ def screenshot_embeds(data, gamertag):
                               f"Views: `{views}`\n"
                               f"Taken on: `{check(timestamp)}`\n"
                               f"Caption: `{check(caption)}`\n")
-        embed.set_footer(text=f"Pages: {cur_page}/{length}")
-        cur_page += 1
-        pages.append(embed)
-    return pages
+        embed.set_footer(text=f"Pages: {p + 1}/{length}")
+        return embed
+
+    return PageSource(length, page)
 
 
 # Format game info
@@ -299,10 +302,10 @@ def game_embeds(gamertag, gamename, gs, data):
 
 # Format friend list
 def friend_embeds(friend_data, main_gamertag):
-    embeds = []
-    count = 1
     friends = friend_data["people"]
-    for friend in friends:
+
+    async def page(p: int) -> discord.Embed:
+        friend = friends[p]
         xuid = friend["xuid"]
         followed_by = friend["is_following_caller"]  # Only useful for authorized user
         name = friend["gamertag"]
@@ -340,17 +343,17 @@ def friend_embeds(friend_data, main_gamertag):
             embed.add_field(name="Session Info", value=f"Game Session: {session} players\nParty Chat: {party}")
         if bio != "":
             embed.add_field(name="Bio", value=box(bio), inline=False)
-        embed.set_footer(text=f"Page {count}/{len(friends)}")
-        count += 1
-        embeds.append(embed)
-    return embeds
+        embed.set_footer(text=f"Page {p + 1}/{len(friends)}")
+        return embed
+
+    return PageSource(len(friends), page)
 
 
 def gameclip_embeds(clip_data, gamertag):
-    embeds = []
-    count = 1
     clips = clip_data["game_clips"]
-    for clip in clips:
+
+    async def page(p: int) -> discord.Embed:
+        clip = clips[p]
         state = clip["state"]
         recorded_on = fix_timestamp(clip["date_recorded"]).strftime("%m/%d/%Y, %H:%M:%S")
         published = False
@@ -381,10 +384,10 @@ def gameclip_embeds(clip_data, gamertag):
             clip_info += f"Published on `{published_on}`\n"
         clip_info += f"**[Click Here To Watch]({clip_uri})**"
         embed.add_field(name="Clip Info", value=clip_info)
-        embed.set_footer(text=f"Pages {count}/{len(clips)}")
-        count += 1
-        embeds.append(embed)
-    return embeds
+        embed.set_footer(text=f"Pages {p + 1}/{len(clips)}")
+        return embed
+
+    return PageSource(len(clips), page)
 
 
 # Format microsoft service data, has some commented out lines for if i plan on expanding this later
@@ -1,31 +1,77 @@
 import asyncio
 import contextlib
 import functools
-from typing import List, Union
+from collections import OrderedDict
+from typing import Awaitable, Callable, List, Union
 
 import discord
 from dislash import ActionRow, Button, ButtonStyle, ResponseType
 from redbot.core import commands
 
 
+class PageSource:
+    """
+    Pages that are built as they're viewed, pass one to the menu in place of a list
+
+    The factory gets a page number and returns that page's embed or string,
+    the most recently viewed pages are kept so flipping back and forth doesn't rebuild them
+    """
+    def __init__(
+            self,
+            count: int,
+            factory: Callable[[int], Awaitable[Union[str, discord.Embed]]],
+            cache_size: int = 5
+    ):
+        self.count = count
+        self.factory = factory
+        self.cache_size = cache_size
+        self.cache: "OrderedDict[int, Union[str, discord.Embed]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return self.count
+
+    async def get(self, page: int) -> Union[str, discord.Embed]:
+        if page in self.cache:
+            self.cache.move_to_end(page)
+            return self.cache[page]
+        current_page = await self.factory(page)
+        if not isinstance(current_page, (discord.Embed, str)):
+            raise RuntimeError("Pages must be of type discord.Embed or str")
+        self.cache[page] = current_page
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return current_page
+
+
+Pages = Union[List[str], List[discord.Embed], PageSource]
+
+
+async def get_page(pages: Pages, page: int) -> Union[str, discord.Embed]:
+    if isinstance(pages, PageSource):
+        return await pages.get(page)
+    return pages[page]
+
+
 # Red menus, but with buttons :D
 
 
 async def buttonmenu(
         ctx: commands.Context,
-        pages: Union[List[str], List[discord.Embed]],
+        pages: Pages,
         controls: dict,
         message: discord.Message = None,
         page: int = 0,
         timeout: float = 60.0,
 ):
-    if not isinstance(pages[0], (discord.Embed, str)):
-        raise RuntimeError("Pages must be of type discord.Embed or str")
-    if not all(isinstance(x, discord.Embed) for x in pages) and not all(
-            isinstance(x, str) for x in pages
-    ):
-        raise RuntimeError("All pages must be of the same type")
-    current_page = pages[page]
+    # Page sources check each page as it's built
+    if not isinstance(pages, PageSource):
+        if not isinstance(pages[0], (discord.Embed, str)):
+            raise RuntimeError("Pages must be of type discord.Embed or str")
+        if not all(isinstance(x, discord.Embed) for x in pages) and not all(
+                isinstance(x, str) for x in pages
+        ):
+            raise RuntimeError("All pages must be of the same type")
+    current_page = await get_page(pages, page)
     buttons = controls["buttons"]
     actions = controls["actions"]
 
@@ -69,7 +115,7 @@ async def buttonmenu(
 
 async def next_page(
         ctx: commands.Context,
-        pages: list,
+        pages: Pages,
         controls: dict,
         message: discord.Message,
         page: int,
@@ -84,7 +130,7 @@ async def next_page(
 
 async def skip_ten(
         ctx: commands.Context,
-        pages: list,
+        pages: Pages,
         controls: dict,
         message: discord.Message,
         page: int,
@@ -101,7 +147,7 @@ async def skip_ten(
 
 async def prev_page(
         ctx: commands.Context,
-        pages: list,
+        pages: Pages,
         controls: dict,
         message: discord.Message,
         page: int,
@@ -116,7 +162,7 @@ async def prev_page(
 
 async def back_ten(
         ctx: commands.Context,
-        pages: list,
+        pages: Pages,
         controls: dict,
         message: discord.Message,
         page: int,
@@ -133,7 +179,7 @@ async def back_ten(
 
 async def close_menu(
         ctx: commands.Context,
-        pages: list,
+        pages: Pages,
         controls: dict,
         message: discord.Message,
         page: int,